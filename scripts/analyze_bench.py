@@ -8,304 +8,444 @@ Usage:
                              [--output-md results/summary/bench_comparison.md]
                              [--output-csv results/summary/bench_comparison.csv]
                              [--asm-md results/summary/asm_analysis.md]
+                             [--jobs N] [--no-cache]
 """
 
 import argparse
 import csv
-import json
-import re
+import math
 import sys
 from collections import defaultdict
 from pathlib import Path
 
-# Compiler sort order: GCC (12→15) then Clang (18→22)
-COMPILER_ORDER = [
-    "gcc-12",
-    "gcc-13",
-    "gcc-14",
-    "gcc-15",
-    "clang-18",
-    "clang-19",
-    "clang-20",
-    "clang-21",
-    "clang-22",
-]
+from asm_loops import (
+    LOOPS_VERSION,
+    MIX_CLASSES,
+    ListingLoops,
+    LoopProfile,
+    UnrollCheck,
+    analyze_loops,
+)
+from asm_metrics import METRICS_VERSION, AsmMetrics, scan_asm_file
+from extract_asm import iter_functions
+from poet_bench import add_load_arguments, column_key, column_sort_key, load_from_args
+from result_cache import ResultCache
+from result_store import PivotTable, ResultStore, RunStats, ipc_of
 
-VARIANT_ORDER = ["default", "native"]
 
+# Cells whose repetitions vary more than this (stddev / mean) are flagged.
+NOISY_CV = 0.05
 
-def compiler_sort_key(name: str) -> tuple[int, int]:
-    """Sort key: (family_order, version)."""
-    for i, c in enumerate(COMPILER_ORDER):
-        if c == name:
-            return (i, 0)
-    return (100, 0)
 
+def format_cell(stats: RunStats | None) -> str:
+    """Markdown cell: median, ± MAD with repetitions, † when noisy."""
+    if stats is None:
+        return "-"
+    cell = f"{stats.median:.1f}"
+    if not math.isnan(stats.mad):
+        cell += f" ± {stats.mad:.1f}"
+    if stats.cv > NOISY_CV:
+        cell += " †"
+    return cell
 
-def column_key(compiler: str, variant: str) -> str:
-    return f"{compiler} {variant}"
 
+def build_comparison_table(store: ResultStore) -> PivotTable:
+    """Pivot cpu_time to one row per benchmark and one column per build."""
+    return store.pivot(column_sort_key)
 
-def load_results(results_root: Path) -> dict[str, dict[str, list[dict]]]:
-    """Load all Google Benchmark JSON results.
 
-    Returns: {bench_name: {column_key: [benchmark_entries]}}
-    """
-    data: dict[str, dict[str, list[dict]]] = defaultdict(dict)
-
-    for json_file in sorted(results_root.rglob("*.json")):
-        # Path: results/<compiler>/<variant>/<bench>.json
-        parts = json_file.relative_to(results_root).parts
-        if len(parts) < 3:
-            continue
-        compiler = parts[0]
-        variant = parts[1]
-        bench_name = json_file.stem
-
-        try:
-            parsed = json.loads(json_file.read_text())
-        except (json.JSONDecodeError, OSError) as e:
-            print(f"Warning: failed to load {json_file}: {e}", file=sys.stderr)
-            continue
-
-        # Google Benchmark JSON has a "benchmarks" array
-        benchmarks = parsed.get("benchmarks", [])
-        if not benchmarks:
-            continue
-
-        col = column_key(compiler, variant)
-        data[bench_name][col] = benchmarks
-
-    return dict(data)
-
-
-def clean_bench_name(name: str) -> str:
-    """Strip Google Benchmark suffixes like '/min_time:0.100'."""
-    return re.sub(r"/min_time:[0-9.]+$", "", name)
-
-
-def split_bench_name(name: str) -> tuple[str, str]:
-    """Split 'Section/bench_name' into (section, bench_name)."""
-    name = clean_bench_name(name)
-    if "/" in name:
-        parts = name.split("/", 1)
-        return parts[0], parts[1]
-    return "", name
-
-
-def build_comparison_table(
-    data: dict[str, dict[str, list[dict]]],
-) -> tuple[list[str], list[dict]]:
-    """Build a flat comparison table.
-
-    Returns: (columns, rows) where each row is a dict with keys:
-        bench, section, name, <column>_nsop
-    """
-    all_cols = set()
-    for bench_data in data.values():
-        all_cols.update(bench_data.keys())
-
-    sorted_cols = sorted(
-        all_cols,
-        key=lambda c: (
-            VARIANT_ORDER.index(c.split()[-1])
-            if c.split()[-1] in VARIANT_ORDER
-            else 99,
-            compiler_sort_key(c.rsplit(" ", 1)[0]),
-        ),
-    )
-
-    rows = []
-    for bench_name in sorted(data.keys()):
-        bench_data = data[bench_name]
-
-        # Collect all unique benchmark names from all columns
-        all_bench_entries: dict[str, dict[str, float]] = {}
-        for col, entries in bench_data.items():
-            for entry in entries:
-                name = clean_bench_name(entry.get("name", ""))
-                if name not in all_bench_entries:
-                    all_bench_entries[name] = {}
-                cpu_time = entry.get("cpu_time", 0)
-                all_bench_entries[name][col] = cpu_time
-
-        for entry_name in all_bench_entries:
-            section, short_name = split_bench_name(entry_name)
-            flat_row = {
-                "bench": bench_name,
-                "section": section,
-                "name": short_name,
-            }
-
-            for col in sorted_cols:
-                nsop = all_bench_entries[entry_name].get(col)
-                flat_row[f"{col}_nsop"] = nsop if nsop is not None else ""
-
-            rows.append(flat_row)
-
-    return sorted_cols, rows
-
-
-def write_markdown(columns: list[str], rows: list[dict], output: Path):
+def write_markdown(store: ResultStore, table: PivotTable, output: Path):
     """Write Markdown comparison table."""
     output.parent.mkdir(parents=True, exist_ok=True)
 
+    benches = store.labels("bench")
+    sections = store.labels("section")
+    names = store.labels("name")
+    columns = [column_key(c, v) for c, v in table.columns]
+
     with open(output, "w") as f:
         f.write("# Benchmark Comparison\n\n")
         f.write(f"*Generated from {len(columns)} compiler/variant combinations*\n\n")
+        if any(n > 1 for n in table.counts):
+            f.write(
+                "*Cells are median ± MAD over repetitions; "
+                f"† marks a CV above {NOISY_CV:.0%}*\n\n"
+            )
 
-        groups: dict[str, list[dict]] = defaultdict(list)
-        for row in rows:
-            key = f"{row['bench']} / {row['section']}"
-            groups[key].append(row)
+        groups: dict[tuple[int, int], list[int]] = defaultdict(list)
+        for r, (bench, section, _) in enumerate(table.keys):
+            groups[(bench, section)].append(r)
 
-        for group_key, group_rows in groups.items():
-            f.write(f"## {group_key}\n\n")
+        for (bench, section), group_rows in groups.items():
+            f.write(f"## {benches[bench]} / {sections[section]}\n\n")
 
             header = "| Benchmark |"
             sep = "|:----------|"
-            for col in columns:
-                header += f" {col} (ns) |"
+            for col, unit in zip(columns, table.units):
+                header += f" {col} ({unit}) |"
                 sep += "--------:|"
             f.write(header + "\n")
             f.write(sep + "\n")
 
-            for row in group_rows:
-                line = f"| {row['name']} |"
-                for col in columns:
-                    nsop = row.get(f"{col}_nsop", "")
-                    if nsop != "" and isinstance(nsop, (int, float)):
-                        cell = f"{nsop:.1f}"
-                    elif nsop != "":
-                        cell = str(nsop)
-                    else:
-                        cell = "-"
-                    line += f" {cell} |"
+            for r in group_rows:
+                line = f"| {names[table.keys[r][2]]} |"
+                for ci in range(len(columns)):
+                    line += f" {format_cell(table.stats(r, ci))} |"
                 f.write(line + "\n")
 
             f.write("\n")
 
 
-def write_csv(columns: list[str], rows: list[dict], output: Path):
+def write_csv(store: ResultStore, table: PivotTable, output: Path):
     """Write flat CSV."""
     output.parent.mkdir(parents=True, exist_ok=True)
 
+    benches = store.labels("bench")
+    sections = store.labels("section")
+    names = store.labels("name")
+
+    # Hardware counter columns only appear when the runs recorded them.
+    counters = list(table.counters)
+    with_ipc = "cycles" in counters and "instructions" in counters
+
     fieldnames = ["bench", "section", "name"]
-    for col in columns:
-        fieldnames.append(f"{col}_nsop")
+    for (compiler, variant), unit in zip(table.columns, table.units):
+        key = column_key(compiler, variant)
+        # cpu_time per iteration, in the column's time_unit (Ir for cachegrind).
+        fieldnames.append(f"{key}_{unit.lower()}op")
+        fieldnames += [f"{key}_mad", f"{key}_cv", f"{key}_n"]
+        fieldnames += [f"{key}_{name}" for name in counters]
+        if with_ipc:
+            fieldnames.append(f"{key}_ipc")
 
     with open(output, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
-        writer.writeheader()
-        for row in rows:
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        for r, (bench, section, name) in enumerate(table.keys):
+            row = [benches[bench], sections[section], names[name]]
+            for ci in range(len(table.columns)):
+                stats = table.stats(r, ci)
+                if stats is None:
+                    row += [""] * (4 + len(counters) + with_ipc)
+                    continue
+                row += [
+                    stats.median,
+                    "" if math.isnan(stats.mad) else stats.mad,
+                    "" if math.isnan(stats.cv) else stats.cv,
+                    stats.n,
+                ]
+                values = {name: table.counter(r, ci, name) for name in counters}
+                row += [
+                    "" if values[name] is None else values[name] for name in counters
+                ]
+                if with_ipc:
+                    ipc = ipc_of(values)
+                    row.append("" if ipc is None else ipc)
             writer.writerow(row)
 
 
-def analyze_asm(results_root: Path, output: Path):
+ASM_CACHE_FILENAME = "asm.pkl"
+LOOPS_CACHE_FILENAME = "loops.pkl"
+
+MIX_LABELS = {
+    "fma": "FMA",
+    "vector": "Vector",
+    "scalar": "Scalar",
+    "memory": "Mem",
+    "shuffle": "Shuffle",
+    "other": "Other",
+}
+
+
+def load_cached(asm_files: list[Path], scan, cache: ResultCache | None = None):
+    """Scan each .asm file once, reusing cached results for unchanged files."""
+    results = []
+    for asm_file in asm_files:
+        r = cache.get(asm_file) if cache is not None else None
+        if r is None:
+            r = scan(asm_file)
+            if cache is not None:
+                cache.put(asm_file, r)
+        results.append(r)
+    if cache is not None:
+        cache.save()
+    return results
+
+
+def load_asm_metrics(
+    asm_files: list[Path], cache: ResultCache | None = None
+) -> list[AsmMetrics]:
+    return load_cached(asm_files, scan_asm_file, cache)
+
+
+def scan_loops_file(path: Path) -> ListingLoops:
+    with open(path) as f:
+        return analyze_loops(iter_functions(line.rstrip("\n") for line in f))
+
+
+def load_listing_loops(
+    asm_files: list[Path], cache: ResultCache | None = None
+) -> list[ListingLoops]:
+    return load_cached(asm_files, scan_loops_file, cache)
+
+
+def step_cell(check: UnrollCheck) -> str:
+    """Induction step, with the element size when it advances a byte pointer."""
+    if not check.step:
+        return "—"
+    if check.unit and check.unit > 1:
+        return f"{check.step} ({check.unit} B elements)"
+    return str(check.step)
+
+
+def unroll_warning(check: UnrollCheck) -> str | None:
+    """Report line for a main loop or tail that does not match Unroll."""
+    if check.observed is None:
+        return f"no main loop found, requested Unroll={check.requested}"
+    if not check.ok:
+        how = (
+            f"steps by {step_cell(check)}"
+            if check.step
+            else f"has ~{check.copies} copies"
+        )
+        return f"main loop {how}, requested Unroll={check.requested}"
+    if check.tail_blocks is not None and check.tail_blocks > check.tail_limit:
+        return (
+            f"tail has {check.tail_blocks} blocks, at most {check.tail_limit} "
+            f"expected for Unroll={check.requested}"
+        )
+    return None
+
+
+def pressure_warning(profile: LoopProfile, budget: int) -> str | None:
+    """Report line for a loop whose accumulators fill the vector registers."""
+    needed = profile.registers_needed()
+    if needed is None or needed < budget:
+        return None
+    return (
+        f"{profile.chains} accumulators need {needed} of {budget} vector "
+        "registers, leaving none for temporaries"
+    )
+
+
+def write_unroll_section(f, reports):
+    f.write("## Unroll Verification\n\n")
+    f.write(
+        "Functions that hand their remainder to `tail_binary*_noinline<Unroll>`. "
+        "Step is the constant the main loop adds to the register its exit "
+        "test reads. A pointer must advance by Unroll elements of the size "
+        "its loop's typed arithmetic (ps/pd, packed integer suffixes, "
+        "AArch64 arrangements) or loads imply; an index register by Unroll. "
+        "Copies is the callback copy estimate from repeated "
+        "mnemonics, Unroll divided by the lane count when vectorized. Tail "
+        "blocks counts straight-line blocks of at least one callback copy "
+        "in the tail function against the log2(Unroll) it should emit.\n\n"
+    )
+    checked = any(loops.unroll for *_, loops in reports)
+    if checked:
+        f.write(
+            "| Compiler | Variant | Bench | Function | Unroll | Loop insns "
+            "| Step | Copies | Tail blocks | Verdict |\n"
+        )
+        f.write(
+            "|:---------|:--------|:------|:---------|-------:|-----------:"
+            "|-----:|-------:|------------:|:--------|\n"
+        )
+    for compiler, variant, bench, _, loops in reports:
+        for c in loops.unroll:
+            name = c.function.replace("|", "\\|")
+            tail = "—" if c.tail_blocks is None else f"{c.tail_blocks}/{c.tail_limit}"
+            verdict = "ok" if unroll_warning(c) is None else "**mismatch**"
+            f.write(
+                f"| {compiler} | {variant} | {bench} | `{name}` | {c.requested} "
+                f"| {c.insns or '—'} | {step_cell(c)} | {c.copies} | {tail} "
+                f"| {verdict} |\n"
+            )
+    if checked:
+        f.write("\n")
+    unchecked = [
+        (compiler, variant, bench, tail)
+        for compiler, variant, bench, _, loops in reports
+        for tail in loops.unchecked_tails
+    ]
+    if unchecked:
+        f.write(
+            "Tail functions without a caller in their listing (the caller was "
+            "not extracted, or a clone inlined the call), left unverified:\n\n"
+        )
+        for compiler, variant, bench, tail in unchecked:
+            f.write(f"- {compiler} {variant} / {bench}: `{tail}`\n")
+        f.write("\n")
+
+
+def write_pressure_section(f, reports):
+    f.write("## Hot Loop Register Pressure\n\n")
+    f.write(
+        "Innermost loops of the hot functions. Stack ld/st counts memory "
+        "accesses relative to the stack or frame pointer inside the loop, the "
+        "usual sign of spilled registers. The mix columns classify every "
+        "instruction; Mem counts data moves, while arithmetic with a folded "
+        "memory operand stays arithmetic. Accs is the accumulator count of a "
+        "function's main loop (Unroll for dynamic_for, N for multi_acc<N>), "
+        "and Regs the vector registers they fill at the loop's lane count "
+        "against the register file of the listing's widest ISA.\n\n"
+    )
+    mix = " | ".join(MIX_LABELS[c] for c in MIX_CLASSES)
+    f.write(
+        "| Compiler | Variant | Bench | Function | Loop | Insns | Stack ld/st "
+        f"| {mix} | Accs | Regs |\n"
+    )
+    f.write(
+        "|:---------|:--------|:------|:---------|:-----|------:|-----------:|"
+        + "----:|" * len(MIX_CLASSES)
+        + "-----:|:-----|\n"
+    )
+    for compiler, variant, bench, _, loops in reports:
+        budget = loops.register_budget
+        for p in loops.loops:
+            name = p.function.replace("|", "\\|")
+            needed = p.registers_needed()
+            regs = "—" if needed is None else f"{needed}/{budget}"
+            if pressure_warning(p, budget):
+                regs = f"**{regs}**"
+            counts = " | ".join(str(p.mix[c]) for c in MIX_CLASSES)
+            f.write(
+                f"| {compiler} | {variant} | {bench} | `{name}` | {p.address:#x} "
+                f"| {p.insns} | {p.stack_loads}/{p.stack_stores} | {counts} "
+                f"| {p.chains or '—'} | {regs} |\n"
+            )
+    f.write("\n")
+
+
+def analyze_asm(results_root: Path, output: Path, use_cache: bool = True):
     """Analyze assembly files for vectorization and inlining quality."""
     output.parent.mkdir(parents=True, exist_ok=True)
 
-    asm_files = sorted(results_root.rglob("asm/*.asm"))
+    asm_files = []
+    for asm_file in sorted(results_root.rglob("asm/*.asm")):
+        parts = asm_file.relative_to(results_root).parts
+        if len(parts) < 4:
+            continue
+        asm_files.append(asm_file)
+
     if not asm_files:
         output.write_text("# ASM Analysis\n\nNo assembly files found.\n")
         return
 
+    cache = None
+    if use_cache:
+        cache = ResultCache(results_root, ASM_CACHE_FILENAME, METRICS_VERSION)
+    metrics = load_asm_metrics(asm_files, cache)
+    cache = None
+    if use_cache:
+        cache = ResultCache(results_root, LOOPS_CACHE_FILENAME, LOOPS_VERSION)
+    listing_loops = load_listing_loops(asm_files, cache)
+
+    reports = []
+    for asm_file, m, loops in zip(asm_files, metrics, listing_loops):
+        parts = asm_file.relative_to(results_root).parts
+        bench = asm_file.stem.replace("_hot", "")
+        reports.append((parts[0], parts[1], bench, m, loops))
+
     with open(output, "w") as f:
         f.write("# Assembly Analysis\n\n")
 
-        for asm_file in asm_files:
-            parts = asm_file.relative_to(results_root).parts
-            if len(parts) < 4:
-                continue
-            compiler = parts[0]
-            variant = parts[1]
-            bench = asm_file.stem.replace("_hot", "")
-
-            text = asm_file.read_text()
-
-            ymm_count = len(re.findall(r"%ymm\d+", text))
-            xmm_count = len(re.findall(r"%xmm\d+", text))
-            zmm_count = len(re.findall(r"%zmm\d+", text))
-            call_count = len(re.findall(r"\bcall\b", text, re.IGNORECASE))
-
-            vectorized = ymm_count > 0 or zmm_count > 0
-            vec_width = (
-                "512-bit"
-                if zmm_count > 0
-                else (
-                    "256-bit"
-                    if ymm_count > 0
-                    else ("128-bit" if xmm_count > 0 else "scalar")
-                )
-            )
+        for compiler, variant, bench, m, loops in reports:
+            vec_width = f"{m.vec_bits}-bit" if m.vec_bits != "scalar" else "scalar"
+            top = ", ".join(f"{name} ({n})" for name, n in m.mnemonics.most_common(5))
 
             f.write(f"## {compiler} {variant} / {bench}\n\n")
             f.write(f"- Vector width: **{vec_width}**\n")
-            f.write(
-                f"- Register usage: zmm={zmm_count}, ymm={ymm_count}, xmm={xmm_count}\n"
-            )
-            f.write(f"- Call instructions: {call_count}\n")
-            if not vectorized and (
+            f.write(f"- Register usage: zmm={m.zmm}, ymm={m.ymm}, xmm={m.xmm}\n")
+            f.write(f"- Call instructions: {m.calls}\n")
+            f.write(f"- Instructions: {m.instructions} ({m.bytes} bytes)\n")
+            if top:
+                f.write(f"- Top mnemonics: {top}\n")
+            if not m.vectorized and (
                 "saxpy" in bench.lower() or "compiler_comparison" in bench.lower()
             ):
                 f.write("- **WARNING: saxpy probe may not be vectorized**\n")
+            if loops.unroll:
+                ok = sum(1 for c in loops.unroll if unroll_warning(c) is None)
+                f.write(f"- Unroll checks: {ok}/{len(loops.unroll)} match\n")
+            if loops.loops:
+                loads = sum(p.stack_loads for p in loops.loops)
+                stores = sum(p.stack_stores for p in loops.loops)
+                f.write(
+                    f"- Hot loops: {len(loops.loops)}, stack loads/stores "
+                    f"{loads}/{stores}, {loops.register_budget} vector registers "
+                    f"({loops.isa})\n"
+                )
+            for check in loops.unroll:
+                if warning := unroll_warning(check):
+                    f.write(f"- **WARNING: `{check.function}`: {warning}**\n")
+            for tail in loops.unchecked_tails:
+                f.write(
+                    f"- **WARNING: no caller of `{tail}` in the listing; "
+                    "its unroll is not verified**\n"
+                )
+            for profile in loops.loops:
+                if warning := pressure_warning(profile, loops.register_budget):
+                    f.write(f"- **WARNING: `{profile.function}`: {warning}**\n")
             f.write("\n")
 
         f.write("## Summary\n\n")
-        f.write("| Compiler | Variant | Bench | Vec Width | Calls |\n")
-        f.write("|:---------|:--------|:------|:----------|------:|\n")
-
-        for asm_file in asm_files:
-            parts = asm_file.relative_to(results_root).parts
-            if len(parts) < 4:
-                continue
-            compiler = parts[0]
-            variant = parts[1]
-            bench = asm_file.stem.replace("_hot", "")
-
-            text = asm_file.read_text()
-            ymm = len(re.findall(r"%ymm\d+", text))
-            xmm = len(re.findall(r"%xmm\d+", text))
-            zmm = len(re.findall(r"%zmm\d+", text))
-            calls = len(re.findall(r"\bcall\b", text, re.IGNORECASE))
-            vec = (
-                "512"
-                if zmm > 0
-                else ("256" if ymm > 0 else ("128" if xmm > 0 else "scalar"))
-            )
+        f.write("| Compiler | Variant | Bench | Vec Width | Calls | Insns | Bytes |\n")
+        f.write("|:---------|:--------|:------|:----------|------:|------:|------:|\n")
 
-            f.write(f"| {compiler} | {variant} | {bench} | {vec} | {calls} |\n")
+        for compiler, variant, bench, m, _ in reports:
+            f.write(
+                f"| {compiler} | {variant} | {bench} | {m.vec_bits} | {m.calls} "
+                f"| {m.instructions} | {m.bytes} |\n"
+            )
 
         f.write("\n")
 
+        if any(loops.unroll or loops.unchecked_tails for *_, loops in reports):
+            write_unroll_section(f, reports)
+        if any(loops.loops for *_, loops in reports):
+            write_pressure_section(f, reports)
+
+
+def write_reports(
+    store: ResultStore,
+    results_root: Path,
+    output_md: Path,
+    output_csv: Path,
+    asm_md: Path,
+    use_cache: bool = True,
+):
+    """Write the Markdown/CSV comparison tables and the ASM analysis."""
+    if len(store):
+        table = build_comparison_table(store)
+        write_markdown(store, table, output_md)
+        write_csv(store, table, output_csv)
+        print(f"Wrote {output_md} ({len(table.keys)} rows)")
+        print(f"Wrote {output_csv}")
+    else:
+        print("Warning: no benchmark JSON data found", file=sys.stderr)
+
+    analyze_asm(results_root, asm_md, use_cache=use_cache)
+    print(f"Wrote {asm_md}")
+
 
 def main():
     parser = argparse.ArgumentParser(description="Aggregate benchmark results")
-    parser.add_argument(
-        "--results-root", default="results", help="Root directory of results"
-    )
+    add_load_arguments(parser)
     parser.add_argument("--output-md", default="results/summary/bench_comparison.md")
     parser.add_argument("--output-csv", default="results/summary/bench_comparison.csv")
     parser.add_argument("--asm-md", default="results/summary/asm_analysis.md")
     args = parser.parse_args()
 
-    results_root = Path(args.results_root)
-    if not results_root.exists():
-        print(f"Error: results root not found: {results_root}", file=sys.stderr)
-        sys.exit(1)
-
-    data = load_results(results_root)
-    if data:
-        columns, rows = build_comparison_table(data)
-        write_markdown(columns, rows, Path(args.output_md))
-        write_csv(columns, rows, Path(args.output_csv))
-        print(f"Wrote {args.output_md} ({len(rows)} rows)")
-        print(f"Wrote {args.output_csv}")
-    else:
-        print("Warning: no benchmark JSON data found", file=sys.stderr)
-
-    analyze_asm(results_root, Path(args.asm_md))
-    print(f"Wrote {args.asm_md}")
+    store = load_from_args(args)
+    write_reports(
+        store,
+        Path(args.results_root),
+        output_md=Path(args.output_md),
+        output_csv=Path(args.output_csv),
+        asm_md=Path(args.asm_md),
+        use_cache=not args.no_cache,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""Normalized diff of hot-path assembly between two builds.
+
+Usage:
+    python3 scripts/asm_diff.py OLD NEW [--output asm_diff.md] [--details 10]
+
+OLD and NEW are two *_hot.asm files, two asm/ directories (for example
+results/gcc-14/default/asm and results/gcc-15/default/asm), or two results
+trees from different commits; directories are paired by relative path.
+
+Listings are normalized before comparison so that layout changes alone do
+not show up as differences: addresses, encodings and nops are dropped,
+branch targets inside a function become labels L0, L1, ... in order of
+first use, calls name their callee, RIP-relative displacements are erased,
+and registers are renamed in order of first use (%g0, %g1 for general
+purpose, %v0, %v1 for vector registers, keeping the operand width).
+Functions are matched by demangled name, and the report ranks them by the
+number of edits between their normalized instruction sequences.
+"""
+
+import argparse
+import difflib
+import re
+import sys
+from pathlib import Path
+from typing import NamedTuple
+
+from asm_loops import (
+    X86_LEGACY_GPRS,
+    X86_NUMBERED_GPR_RE,
+    Instruction,
+    parse_instructions,
+    signed_immediate,
+)
+from extract_asm import iter_functions
+
+# Unrenamed x86-64 registers: stack/instruction pointers and segments.
+FIXED_REGISTERS = frozenset({"rsp", "esp", "rip", "fs", "gs"})
+
+X86_REG_RE = re.compile(r"%([a-z][a-z0-9]*)")
+X86_VEC_RE = re.compile(r"([xyz])mm(\d+)$")
+AARCH64_REG_RE = re.compile(r"\b([xwvqdshb])(\d+)\b")
+# Address operand that objdump annotated with a symbol.
+ADDRESS_RE = re.compile(r"(?:0x)?[0-9a-f]+$")
+# GNU objdump prints hex displacements, llvm-objdump signed decimal.
+RIP_RELATIVE_RE = re.compile(r"-?(?:0x[0-9a-f]+|\d+)\(%rip\)")
+
+# GNU objdump and llvm-objdump print the same x86 instruction differently:
+# "lea 0x0(,%rax,4),%rdx" vs "leaq (,%rax,4), %rdx". Numbers become signed decimal,
+# zero displacements and unit scales are dropped, and the size suffix is
+# dropped from mnemonics whose operand size the registers already imply.
+HEX_RE = re.compile(r"(?<![\w.])(-?)0x([0-9a-f]+)")
+ZERO_DISPLACEMENT_RE = re.compile(r"(?<![\w)])0\(")
+UNIT_SCALE_RE = re.compile(r",1\)")
+SIZED_MNEMONICS = frozenset(
+    {"mov", "add", "sub", "adc", "sbb", "cmp", "test", "lea", "and", "or", "xor"}
+    | {"inc", "dec", "neg", "not", "shl", "shr", "sar", "sal", "rol", "ror"}
+    | {"imul", "push", "pop", "xchg", "bt", "call", "ret", "jmp"}
+)
+CLONE_SUFFIX_RE = re.compile(r"\s*\[clone [^\]]*\]")
+
+
+class FunctionDiff(NamedTuple):
+    name: str
+    old: list[str]
+    new: list[str]
+    edits: int
+    similarity: float
+
+
+def signed_number(m: re.Match) -> str:
+    """Decimal value of a hex literal; all-ones-prefixed values become negative."""
+    return f"{m.group(1)}{signed_immediate(int(m.group(2), 16))}"
+
+
+def x86_gpr(reg: str) -> tuple[str, str] | None:
+    """(architectural register, width suffix) of an x86-64 GPR name."""
+    if reg in X86_LEGACY_GPRS:
+        if reg.startswith("r"):
+            width = "q"
+        elif reg.startswith("e"):
+            width = "d"
+        elif reg.endswith(("l", "h")):
+            width = "b"
+        else:
+            width = "w"
+        return X86_LEGACY_GPRS[reg], width
+    if m := X86_NUMBERED_GPR_RE.match(reg):
+        base = f"r{m.group(1)}"
+        return base, reg.removeprefix(base) or "q"
+    return None
+
+
+class Normalizer:
+    """Canonical text of one function's instructions."""
+
+    def __init__(self):
+        self.labels: dict[int, str] = {}
+        self.registers: dict[str, str] = {}
+
+    def register(self, arch_reg: str, kind: str) -> str:
+        key = f"{kind}:{arch_reg}"
+        if key not in self.registers:
+            count = sum(1 for k in self.registers if k.startswith(kind + ":"))
+            self.registers[key] = f"{kind}{count}"
+        return self.registers[key]
+
+    def x86_register(self, m: re.Match) -> str:
+        reg = m.group(1)
+        if reg in FIXED_REGISTERS:
+            return f"%{reg}"
+        if vec := X86_VEC_RE.match(reg):
+            return f"%{vec.group(1)}{self.register(vec.group(2), 'v')}"
+        if gpr := x86_gpr(reg):
+            return f"%{self.register(gpr[0], 'g')}{gpr[1]}"
+        return f"%{reg}"
+
+    def aarch64_register(self, m: re.Match) -> str:
+        kind = "g" if m.group(1) in "xw" else "v"
+        return f"{m.group(1)}{self.register(m.group(2), kind)}"
+
+    def instruction(self, insn: Instruction, local: set[int]) -> str:
+        operands = insn.code
+        target = insn.target
+        if target is not None and target in local:
+            label = self.labels.setdefault(target, f"L{len(self.labels)}")
+            operands = ADDRESS_RE.sub(label, operands)
+        elif insn.symbol is not None:
+            # Calls and references outside the function keep only the symbol.
+            operands = ADDRESS_RE.sub(f"<{insn.symbol}>", operands)
+        mnemonic = insn.mnemonic
+        if insn.aarch64:
+            operands = AARCH64_REG_RE.sub(self.aarch64_register, operands)
+        else:
+            operands = RIP_RELATIVE_RE.sub("[rip]", operands)
+            operands = X86_REG_RE.sub(self.x86_register, operands)
+            code, symbol, rest = operands.partition("<")
+            code = HEX_RE.sub(signed_number, code)
+            code = ZERO_DISPLACEMENT_RE.sub("(", code.replace(", ", ","))
+            operands = UNIT_SCALE_RE.sub(")", code) + symbol + rest
+            if mnemonic[:-1] in SIZED_MNEMONICS and mnemonic[-1] in "bwlq":
+                mnemonic = mnemonic[:-1]
+        return f"{mnemonic} {operands}".strip()
+
+
+def is_padding(insn: Instruction) -> bool:
+    """nop, or the two-byte "xchg %ax,%ax" nop (66 90)."""
+    if insn.mnemonic.startswith("nop"):
+        return True
+    return insn.mnemonic in ("xchg", "xchgw") and (
+        insn.operands.replace(" ", "") == "%ax,%ax"
+    )
+
+
+def normalize(body: str) -> list[str]:
+    """Normalized instruction lines of one function body."""
+    insns = [i for i in parse_instructions(body.splitlines()) if not is_padding(i)]
+    local = {i.address for i in insns}
+    normalizer = Normalizer()
+    return [normalizer.instruction(i, local) for i in insns]
+
+
+def read_listing(path: Path) -> dict[str, list[str]]:
+    """Normalized functions of a listing by name; repeated names get #2, #3."""
+    functions: dict[str, list[str]] = {}
+    with open(path) as f:
+        for name, body in iter_functions(line.rstrip("\n") for line in f):
+            key = CLONE_SUFFIX_RE.sub("", name)
+            n = 1
+            while (f"{key} #{n}" if n > 1 else key) in functions:
+                n += 1
+            functions[f"{key} #{n}" if n > 1 else key] = normalize(body)
+    return functions
+
+
+def diff_functions(old: list[str], new: list[str]) -> tuple[int, float]:
+    """(instructions inserted, deleted or replaced, similarity ratio)."""
+    matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+    edits = sum(
+        max(i2 - i1, j2 - j1)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    )
+    return edits, matcher.ratio()
+
+
+def diff_listings(old: Path, new: Path) -> list[FunctionDiff]:
+    """Every function of either listing, most edited first."""
+    old_fns = read_listing(old)
+    new_fns = read_listing(new)
+    diffs = []
+    for name in dict.fromkeys([*old_fns, *new_fns]):
+        a = old_fns.get(name, [])
+        b = new_fns.get(name, [])
+        edits, similarity = diff_functions(a, b)
+        diffs.append(FunctionDiff(name, a, b, edits, similarity))
+    diffs.sort(key=lambda d: (-d.edits, d.similarity, d.name))
+    return diffs
+
+
+def pair_listings(old: Path, new: Path) -> list[tuple[str, Path, Path]]:
+    """(label, old file, new file) of every listing present on both sides."""
+    if old.is_file() and new.is_file():
+        return [(new.name, old, new)]
+    if not (old.is_dir() and new.is_dir()):
+        print("Error: expected two files or two directories", file=sys.stderr)
+        sys.exit(1)
+    old_files = {p.relative_to(old): p for p in old.rglob("*_hot.asm")}
+    new_files = {p.relative_to(new): p for p in new.rglob("*_hot.asm")}
+    for rel in sorted(old_files.keys() ^ new_files.keys()):
+        side = "old" if rel in old_files else "new"
+        print(f"Warning: {rel} only in the {side} tree", file=sys.stderr)
+    return [
+        (str(rel), old_files[rel], new_files[rel])
+        for rel in sorted(old_files.keys() & new_files.keys())
+    ]
+
+
+def write_report(pairs, details: int, out):
+    out.write("# Assembly Diff\n\n")
+    if not pairs:
+        out.write("No listings to compare.\n")
+        return
+    for label, old, new in pairs:
+        diffs = diff_listings(old, new)
+        changed = [d for d in diffs if d.edits]
+        out.write(f"## {label}\n\n")
+        out.write(f"{len(changed)} of {len(diffs)} functions changed.\n\n")
+        if not changed:
+            continue
+        out.write("| Function | Old insns | New insns | Edits | Similarity |\n")
+        out.write("|:---------|----------:|----------:|------:|-----------:|\n")
+        for d in changed:
+            name = d.name.replace("|", "\\|")
+            out.write(
+                f"| `{name}` | {len(d.old) or '—'} | {len(d.new) or '—'} "
+                f"| {d.edits} | {d.similarity:.0%} |\n"
+            )
+        out.write("\n")
+        for d in changed[:details]:
+            out.write(f"### `{d.name}`\n\n```diff\n")
+            lines = difflib.unified_diff(d.old, d.new, "old", "new", n=3, lineterm="")
+            out.write("\n".join(lines))
+            out.write("\n```\n\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Diff normalized hot-path assembly of two builds"
+    )
+    parser.add_argument("old", help="Listing, asm/ directory or results tree")
+    parser.add_argument("new", help="Listing, asm/ directory or results tree")
+    parser.add_argument("--output", help="Markdown report (default: stdout)")
+    parser.add_argument(
+        "--details",
+        type=int,
+        default=10,
+        help="Most changed functions per listing shown as a diff (default: 10)",
+    )
+    args = parser.parse_args()
+
+    pairs = pair_listings(Path(args.old), Path(args.new))
+    if args.output is None:
+        write_report(pairs, args.details, sys.stdout)
+        return
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        write_report(pairs, args.details, f)
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,828 @@
+"""Instruction parsing and loop detection for extracted hot-path assembly.
+
+Works on the objdump/llvm-objdump listings written by extract_asm.py, for
+x86-64 (AT&T syntax) and AArch64. Each function is split into basic
+blocks; a loop is a natural loop of that control-flow graph, closed by a
+branch back to a block that dominates it.
+"""
+
+import math
+import re
+from collections.abc import Iterable
+from typing import NamedTuple
+
+# "  11e0:\tc5 fa 10 0c 07 \tvmovss (%rdi,%rax,1),%xmm1" (x86-64, byte pairs)
+# "  4011a6:\t54000041 \tb.ne\t4011b0 <f+0x10>" (AArch64, one 32-bit word)
+INSN_LINE_RE = re.compile(
+    r"^\s*([0-9a-f]+):\s+((?:[0-9a-f]{2} )*[0-9a-f]{2}|[0-9a-f]{8}) *"
+    r"(?:\t\s*(\S+)\s*(.*))?$"
+)
+# Direct target as the last operand, once the annotation is removed.
+TARGET_RE = re.compile(r"(?:^|[\s,])(?:0x)?([0-9a-f]+)$")
+# Trailing "<symbol+0x30>" annotation; demangled names may nest <>.
+ANNOTATION_RE = re.compile(r"\s*<(.*?)(?:\+0x[0-9a-f]+)?>$")
+# objdump comments: x86 "   # 4040 <sym>", AArch64 "   // #16".
+X86_COMMENT_RE = re.compile(r"\s+#\s")
+AARCH64_COMMENT_RE = re.compile(r"\s+//")
+
+# Bump when analyze_loops() results change (fields, unroll verdicts, lane
+# counts), so cached loop analyses are recomputed.
+LOOPS_VERSION = 2
+
+# Tokens objdump prints ahead of the real mnemonic (see asm_metrics.PREFIXES).
+PREFIXES = frozenset(
+    {"lock", "rep", "repe", "repz", "repne", "repnz", "notrack", "bnd"}
+    | {"data16", "addr32", "cs", "ds", "es", "ss", "fs", "gs"}
+)
+
+AARCH64_BRANCHES = frozenset({"b", "cbz", "cbnz", "tbz", "tbnz"})
+
+# x86-64 registers by architectural register; sub-registers map to their
+# 64-bit name, vector registers to their number.
+X86_REG_RE = re.compile(r"%([a-z0-9]+)")
+X86_VEC_RE = re.compile(r"[xyz]mm(\d+)$")
+X86_LEGACY_GPRS = {
+    reg: base
+    for base in ("ax", "bx", "cx", "dx", "si", "di", "bp")
+    for reg in (f"r{base}", f"e{base}", base, base[0] + "l", base[0] + "h")
+}
+X86_LEGACY_GPRS.update({"sil": "si", "dil": "di", "bpl": "bp"})
+X86_NUMBERED_GPR_RE = re.compile(r"r(\d+)[dwb]?$")
+
+AARCH64_GPR_RE = re.compile(r"\b[xw](\d+)\b")
+AARCH64_VEC_RE = re.compile(r"\b[vqdshbz](\d+)\b")
+
+# Noinline remainder of dynamic_for; its first template argument is Unroll.
+TAIL_RE = re.compile(r"tail_binary\w*_noinline<(\d+)")
+# Constant register updates: "add $0x8,%rax", "lea 0x8(%rax),%rax",
+# "add x1, x1, #0x8".
+X86_ADD_IMMEDIATE_RE = re.compile(r"^\$(-?(?:0x)?[0-9a-f]+),%(\w+)$")
+X86_LEA_IMMEDIATE_RE = re.compile(r"^(-?(?:0x)?[0-9a-f]+)\(%(\w+)\),%(\w+)$")
+AARCH64_ADD_IMMEDIATE_RE = re.compile(r"^([xw]\d+), ([xw]\d+), #(-?(?:0x)?[0-9a-f]+)")
+AARCH64_REG_RE = re.compile(r"\b[xw]\d+\b")
+# A copy count must explain this share of a loop's mnemonics.
+COPY_COVERAGE = 0.6
+# Element type spelled by typed arithmetic: x86 packed integer suffixes
+# (vpaddd, vpmullq), x86 floating point ps/pd/ss/sd (bitwise andps/xorps
+# are type-agnostic idioms), AArch64 arrangements (v0.4s) and scalar FP
+# registers (fadd d0, d0, d1).
+X86_INT_TYPE_RE = re.compile(
+    r"^v?p(?:add|sub|mull|mulu|maxs|maxu|mins|minu|abs|sll|srl|sra|cmpeq|cmpgt)"
+    r"([bwdq])$"
+)
+X86_FP_TYPE_RE = re.compile(r"^v?(?!(?:and|andn|or|xor)p[sd]$)[a-z0-9]*[ps]([sd])$")
+AARCH64_LANES_RE = re.compile(r"\bv\d+\.(\d+)([bhsd])\b")
+AARCH64_SCALAR_FP_RE = re.compile(r"^([hsd])\d+\b")
+X86_INT_BYTES = {"b": 1, "w": 2, "d": 4, "q": 8}
+X86_FP_BYTES = {"s": 4, "d": 8}
+AARCH64_BYTES = {"b": 1, "h": 2, "s": 4, "d": 8}
+X86_VECTOR_BYTES = {"x": 16, "y": 32, "z": 64}
+# Memory operands: "0x10(%rdi,%rax,8)", "[x1, x2, lsl #3]", "[x1, #16]".
+X86_MEMORY_RE = re.compile(r"\((%\w+)?(?:,(%\w+)(?:,(\d))?)?\)")
+AARCH64_MEMORY_RE = re.compile(r"\[(\w+)(?:, (\w+)(?:, (?:lsl|[su]xt[wx]) #(\d+))?)?")
+# Tail blocks shorter than this are branch glue, not callback copies.
+MIN_TAIL_BLOCK = 8
+
+# Vector register file per poet::instruction_set, as cpu_info.hpp reports it:
+# (vector registers, vector width in bits).
+REGISTER_BUDGETS = {
+    "sse4_2": (16, 128),
+    "avx2": (16, 256),
+    "avx_512": (32, 512),
+    "arm_neon": (32, 128),
+}
+# Hand-unrolled kernels name their accumulator count: hand_unrolled_multi_acc<8ul>.
+MULTI_ACC_RE = re.compile(r"multi_acc<(\d+)")
+
+# Instruction mix classes, in report order.
+MIX_CLASSES = ("fma", "vector", "scalar", "memory", "shuffle", "other")
+FMA_RE = re.compile(r"^(?:vfn?m(?:add|sub)|fml[as]$|fn?m(?:add|sub)$)")
+X86_SHUFFLE_RE = re.compile(
+    r"^v?(?:p?shuf|p?unpck|perm|p?blend|p?broadcast|insert|extract|p?extr|p?insr"
+    r"|palignr|movddup|movs[hl]dup|movhlps|movlhps|pack|valign)"
+)
+X86_MOVE_RE = re.compile(r"^(?:v?mov|v?lddqu|v?p?gather|v?p?scatter)")
+X86_PUSH_POP_RE = re.compile(r"^(push|pop)[wlq]?$")
+X86_CONTROL_RE = re.compile(
+    r"^(?:j|call|ret|cmp[bwlq]?$|test|nop|ud2|endbr|vzero|v?u?comis)"
+)
+AARCH64_SHUFFLE_RE = re.compile(r"^(?:zip|uzp|trn|ext$|dup|ins$|tbl|tbx|rev)")
+AARCH64_CONTROL_RE = re.compile(
+    r"^(?:b$|b\.|bl|br|cb|tb|ret|cmp|cmn|tst|fcmp|mov|nop|adrp?$|prfm|csel|cset)"
+)
+AARCH64_ARRANGEMENT_RE = re.compile(r"\bv\d+\.\d*[bhsd]\b")
+X86_STACK_RE = re.compile(r"\(%[re]?(?:sp|bp)\b")
+AARCH64_STACK_RE = re.compile(r"\[(?:sp|x29)\b")
+
+
+class Instruction(NamedTuple):
+    address: int
+    mnemonic: str
+    operands: str
+    aarch64: bool = False
+
+    @property
+    def code(self) -> str:
+        """Operands without objdump's comment and trailing symbol annotation."""
+        comment = AARCH64_COMMENT_RE if self.aarch64 else X86_COMMENT_RE
+        return ANNOTATION_RE.sub("", comment.split(self.operands)[0]).strip()
+
+    @property
+    def symbol(self) -> str | None:
+        """Symbol of the referenced address (callee, branch target), if printed."""
+        comment = AARCH64_COMMENT_RE if self.aarch64 else X86_COMMENT_RE
+        m = ANNOTATION_RE.search(comment.split(self.operands)[0])
+        return m.group(1) if m else None
+
+    @property
+    def is_branch(self) -> bool:
+        """Jump or conditional branch (calls are not branches)."""
+        m = self.mnemonic
+        return m.startswith("j") or m.split(".")[0] in AARCH64_BRANCHES
+
+    @property
+    def is_unconditional(self) -> bool:
+        return self.mnemonic in ("jmp", "jmpq", "b")
+
+    @property
+    def is_return(self) -> bool:
+        return self.mnemonic.startswith("ret") or self.mnemonic == "ud2"
+
+    @property
+    def target(self) -> int | None:
+        """Address of a direct branch target, None for indirect branches."""
+        if not self.is_branch:
+            return None
+        m = TARGET_RE.search(self.code)
+        return int(m.group(1), 16) if m else None
+
+
+def parse_instructions(lines: Iterable[str]) -> list[Instruction]:
+    """Instructions of a listing; labels, comments and byte-only lines are skipped."""
+    insns = []
+    for line in lines:
+        m = INSN_LINE_RE.match(line)
+        if not m or m.group(3) is None:
+            continue
+        address, encoding, mnemonic, operands = m.groups()
+        while mnemonic in PREFIXES and operands:
+            mnemonic, _, operands = operands.partition(" ")
+            operands = operands.lstrip()
+        aarch64 = " " not in encoding and len(encoding) == 8
+        insns.append(Instruction(int(address, 16), mnemonic, operands.strip(), aarch64))
+    return insns
+
+
+class BasicBlock(NamedTuple):
+    """Instructions [start, end) of a function; successors are block indices."""
+
+    start: int
+    end: int
+    successors: tuple[int, ...]
+
+
+class NaturalLoop(NamedTuple):
+    header: int
+    # Blocks with a back edge to the header.
+    latches: tuple[int, ...]
+    blocks: frozenset[int]
+
+
+def basic_blocks(insns: list[Instruction]) -> list[BasicBlock]:
+    """Control-flow graph of one function.
+
+    Blocks start at the entry, at every local branch target and after every
+    branch or return. Indirect jumps and jumps out of the function (tail
+    calls) have no successors; calls fall through.
+    """
+    index = {insn.address: i for i, insn in enumerate(insns)}
+    leaders = {0} if insns else set()
+    for i, insn in enumerate(insns):
+        if insn.is_branch or insn.is_return:
+            if i + 1 < len(insns):
+                leaders.add(i + 1)
+            if insn.target in index:
+                leaders.add(index[insn.target])
+    starts = sorted(leaders)
+    block_of = {start: b for b, start in enumerate(starts)}
+
+    blocks = []
+    for b, start in enumerate(starts):
+        end = starts[b + 1] if b + 1 < len(starts) else len(insns)
+        last = insns[end - 1]
+        successors = []
+        if last.is_branch and last.target in index:
+            successors.append(block_of[index[last.target]])
+        if not (last.is_return or last.is_unconditional) and end < len(insns):
+            successors.append(b + 1)
+        blocks.append(BasicBlock(start, end, tuple(dict.fromkeys(successors))))
+    return blocks
+
+
+def predecessors(blocks: list[BasicBlock]) -> list[list[int]]:
+    preds: list[list[int]] = [[] for _ in blocks]
+    for b, block in enumerate(blocks):
+        for s in block.successors:
+            preds[s].append(b)
+    return preds
+
+
+def dominators(blocks: list[BasicBlock]) -> dict[int, set[int]]:
+    """Dominator sets of the blocks reachable from the entry."""
+    if not blocks:
+        return {}
+    order = []
+    seen = {0}
+    stack = [0]
+    while stack:
+        b = stack.pop()
+        order.append(b)
+        for s in blocks[b].successors:
+            if s not in seen:
+                seen.add(s)
+                stack.append(s)
+    order.sort()
+    preds = predecessors(blocks)
+
+    dom = {b: set(seen) for b in order}
+    dom[0] = {0}
+    changed = True
+    while changed:
+        changed = False
+        for b in order[1:]:
+            new = set.intersection(*(dom[p] for p in preds[b] if p in dom)) | {b}
+            if new != dom[b]:
+                dom[b] = new
+                changed = True
+    return dom
+
+
+def natural_loops(blocks: list[BasicBlock]) -> list[NaturalLoop]:
+    """Loops closed by a back edge (a branch to a dominating block).
+
+    Back edges to the same header form one loop. Irreducible cycles, which
+    have no dominating header, are not reported.
+    """
+    dom = dominators(blocks)
+    preds = predecessors(blocks)
+    bodies: dict[int, set[int]] = {}
+    latches: dict[int, list[int]] = {}
+    for b in dom:
+        for header in blocks[b].successors:
+            if header not in dom[b]:
+                continue
+            body = bodies.setdefault(header, {header})
+            latches.setdefault(header, []).append(b)
+            stack = [b]
+            while stack:
+                node = stack.pop()
+                if node not in body:
+                    body.add(node)
+                    stack.extend(preds[node])
+    return [
+        NaturalLoop(header, tuple(latches[header]), frozenset(bodies[header]))
+        for header in sorted(bodies)
+    ]
+
+
+def loop_body(
+    insns: list[Instruction], blocks: list[BasicBlock], loop: NaturalLoop
+) -> list[Instruction]:
+    """Instructions of a loop in address order, starting at the header."""
+    return [
+        insns[i]
+        for b in sorted(loop.blocks, key=lambda b: (b < loop.header, b))
+        for i in range(blocks[b].start, blocks[b].end)
+    ]
+
+
+def innermost(loops: list[NaturalLoop]) -> list[NaturalLoop]:
+    """Loops that contain no other loop's header."""
+    headers = {loop.header for loop in loops}
+    return [loop for loop in loops if headers & loop.blocks == {loop.header}]
+
+
+def innermost_loops(insns: list[Instruction]) -> list[list[Instruction]]:
+    """Bodies of loops that contain no other loop, in address order."""
+    blocks = basic_blocks(insns)
+    return [loop_body(insns, blocks, loop) for loop in innermost(natural_loops(blocks))]
+
+
+def gpr(reg: str, aarch64: bool = False) -> str | None:
+    """Architectural general-purpose register of a register name."""
+    if aarch64:
+        return reg[1:] if AARCH64_REG_RE.fullmatch(reg) else None
+    if reg in X86_LEGACY_GPRS:
+        return X86_LEGACY_GPRS[reg]
+    if m := X86_NUMBERED_GPR_RE.match(reg):
+        return f"r{m.group(1)}"
+    return None
+
+
+def signed_immediate(value: int) -> int:
+    """Two's-complement value of an immediate objdump printed unsigned."""
+    if 1 << 31 <= value < 1 << 32:
+        return value - (1 << 32)
+    if value >= 1 << 63:
+        return value - (1 << 64)
+    return value
+
+
+def registers_used(insns: Iterable[Instruction]) -> tuple[set[str], set[str]]:
+    """Architectural (general-purpose, vector) registers named by instructions.
+
+    The stack and instruction pointers are not counted.
+    """
+    gprs: set[str] = set()
+    vecs: set[str] = set()
+    for insn in insns:
+        if insn.aarch64:
+            gprs.update(AARCH64_GPR_RE.findall(insn.operands))
+            vecs.update(AARCH64_VEC_RE.findall(insn.operands))
+            continue
+        for reg in X86_REG_RE.findall(insn.operands):
+            if m := X86_VEC_RE.match(reg):
+                vecs.add(m.group(1))
+            elif base := gpr(reg):
+                gprs.add(base)
+    return gprs, vecs
+
+
+class UnrollCheck(NamedTuple):
+    """Main loop of a function that hands its remainder to tail_binary<Unroll>."""
+
+    function: str
+    requested: int
+    # Instructions in the main loop; 0 when no loop was found.
+    insns: int
+    # Constant the loop adds to the register its latch tests.
+    step: int | None
+    # Bytes that register advances per element: 1 when it counts elements
+    # (a scaled index or a plain counter), the loop's element size when it
+    # is a byte pointer, None when that size cannot be read from the loop.
+    unit: int | None
+    # Largest count that divides most of the loop's mnemonic counts.
+    copies: int
+    # Straight-line blocks of the tail function, None when not in the listing.
+    tail_blocks: int | None
+
+    @property
+    def observed(self) -> int | None:
+        if not self.insns:
+            return None
+        return self.step if self.step is not None else self.copies
+
+    @property
+    def ok(self) -> bool:
+        if self.step is not None:
+            return self.step == self.requested * (self.unit or 1)
+        return self.insns > 0 and self.copies == self.requested
+
+    @property
+    def tail_limit(self) -> int:
+        """Blocks tail_binary emits at most: one per bit of Unroll - 1."""
+        return max(1, (self.requested - 1).bit_length())
+
+
+def constant_update(insn: Instruction) -> tuple[str, int] | None:
+    """(register, constant) of an instruction adding a constant to a register."""
+    code = insn.code
+    if insn.aarch64:
+        m = AARCH64_ADD_IMMEDIATE_RE.match(code)
+        if insn.mnemonic not in ("add", "adds", "sub", "subs") or not m:
+            return None
+        if gpr(m.group(1), True) != gpr(m.group(2), True):
+            return None
+        value = int(m.group(3), 0)
+        return gpr(m.group(1), True), -value if insn.mnemonic[0] == "s" else value
+    op = insn.mnemonic.rstrip("bwlq") if len(insn.mnemonic) > 3 else insn.mnemonic
+    if op in ("inc", "dec") and code.startswith("%"):
+        return gpr(code[1:]), 1 if op == "inc" else -1
+    if op in ("add", "sub") and (m := X86_ADD_IMMEDIATE_RE.match(code)):
+        value = signed_immediate(int(m.group(1), 0))
+        return gpr(m.group(2)), -value if op == "sub" else value
+    if op == "lea" and (m := X86_LEA_IMMEDIATE_RE.match(code)):
+        if gpr(m.group(2)) == gpr(m.group(3)):
+            return gpr(m.group(2)), signed_immediate(int(m.group(1), 0))
+    return None
+
+
+def induction(
+    body: list[Instruction], latch: list[Instruction]
+) -> tuple[str, int] | None:
+    """(register, constant) the loop adds per iteration to a register its
+    exit test reads.
+
+    The exit test is the latch's branch and the instruction setting its flags.
+    With several candidate registers the smallest step wins.
+    """
+    tested: set[str] = set()
+    for insn in latch[-2:]:
+        if insn.aarch64:
+            regs = AARCH64_REG_RE.findall(insn.code)
+        else:
+            regs = X86_REG_RE.findall(insn.code)
+        tested.update(gpr(reg, insn.aarch64) for reg in regs)
+    tested.discard(None)
+
+    totals: dict[str, int] = {}
+    for insn in body:
+        update = constant_update(insn)
+        if update is not None and update[0] in tested:
+            totals[update[0]] = totals.get(update[0], 0) + update[1]
+    steps = [(abs(v), reg) for reg, v in totals.items() if v]
+    if not steps:
+        return None
+    step, reg = min(steps)
+    return reg, step
+
+
+def element_bytes(insn: Instruction) -> int | None:
+    """Bytes per element of a typed arithmetic instruction, from its spelling."""
+    if insn.aarch64:
+        if m := AARCH64_LANES_RE.search(insn.code):
+            return AARCH64_BYTES[m.group(2)]
+        if insn.mnemonic.startswith("f") and (
+            m := AARCH64_SCALAR_FP_RE.match(insn.code)
+        ):
+            return AARCH64_BYTES[m.group(1)]
+        return None
+    if m := X86_INT_TYPE_RE.match(insn.mnemonic):
+        return X86_INT_BYTES[m.group(1)]
+    if m := X86_FP_TYPE_RE.match(insn.mnemonic):
+        return X86_FP_BYTES[m.group(1)]
+    return None
+
+
+def x86_gpr_bytes(reg: str) -> int | None:
+    """Width of an x86-64 general-purpose register name."""
+    if reg in X86_LEGACY_GPRS:
+        if reg.startswith("r"):
+            return 8
+        if reg.startswith("e"):
+            return 4
+        return 1 if reg.endswith(("l", "h")) else 2
+    if m := X86_NUMBERED_GPR_RE.match(reg):
+        return {"d": 4, "w": 2, "b": 1}.get(reg[len(m.group(1)) + 1 :], 8)
+    return None
+
+
+def loop_element_bytes(body: list[Instruction], pointer: str) -> int | None:
+    """Element size of the data a loop processes.
+
+    The most common size among its typed arithmetic; for untyped scalar
+    integer code, the width of the registers loaded from or stored to
+    through ``pointer``.
+    """
+    sizes: dict[int, int] = {}
+    for insn in body:
+        if instruction_class(insn) in ("fma", "vector", "scalar"):
+            if size := element_bytes(insn):
+                sizes[size] = sizes.get(size, 0) + 1
+    if sizes:
+        return max(sizes, key=sizes.get)
+    for insn in body:
+        if insn.aarch64 or constant_update(insn) is not None:
+            continue
+        for m in X86_MEMORY_RE.finditer(insn.code):
+            if pointer not in {gpr(r[1:]) for r in m.group(1, 2) if r}:
+                continue
+            others = [
+                x86_gpr_bytes(reg)
+                for reg in X86_REG_RE.findall(insn.code.replace(m.group(0), ""))
+            ]
+            if widths := [w for w in others if w]:
+                return max(widths)
+    return None
+
+
+def step_unit(body: list[Instruction], reg: str) -> int | None:
+    """Bytes the induction register advances per element (see UnrollCheck.unit).
+
+    A register used as a scaled index, or in no address at all, counts
+    elements; a base register or an unscaled index counts bytes.
+    """
+    pointer = False
+    for insn in body:
+        if insn.aarch64:
+            operands = AARCH64_MEMORY_RE.findall(insn.code)
+            matches = [
+                (gpr(base, True), gpr(index, True) if index else None, shift)
+                for base, index, shift in operands
+            ]
+            scaled = [index for _, index, shift in matches if shift and shift != "0"]
+        else:
+            matches = [
+                (
+                    gpr(base[1:]) if base else None,
+                    gpr(index[1:]) if index else None,
+                    scale,
+                )
+                for base, index, scale in X86_MEMORY_RE.findall(insn.code)
+            ]
+            scaled = [index for _, index, scale in matches if scale not in ("", "1")]
+        if reg in scaled:
+            return 1
+        pointer = pointer or any(reg in (base, index) for base, index, _ in matches)
+    return loop_element_bytes(body, reg) if pointer else 1
+
+
+def callback_copies(body: list[Instruction]) -> int:
+    """Largest d such that mnemonics occurring a multiple of d times cover most
+    of the loop; a vectorized loop shows Unroll divided by its lane count."""
+    counts: dict[str, int] = {}
+    for insn in body:
+        if not (insn.is_branch or insn.mnemonic.startswith(("cmp", "test"))):
+            counts[insn.mnemonic] = counts.get(insn.mnemonic, 0) + 1
+    total = sum(counts.values())
+    for d in range(max(counts.values(), default=1), 1, -1):
+        covered = sum(c for c in counts.values() if c % d == 0)
+        if covered >= COPY_COVERAGE * total:
+            return d
+    return 1
+
+
+def straight_blocks(insns: list[Instruction], min_size: int) -> int:
+    """Basic blocks with at least min_size instructions, ignoring nops."""
+    return sum(
+        1
+        for block in basic_blocks(insns)
+        if sum(
+            1
+            for i in insns[block.start : block.end]
+            if not i.mnemonic.startswith("nop") and i.operands != "%ax,%ax"
+        )
+        >= min_size
+    )
+
+
+def tail_callee(insns: list[Instruction]) -> str | None:
+    """tail_binary*_noinline function a function calls or tail-jumps to."""
+    for insn in insns:
+        symbol = insn.symbol
+        if symbol and TAIL_RE.search(symbol):
+            if insn.is_branch or insn.mnemonic.startswith(("call", "bl")):
+                return symbol
+    return None
+
+
+def main_loop(
+    insns: list[Instruction],
+) -> tuple[list[Instruction], list[Instruction]] | None:
+    """(body, latch block) of a function's largest innermost loop."""
+    blocks = basic_blocks(insns)
+    candidates = [
+        (loop_body(insns, blocks, loop), loop)
+        for loop in innermost(natural_loops(blocks))
+    ]
+    if not candidates:
+        return None
+    body, loop = max(candidates, key=lambda c: len(c[0]))
+    latch = blocks[loop.latches[-1]]
+    return body, insns[latch.start : latch.end]
+
+
+def unroll_checks(parsed: list[tuple[str, list[Instruction]]]) -> list[UnrollCheck]:
+    """Check every function calling tail_binary*_noinline<Unroll>.
+
+    The main loop is the function's largest innermost loop. Its observed
+    unroll is the induction step, in elements of the size the loop's
+    addressing and typed arithmetic imply, or the callback copy estimate
+    when no step is found. Tail blocks are counted in the matching tail function
+    of the same listing, taking blocks of at least one callback copy.
+    """
+    tails = {name: insns for name, insns in parsed if TAIL_RE.search(name)}
+
+    checks = []
+    for name, insns in parsed:
+        if name in tails or (callee := tail_callee(insns)) is None:
+            continue
+        requested = int(TAIL_RE.search(callee).group(1))
+
+        body: list[Instruction] = []
+        step = unit = None
+        if found := main_loop(insns):
+            body, latch = found
+            if counter := induction(body, latch):
+                step = counter[1]
+                unit = step_unit(body, counter[0])
+
+        tail_blocks = None
+        if callee in tails:
+            min_size = max(MIN_TAIL_BLOCK, len(body) // requested)
+            tail_blocks = straight_blocks(tails[callee], min_size)
+        checks.append(
+            UnrollCheck(
+                name,
+                requested,
+                len(body),
+                step,
+                unit,
+                callback_copies(body),
+                tail_blocks,
+            )
+        )
+    return checks
+
+
+def uncalled_tails(parsed: list[tuple[str, list[Instruction]]]) -> list[str]:
+    """Tail functions of a listing that none of its other functions call.
+
+    Their caller was not extracted, or is a clone (constprop, isra) that
+    inlined the tail, so unroll_checks() has nothing to verify for them.
+    """
+    called = {tail_callee(insns) for name, insns in parsed if not TAIL_RE.search(name)}
+    return [name for name, _ in parsed if TAIL_RE.search(name) and name not in called]
+
+
+class LoopProfile(NamedTuple):
+    """Register pressure and instruction mix of one innermost loop."""
+
+    function: str
+    address: int
+    insns: int
+    stack_loads: int
+    stack_stores: int
+    # Instructions per MIX_CLASSES entry.
+    mix: dict[str, int]
+    # Elements per packed arithmetic instruction; 1 for a scalar loop.
+    lanes: int
+    # Independent accumulators the loop carries, when the function names them.
+    chains: int | None
+
+    def registers_needed(self) -> int | None:
+        """Vector registers the accumulators alone occupy."""
+        if self.chains is None:
+            return None
+        return math.ceil(self.chains / self.lanes)
+
+
+class ListingLoops(NamedTuple):
+    """Loop analysis of one extracted listing."""
+
+    # poet::instruction_set the listing was built for, from its registers.
+    isa: str
+    unroll: list[UnrollCheck]
+    loops: list[LoopProfile]
+    # tail_binary*_noinline functions no function of the listing calls, so
+    # the unroll of their dynamic_for went unchecked.
+    unchecked_tails: list[str]
+
+    @property
+    def register_budget(self) -> int:
+        return REGISTER_BUDGETS[self.isa][0]
+
+
+def instruction_class(insn: Instruction) -> str:
+    """MIX_CLASSES entry of an instruction.
+
+    Memory counts data moves to or from memory; arithmetic with a folded
+    memory operand stays arithmetic.
+    """
+    m = insn.mnemonic
+    if FMA_RE.match(m):
+        return "fma"
+    if insn.aarch64:
+        if m.startswith(("ld", "st")):
+            return "memory"
+        if AARCH64_SHUFFLE_RE.match(m):
+            return "shuffle"
+        if AARCH64_CONTROL_RE.match(m):
+            return "other"
+        return "vector" if AARCH64_ARRANGEMENT_RE.search(insn.code) else "scalar"
+    if X86_CONTROL_RE.match(m):
+        return "other"
+    if X86_SHUFFLE_RE.match(m):
+        return "shuffle"
+    if X86_PUSH_POP_RE.match(m):
+        return "memory"
+    if X86_MOVE_RE.match(m):
+        return "memory" if "(" in insn.code else "other"
+    if "mm" not in insn.code or m.endswith(("ss", "sd")) or "sd2" in m or "ss2" in m:
+        return "scalar"
+    return "vector"
+
+
+def stack_accesses(insns: Iterable[Instruction]) -> tuple[int, int]:
+    """(loads, stores) of stack-pointer or frame-pointer relative memory."""
+    loads = stores = 0
+    for insn in insns:
+        code = insn.code
+        if insn.aarch64:
+            if AARCH64_STACK_RE.search(code) and insn.mnemonic.startswith(("ld", "st")):
+                if insn.mnemonic.startswith("ld"):
+                    loads += 1
+                else:
+                    stores += 1
+            continue
+        if m := X86_PUSH_POP_RE.match(insn.mnemonic):
+            if m.group(1) == "push":
+                stores += 1
+            else:
+                loads += 1
+        elif X86_STACK_RE.search(code) and not insn.mnemonic.startswith(("lea", "nop")):
+            # AT&T syntax: a memory destination is the last operand.
+            last = code[code.rfind(",", 0, code.rfind("(")) + 1 :]
+            if code.endswith(")") and X86_STACK_RE.search(last):
+                stores += 1
+            else:
+                loads += 1
+    return loads, stores
+
+
+def packed_lanes(insns: Iterable[Instruction]) -> int:
+    """Most elements one packed arithmetic instruction of the loop handles.
+
+    Register width over element size on x86 (8 floats or 4 doubles in a
+    ymm), the arrangement's lane count on AArch64 (v0.4s, v0.2d).
+    """
+    lanes = 1
+    for insn in insns:
+        if instruction_class(insn) not in ("fma", "vector"):
+            continue
+        if insn.aarch64:
+            if m := AARCH64_LANES_RE.search(insn.code):
+                lanes = max(lanes, int(m.group(1)))
+            continue
+        if insn.mnemonic.endswith(("ss", "sd")):
+            continue
+        size = element_bytes(insn)
+        width = max(
+            (n for k, n in X86_VECTOR_BYTES.items() if f"%{k}mm" in insn.code),
+            default=0,
+        )
+        if size and width:
+            lanes = max(lanes, width // size)
+    return lanes
+
+
+def listing_isa(parsed: list[tuple[str, list[Instruction]]]) -> str:
+    """Widest register file the listing uses, as a REGISTER_BUDGETS key.
+
+    A build may target a wider ISA than its code uses (AVX-512 compilers
+    often prefer 256-bit vectors), so this is a lower bound.
+    """
+    isa = "sse4_2"
+    for _, insns in parsed:
+        for insn in insns:
+            if insn.aarch64:
+                return "arm_neon"
+            if "%zmm" in insn.operands:
+                return "avx_512"
+            if "%ymm" in insn.operands:
+                isa = "avx2"
+    return isa
+
+
+def loop_profiles(
+    parsed: list[tuple[str, list[Instruction]]], checks: list[UnrollCheck]
+) -> list[LoopProfile]:
+    """Profiles of every innermost loop, in listing order.
+
+    The accumulator count is known for a function's main loop (its largest
+    innermost loop): Unroll for a dynamic_for caller, one accumulator per
+    lane, or N for a *multi_acc<N> kernel.
+    """
+    requested = {check.function: check.requested for check in checks}
+    profiles = []
+    for name, insns in parsed:
+        if TAIL_RE.search(name):
+            continue
+        blocks = basic_blocks(insns)
+        bodies = [
+            loop_body(insns, blocks, loop) for loop in innermost(natural_loops(blocks))
+        ]
+        chains = requested.get(name)
+        if chains is None and (m := MULTI_ACC_RE.search(name)):
+            chains = int(m.group(1))
+        main = max(bodies, key=len) if bodies else None
+        for body in bodies:
+            mix = dict.fromkeys(MIX_CLASSES, 0)
+            for insn in body:
+                mix[instruction_class(insn)] += 1
+            loads, stores = stack_accesses(body)
+            profiles.append(
+                LoopProfile(
+                    name,
+                    body[0].address,
+                    len(body),
+                    loads,
+                    stores,
+                    mix,
+                    packed_lanes(body),
+                    chains if body is main else None,
+                )
+            )
+    return profiles
+
+
+def analyze_loops(functions: Iterable[tuple[str, str]]) -> ListingLoops:
+    """Unroll checks and loop profiles of a listing's (name, body) functions."""
+    parsed = [(name, parse_instructions(text.splitlines())) for name, text in functions]
+    checks = unroll_checks(parsed)
+    return ListingLoops(
+        listing_isa(parsed),
+        checks,
+        loop_profiles(parsed, checks),
+        uncalled_tails(parsed),
+    )
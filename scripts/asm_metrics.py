@@ -0,0 +1,114 @@
+"""Single-pass metrics for extracted hot-path assembly (*_hot.asm).
+
+Each objdump/llvm-objdump instruction line is matched once and yields its
+encoded bytes, its mnemonic and the vector registers named in its operands.
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TextIO
+
+# "  4011a6:\te8 85 fe ff ff       \tcall   401030 <foo@plt>" (GNU objdump)
+# "  4011a6: e8 85 fe ff ff        \tcallq  0x401030 <foo@plt>" (llvm-objdump)
+# Long GNU encodings continue on a bytes-only line with no instruction text.
+INSN_RE = re.compile(
+    r"^\s*[0-9a-f]+:\s+((?:[0-9a-f]{2} )*[0-9a-f]{2}) *(?:\t\s*(\S+)\s*(.*))?$"
+)
+VEC_REG_RE = re.compile(r"%([xyz])mm\d+")
+
+# Bump when AsmMetrics or what scan_asm_file counts changes, so cached
+# metrics are recomputed.
+METRICS_VERSION = 1
+
+# Tokens objdump prints ahead of the real mnemonic.
+PREFIXES = frozenset(
+    {
+        "lock",
+        "rep",
+        "repe",
+        "repz",
+        "repne",
+        "repnz",
+        "notrack",
+        "bnd",
+        "data16",
+        "addr32",
+        "cs",
+        "ds",
+        "es",
+        "ss",
+        "fs",
+        "gs",
+    }
+)
+
+
+@dataclass
+class AsmMetrics:
+    """Counts gathered from one assembly listing."""
+
+    zmm: int = 0
+    ymm: int = 0
+    xmm: int = 0
+    calls: int = 0
+    instructions: int = 0
+    bytes: int = 0
+    mnemonics: Counter = field(default_factory=Counter)
+
+    @property
+    def vectorized(self) -> bool:
+        return self.ymm > 0 or self.zmm > 0
+
+    @property
+    def vec_bits(self) -> str:
+        """Widest vector register class used: '512', '256', '128' or 'scalar'."""
+        if self.zmm > 0:
+            return "512"
+        if self.ymm > 0:
+            return "256"
+        if self.xmm > 0:
+            return "128"
+        return "scalar"
+
+    def add_line(self, line: str):
+        """Account for one line of disassembly (non-instruction lines are ignored)."""
+        m = INSN_RE.match(line)
+        if not m:
+            return
+        encoding, mnemonic, operands = m.groups()
+        self.bytes += (len(encoding) + 1) // 3
+        if mnemonic is None:
+            return
+
+        if mnemonic in PREFIXES and operands:
+            mnemonic, _, operands = operands.partition(" ")
+            while mnemonic in PREFIXES and operands:
+                mnemonic, _, operands = operands.lstrip().partition(" ")
+        self.instructions += 1
+        self.mnemonics[mnemonic] += 1
+        if mnemonic.startswith("call"):
+            self.calls += 1
+
+        if "mm" in operands:
+            for reg in VEC_REG_RE.findall(operands):
+                if reg == "y":
+                    self.ymm += 1
+                elif reg == "x":
+                    self.xmm += 1
+                else:
+                    self.zmm += 1
+
+
+def scan_asm(stream: TextIO) -> AsmMetrics:
+    """Compute AsmMetrics from a text stream in one pass."""
+    metrics = AsmMetrics()
+    for line in stream:
+        metrics.add_line(line)
+    return metrics
+
+
+def scan_asm_file(path: Path) -> AsmMetrics:
+    with open(path) as f:
+        return scan_asm(f)
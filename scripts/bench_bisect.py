@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""Bisect a benchmark slowdown between two commits.
+
+Usage:
+    python3 scripts/bench_bisect.py GOOD BAD --target poet_dynamic_for_bench
+                                    --filter 'Multi-acc/dynamic_for_optimal_accs'
+                                    [--threshold 5] [--repetitions 10]
+                                    [--compiler gcc-14] [--variant default]
+                                    [--cache-dir build_bisect]
+
+Every tested commit is checked out in a git worktree and only --target is
+built, with the same CMake flags as bench_matrix.py. It is then run with
+--benchmark_filter and --benchmark_repetitions, pinned to one CPU. A commit
+counts as bad when a benchmark is slower than on GOOD by more than
+--threshold percent and a Mann-Whitney U test finds the difference
+significant. The first-parent history between GOOD and BAD is searched for
+the first bad commit. Commits that fail to build are skipped.
+
+Build directories are cached per commit under <cache-dir>/builds/<sha>, so
+repeated bisections over the same range rebuild nothing.
+"""
+
+import argparse
+import random
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+from bench_matrix import PROJECT_ROOT, CpuPlan, bench_binary, cmake_configure_args
+from compare_bench import Comparison, compare_samples
+from result_cache import read_benchmarks
+from result_store import ResultStore
+
+
+def git(*args: str) -> str:
+    proc = subprocess.run(
+        ["git", "-C", str(PROJECT_ROOT), *args],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return proc.stdout.strip()
+
+
+class Bisector:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.cache_dir = Path(args.cache_dir).resolve()
+        self.cpus = CpuPlan(args.run_cpu)
+        self.rng = random.Random(0)
+
+    def build(self, sha: str) -> Path | None:
+        """Binary of --target at sha, building it on a cache miss."""
+        args = self.args
+        build_dir = self.cache_dir / "builds" / sha / f"{args.compiler}-{args.variant}"
+        binary = bench_binary(build_dir, args.target, args.variant)
+        if binary.is_file():
+            return binary
+
+        worktree = self.cache_dir / "worktrees" / sha
+        if not worktree.exists():
+            git("worktree", "add", "--detach", str(worktree), sha)
+        try:
+            print(f"  Building {args.target} at {sha[:12]}")
+            configure = cmake_configure_args(
+                args.compiler, args.variant, build_dir, source_dir=worktree
+            )
+            build = self.cpus.build_prefix() + [
+                "cmake",
+                "--build",
+                str(build_dir),
+                "--target",
+                args.target,
+                f"-j{self.cpus.build_parallelism}",
+            ]
+            for cmd in (configure, build):
+                proc = subprocess.run(
+                    cmd,
+                    check=False,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    text=True,
+                )
+                if proc.returncode != 0:
+                    tail = "\n".join(proc.stdout.splitlines()[-5:])
+                    print(f"  WARNING: build failed at {sha[:12]}\n{tail}")
+                    return None
+        finally:
+            if not args.keep_worktrees:
+                git("worktree", "remove", "--force", str(worktree))
+
+        binary = bench_binary(build_dir, args.target, args.variant)
+        return binary if binary.is_file() else None
+
+    def measure(self, sha: str) -> dict[tuple, list[float]] | None:
+        """Repetition samples of every benchmark matching --filter at sha."""
+        binary = self.build(sha)
+        if binary is None:
+            return None
+        json_file = self.cache_dir / "results" / f"{sha}.json"
+        json_file.parent.mkdir(parents=True, exist_ok=True)
+        # A crashed run must not fall back on an earlier bisection's file.
+        json_file.unlink(missing_ok=True)
+        cmd = self.cpus.run_prefix() + [
+            str(binary),
+            f"--benchmark_filter={self.args.filter}",
+            f"--benchmark_repetitions={self.args.repetitions}",
+            "--benchmark_format=json",
+            f"--benchmark_out={json_file}",
+        ]
+        print(f"  Running {self.args.target} at {sha[:12]}")
+        proc = subprocess.run(
+            cmd, check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        if proc.returncode != 0 or not json_file.is_file():
+            print(
+                f"  WARNING: {self.args.target} failed at {sha[:12]} "
+                f"(exit code {proc.returncode})"
+            )
+            return None
+        store = ResultStore()
+        store.extend(
+            self.args.target,
+            self.args.compiler,
+            self.args.variant,
+            read_benchmarks(json_file),
+        )
+        return store.samples() or None
+
+    def worst(
+        self, reference: dict[tuple, list[float]], samples: dict[tuple, list[float]]
+    ) -> Comparison | None:
+        """Largest slowdown of samples against reference, over shared benchmarks."""
+        comparisons = [
+            compare_samples(key, reference[key], samples[key], self.args, self.rng)
+            for key in reference
+            if key in samples
+        ]
+        return max(comparisons, key=lambda c: c.delta, default=None)
+
+
+def describe(c: Comparison) -> str:
+    return f"{c.key[2]}: {c.delta:+.1%} (p={c.p_value:.3f}, {c.verdict})"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Bisect a benchmark slowdown between two commits"
+    )
+    parser.add_argument("good", help="Commit without the slowdown")
+    parser.add_argument("bad", help="Commit with the slowdown")
+    parser.add_argument("--target", required=True, help="Benchmark CMake target")
+    parser.add_argument(
+        "--filter", required=True, help="--benchmark_filter selecting the benchmark"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=5.0,
+        help="Slowdown (percent) that makes a commit bad (default: 5)",
+    )
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--repetitions", type=int, default=10)
+    parser.add_argument("--compiler", default="gcc-14")
+    parser.add_argument("--variant", default="default", choices=["default", "native"])
+    parser.add_argument("--cache-dir", default="build_bisect")
+    parser.add_argument("--run-cpu", type=int, help="CPU benchmark runs are pinned to")
+    parser.add_argument("--keep-worktrees", action="store_true")
+    args = parser.parse_args()
+    # compare_samples options.
+    args.confidence = 0.95
+    args.resamples = 1000
+
+    if shutil.which("cmake") is None:
+        print("Error: cmake not found", file=sys.stderr)
+        sys.exit(1)
+    good = git("rev-parse", args.good)
+    bad = git("rev-parse", args.bad)
+    commits = [good] + git(
+        "rev-list", "--first-parent", "--reverse", f"{good}..{bad}"
+    ).split()
+    if len(commits) < 2 or commits[-1] != bad:
+        print(f"Error: {args.bad} is not a descendant of {args.good}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Bisecting {len(commits) - 1} commits ({good[:12]}..{bad[:12]})")
+
+    bisector = Bisector(args)
+    reference = bisector.measure(good)
+    if reference is None:
+        print(f"Error: no results for {args.filter} at {good[:12]}", file=sys.stderr)
+        sys.exit(1)
+    bad_samples = bisector.measure(bad)
+    worst = bisector.worst(reference, bad_samples or {})
+    if worst is None or worst.verdict != "regression":
+        detail = describe(worst) if worst else "no shared benchmarks"
+        print(
+            f"Error: {bad[:12]} is not slower than {good[:12]}: {detail}",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    print(f"  {bad[:12]} bad — {describe(worst)}")
+
+    # Invariant: commits[lo] is good, commits[hi] is bad.
+    lo, hi = 0, len(commits) - 1
+    skipped = []
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        sha = commits[mid]
+        samples = bisector.measure(sha)
+        if samples is None:
+            print(f"  {sha[:12]} skipped (no results)")
+            skipped.append(commits.pop(mid))
+            hi -= 1
+            continue
+        worst = bisector.worst(reference, samples)
+        if worst is not None and worst.verdict == "regression":
+            print(f"  {sha[:12]} bad — {describe(worst)}")
+            hi = mid
+        else:
+            print(f"  {sha[:12]} good — {describe(worst) if worst else 'no results'}")
+            lo = mid
+
+    first_bad = commits[hi]
+    print(f"\nFirst bad commit: {first_bad}")
+    print(git("show", "-s", "--format=%h %an %ad%n    %s", first_bad))
+    if skipped:
+        # A skipped commit right before first_bad may be the real culprit.
+        print(f"Untestable commits skipped: {' '.join(s[:12] for s in skipped)}")
+
+
+if __name__ == "__main__":
+    main()
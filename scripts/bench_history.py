@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""SQLite history of benchmark results across commits.
+
+Appends every Google Benchmark JSON file of a results tree
+(results/<compiler>/<variant>/<bench>.json) to a local SQLite database,
+together with its provenance: commit SHA and time, compiler version,
+compiler flags and the Google Benchmark ``context`` block.
+
+Usage:
+    python3 scripts/bench_history.py ingest [results] [--db bench_history.db]
+                                     [--commit SHA] [--repo .] [--flags F]
+    python3 scripts/bench_history.py query --bench dispatch_optimization_bench
+                                     --name 'Horner/N=16_dispatched'
+                                     --compiler clang-21 [--variant default]
+                                     [--last 200] [--db bench_history.db]
+
+Provenance is taken, in order, from the command line, from the poet_*
+keys bench_matrix.py records in the JSON context (--benchmark_context),
+and from git for the commit. Ingesting the same commit/compiler/variant/
+bench again replaces the earlier run.
+"""
+
+import argparse
+import json
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from result_store import split_bench_name
+
+DEFAULT_DB = "bench_history.db"
+
+# Bump together with a migration when the schema changes.
+SCHEMA_VERSION = 1
+
+# Context keys written by bench_matrix.py via --benchmark_context.
+CONTEXT_COMMIT = "poet_commit"
+CONTEXT_COMPILER_VERSION = "poet_compiler_version"
+CONTEXT_FLAGS = "poet_cxx_flags"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS commits (
+    sha          TEXT PRIMARY KEY,
+    commit_time  INTEGER,
+    subject      TEXT
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id                INTEGER PRIMARY KEY,
+    commit_sha        TEXT NOT NULL REFERENCES commits(sha),
+    compiler          TEXT NOT NULL,
+    variant           TEXT NOT NULL,
+    bench             TEXT NOT NULL,
+    compiler_version  TEXT,
+    flags             TEXT,
+    context           TEXT,
+    ingested_at       INTEGER NOT NULL,
+    UNIQUE (commit_sha, compiler, variant, bench)
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id       INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    bench        TEXT NOT NULL,
+    name         TEXT NOT NULL,
+    compiler     TEXT NOT NULL,
+    variant      TEXT NOT NULL,
+    commit_sha   TEXT NOT NULL,
+    commit_time  INTEGER,
+    aggregate    TEXT NOT NULL DEFAULT '',
+    repetition   INTEGER,
+    cpu_time     REAL,
+    real_time    REAL,
+    iterations   INTEGER,
+    time_unit    TEXT
+);
+CREATE INDEX IF NOT EXISTS results_by_commit
+    ON results (bench, name, compiler, variant, commit_sha);
+CREATE INDEX IF NOT EXISTS results_by_time
+    ON results (bench, name, compiler, variant, commit_time);
+CREATE INDEX IF NOT EXISTS results_by_run ON results (run_id);
+CREATE INDEX IF NOT EXISTS commits_by_time ON commits (commit_time);
+"""
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    """Open (creating if needed) the history database."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    # The database is committed to git as a single file, so keep the
+    # rollback journal; this also folds back a WAL left by older versions.
+    conn.execute("PRAGMA journal_mode = DELETE")
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version not in (0, SCHEMA_VERSION):
+        print(
+            f"Error: {db_path} has schema version {version}, expected {SCHEMA_VERSION}",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    conn.executescript(SCHEMA)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return conn
+
+
+# ── Provenance ───────────────────────────────────────────────────────────────
+
+
+def git_output(repo: Path, *args: str) -> str | None:
+    try:
+        proc = subprocess.run(
+            ["git", "-C", str(repo), *args],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return proc.stdout.strip()
+
+
+def commit_info(repo: Path, sha: str) -> tuple[str, int | None, str | None]:
+    """(full sha, commit time, subject) of a commit; unknown parts are None."""
+    out = git_output(repo, "show", "-s", "--format=%H%n%ct%n%s", sha)
+    if not out:
+        return sha, None, None
+    full, ct, subject = (out.split("\n", 2) + ["", ""])[:3]
+    return full, int(ct) if ct.isdigit() else None, subject
+
+
+# ── Ingestion ────────────────────────────────────────────────────────────────
+
+
+def iter_result_files(results_root: Path):
+    """(json_file, compiler, variant) for every result file in the tree."""
+    for json_file in sorted(results_root.rglob("*.json")):
+        parts = json_file.relative_to(results_root).parts
+        if len(parts) < 3 or parts[0].startswith("."):
+            continue
+        yield json_file, parts[0], parts[1]
+
+
+def result_rows(benchmarks: list[dict]):
+    """(name, aggregate, repetition, cpu, real, iterations, unit) per entry."""
+    for entry in benchmarks:
+        section, name = split_bench_name(entry.get("run_name") or entry.get("name", ""))
+        aggregate = ""
+        if entry.get("run_type") == "aggregate":
+            aggregate = entry.get("aggregate_name", "")
+        yield (
+            f"{section}/{name}" if section else name,
+            aggregate,
+            entry.get("repetition_index"),
+            entry.get("cpu_time"),
+            entry.get("real_time"),
+            entry.get("iterations"),
+            entry.get("time_unit"),
+        )
+
+
+def ingest(conn: sqlite3.Connection, results_root: Path, args: argparse.Namespace):
+    """Append every result file under results_root; returns (runs, rows)."""
+    repo = Path(args.repo)
+    commits: dict[str, tuple[str, int | None]] = {}
+    n_runs = n_rows = 0
+
+    with conn:
+        for json_file, compiler, variant in iter_result_files(results_root):
+            try:
+                parsed = json.loads(json_file.read_text())
+            except (json.JSONDecodeError, OSError) as e:
+                print(f"Warning: failed to load {json_file}: {e}", file=sys.stderr)
+                continue
+            context = parsed.get("context", {})
+            benchmarks = parsed.get("benchmarks", [])
+            if not benchmarks:
+                continue
+
+            sha = args.commit or context.get(CONTEXT_COMMIT) or "HEAD"
+            if sha not in commits:
+                full, commit_time, subject = commit_info(repo, sha)
+                conn.execute(
+                    "INSERT INTO commits (sha, commit_time, subject) VALUES (?, ?, ?)"
+                    " ON CONFLICT (sha) DO UPDATE SET"
+                    " commit_time = coalesce(excluded.commit_time, commit_time),"
+                    " subject = coalesce(excluded.subject, subject)",
+                    (full, commit_time, subject),
+                )
+                commits[sha] = (full, commit_time)
+            full, commit_time = commits[sha]
+
+            conn.execute(
+                "DELETE FROM runs WHERE commit_sha = ? AND compiler = ?"
+                " AND variant = ? AND bench = ?",
+                (full, compiler, variant, json_file.stem),
+            )
+            cur = conn.execute(
+                "INSERT INTO runs (commit_sha, compiler, variant, bench,"
+                " compiler_version, flags, context, ingested_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    full,
+                    compiler,
+                    variant,
+                    json_file.stem,
+                    args.compiler_version or context.get(CONTEXT_COMPILER_VERSION),
+                    args.flags or context.get(CONTEXT_FLAGS),
+                    json.dumps(context, sort_keys=True),
+                    int(time.time()),
+                ),
+            )
+            run_id = cur.lastrowid
+            prefix = (run_id, json_file.stem)
+            rows = [
+                prefix + (name, compiler, variant, full, commit_time) + tuple(rest)
+                for name, *rest in result_rows(benchmarks)
+            ]
+            conn.executemany(
+                "INSERT INTO results (run_id, bench, name, compiler, variant,"
+                " commit_sha, commit_time, aggregate, repetition, cpu_time,"
+                " real_time, iterations, time_unit)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            n_runs += 1
+            n_rows += len(rows)
+    return n_runs, n_rows
+
+
+# ── Queries ──────────────────────────────────────────────────────────────────
+
+
+def query_series(
+    conn: sqlite3.Connection,
+    bench: str,
+    name: str,
+    compiler: str,
+    variant: str = "default",
+    last: int | None = None,
+) -> list[tuple[str, int | None, list[float]]]:
+    """Per-commit repetition samples of one benchmark, oldest commit first.
+
+    Returns (commit sha, commit time, cpu_time samples) for the ``last``
+    most recent commits that have results (all commits when None).
+    Aggregate rows are only used for commits without repetition samples.
+    """
+    rows = conn.execute(
+        "SELECT commit_sha, commit_time, aggregate, cpu_time FROM results"
+        " WHERE bench = ? AND name = ? AND compiler = ? AND variant = ?"
+        " ORDER BY commit_time DESC, commit_sha",
+        (bench, name, compiler, variant),
+    )
+    series: dict[str, tuple[int | None, list[float], dict[str, float]]] = {}
+    for sha, commit_time, aggregate, cpu_time in rows:
+        if sha not in series:
+            if last is not None and len(series) >= last:
+                break
+            series[sha] = (commit_time, [], {})
+        if cpu_time is None:
+            continue
+        if aggregate:
+            series[sha][2][aggregate] = cpu_time
+        else:
+            series[sha][1].append(cpu_time)
+
+    out = []
+    for sha, (commit_time, samples, aggregates) in series.items():
+        if not samples and "median" in aggregates:
+            samples = [aggregates["median"]]
+        out.append((sha, commit_time, samples))
+    out.reverse()
+    return out
+
+
+def main_ingest(args: argparse.Namespace):
+    results_root = Path(args.results_root)
+    if not results_root.exists():
+        print(f"Error: results root not found: {results_root}", file=sys.stderr)
+        sys.exit(1)
+    conn = connect(Path(args.db))
+    start = time.perf_counter()
+    n_runs, n_rows = ingest(conn, results_root, args)
+    conn.close()
+    elapsed = time.perf_counter() - start
+    print(f"Ingested {n_runs} runs ({n_rows} rows) into {args.db} in {elapsed:.2f}s")
+
+
+def main_query(args: argparse.Namespace):
+    if not Path(args.db).exists():
+        print(f"Error: database not found: {args.db}", file=sys.stderr)
+        sys.exit(1)
+    conn = connect(Path(args.db))
+    start = time.perf_counter()
+    series = query_series(
+        conn, args.bench, args.name, args.compiler, args.variant, args.last
+    )
+    conn.close()
+    elapsed = time.perf_counter() - start
+
+    print("| Commit | Date | Median (ns) | n |")
+    print("|:-------|:-----|------------:|--:|")
+    for sha, commit_time, samples in series:
+        date = (
+            time.strftime("%Y-%m-%d", time.gmtime(commit_time)) if commit_time else "-"
+        )
+        median = f"{statistics.median(samples):.2f}" if samples else "-"
+        print(f"| {sha[:12]} | {date} | {median} | {len(samples)} |")
+    print(f"\n{len(series)} commits in {elapsed * 1000:.1f} ms", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark history database")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_ingest = sub.add_parser("ingest", help="Append a results tree to the database")
+    p_ingest.add_argument("results_root", nargs="?", default="results")
+    p_ingest.add_argument("--db", default=DEFAULT_DB)
+    p_ingest.add_argument(
+        "--commit", help="Commit the results belong to (default: context, then HEAD)"
+    )
+    p_ingest.add_argument(
+        "--repo", default=".", help="Git repository used to resolve the commit"
+    )
+    p_ingest.add_argument("--compiler-version", help="Override the compiler version")
+    p_ingest.add_argument("--flags", help="Override the recorded compiler flags")
+
+    p_query = sub.add_parser("query", help="Print one benchmark's history")
+    p_query.add_argument("--db", default=DEFAULT_DB)
+    p_query.add_argument("--bench", required=True, help="Result file stem")
+    p_query.add_argument("--name", required=True, help="'Section/name' run name")
+    p_query.add_argument("--compiler", required=True)
+    p_query.add_argument("--variant", default="default")
+    p_query.add_argument("--last", type=int, help="Only the N most recent commits")
+
+    args = parser.parse_args()
+    if args.command == "ingest":
+        main_ingest(args)
+    else:
+        main_query(args)
+
+
+if __name__ == "__main__":
+    main()
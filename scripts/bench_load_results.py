@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Measure poet_bench.load_results wall time against the number of files.
+
+Usage:
+    python3 scripts/bench_load_results.py [--files 10,100,1000] [--jobs 1,4]
+                                          [--entries 200]
+
+Writes synthetic Google Benchmark JSON trees (results/<compiler>/<variant>/
+<bench>.json) into a temporary directory and times load_results on each one
+for every --jobs value. Prints a Markdown table to stdout.
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from poet_bench import COMPILER_ORDER, VARIANT_ORDER, load_results
+
+
+def write_tree(root: Path, n_files: int, n_entries: int):
+    """Write n_files synthetic benchmark JSON files under root."""
+    columns = [(c, v) for c in COMPILER_ORDER for v in VARIANT_ORDER]
+    for i in range(n_files):
+        compiler, variant = columns[i % len(columns)]
+        bench = f"bench_{i // len(columns):05d}"
+        out = root / compiler / variant / f"{bench}.json"
+        out.parent.mkdir(parents=True, exist_ok=True)
+        benchmarks = [
+            {
+                "name": f"Section/entry_{e}/min_time:0.100",
+                "run_name": f"Section/entry_{e}/min_time:0.100",
+                "run_type": "iteration",
+                "iterations": 1000000,
+                "real_time": 1.0 + e * 0.01,
+                "cpu_time": 1.0 + e * 0.01,
+                "time_unit": "ns",
+            }
+            for e in range(n_entries)
+        ]
+        out.write_text(json.dumps({"context": {}, "benchmarks": benchmarks}))
+
+
+def time_load(root: Path, jobs: int, repeat: int) -> float:
+    """Best-of-repeat wall time (seconds) for load_results."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load_results(root, jobs=jobs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark load_results against the number of files"
+    )
+    parser.add_argument(
+        "--files", default="10,100,1000", help="Comma-separated file counts"
+    )
+    parser.add_argument(
+        "--jobs", default="1,4", help="Comma-separated worker counts to compare"
+    )
+    parser.add_argument(
+        "--entries", type=int, default=200, help="Benchmark entries per file"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of repetitions")
+    args = parser.parse_args()
+
+    file_counts = [int(n) for n in args.files.split(",")]
+    job_counts = [int(j) for j in args.jobs.split(",")]
+
+    header = "| Files |" + "".join(f" jobs={j} (s) |" for j in job_counts)
+    sep = "|------:|" + "----------:|" * len(job_counts)
+    print(header)
+    print(sep)
+
+    for n_files in file_counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            write_tree(root, n_files, args.entries)
+            cells = [time_load(root, j, args.repeat) for j in job_counts]
+        print(f"| {n_files} |" + "".join(f" {t:.3f} |" for t in cells))
+
+
+if __name__ == "__main__":
+    main()
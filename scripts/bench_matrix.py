@@ -0,0 +1,637 @@
+#!/usr/bin/env python3
+"""Build and run all POET benchmarks across a compiler/variant matrix.
+
+Usage:
+    python3 scripts/bench_matrix.py                       # all detected compilers
+    POET_COMPILERS="gcc-15 clang-22" python3 scripts/bench_matrix.py
+    python3 scripts/bench_matrix.py --compilers gcc-14 --variants default
+                                    [--build-jobs 2] [--run-cpu 3] [--fresh]
+                                    [--repetitions 5] [--cachegrind]
+
+Each compiler/variant pair is pipelined configure -> build -> run -> extract_asm
+(and code_size.py measure):
+- configure+build of several pairs run in parallel (--build-jobs),
+- benchmark runs are serialized and pinned to one CPU with taskset,
+  while builds and disassembly are pinned to the remaining CPUs,
+- every finished step is recorded in <build-root>/sweep_state.json with a
+  fingerprint of the commit, uncommitted edits, CMake arguments, compiler
+  version and repetitions, so an interrupted sweep resumes where it stopped
+  while a new commit or configuration redoes the affected pairs (--fresh
+  starts over).
+
+Outputs:
+    build_bench/<compiler>/<variant>/   — isolated CMake build dirs
+    results/<compiler>/<variant>/       — benchmark JSON, ASM and symbol sizes
+    results/<compiler>/<variant>-cachegrind/ — instruction counts (--cachegrind)
+    results/summary/                    — aggregated Markdown/CSV/ASM reports
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from extract_asm import bench_name_for
+from mca_report import find_llvm_mca
+from result_store import PERF_COUNTERS
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+ALL_COMPILERS = [
+    "gcc-12",
+    "gcc-13",
+    "gcc-14",
+    "gcc-15",
+    "clang-18",
+    "clang-19",
+    "clang-20",
+    "clang-21",
+    "clang-22",
+]
+
+VARIANTS = ["default", "native"]
+
+# (CMake target, result name)
+BENCH_TARGETS = [
+    ("poet_compiler_comparison_bench", "compiler_comparison_bench"),
+    ("poet_dispatch_bench", "dispatch_bench"),
+    ("poet_dispatch_optimization_bench", "dispatch_optimization_bench"),
+    ("poet_static_for_bench", "static_for_bench"),
+    ("poet_dynamic_for_bench", "dynamic_for_bench"),
+    ("poet_dynamic_for_forms_bench", "dynamic_for_forms_bench"),
+    ("poet_dynamic_for_emission_bench", "dynamic_for_emission_bench"),
+]
+
+CPM_CACHE = Path.home() / ".cpm"
+
+# Google Benchmark reads hardware counters through libpfm.
+LIBPFM_HEADER = Path("/usr/include/perfmon/pfmlib.h")
+PERF_EVENT_PARANOID = Path("/proc/sys/kernel/perf_event_paranoid")
+
+STATE_FILENAME = "sweep_state.json"
+
+
+def git_output(*args: str) -> str:
+    """Output of a git command in the project, or '' if it fails."""
+    proc = subprocess.run(
+        ["git", "-C", str(PROJECT_ROOT), *args],
+        check=False,
+        capture_output=True,
+        text=True,
+    )
+    return proc.stdout if proc.returncode == 0 else ""
+
+
+def cxx_binary(compiler: str) -> str:
+    """Map a compiler name (gcc-15, clang-22) to its C++ driver binary."""
+    return compiler.replace("gcc-", "g++-").replace("clang-", "clang++-")
+
+
+def discover_compilers() -> list[str]:
+    """POET_COMPILERS if set, else every ALL_COMPILERS entry found on PATH."""
+    env = os.environ.get("POET_COMPILERS")
+    if env:
+        return env.split()
+    return [c for c in ALL_COMPILERS if shutil.which(cxx_binary(c))]
+
+
+def perf_counters_unavailable() -> str | None:
+    """Why hardware counters cannot be collected here, or None if they can."""
+    if not LIBPFM_HEADER.exists():
+        return "libpfm not installed (libpfm4-dev)"
+    try:
+        paranoid = int(PERF_EVENT_PARANOID.read_text())
+    except (OSError, ValueError):
+        return "perf events not supported by the kernel"
+    if paranoid > 2:
+        return f"kernel.perf_event_paranoid={paranoid} (needs <= 2)"
+    return None
+
+
+def cmake_configure_args(
+    compiler: str,
+    variant: str,
+    build_dir: Path,
+    source_dir: Path = PROJECT_ROOT,
+    perf_counters: bool = False,
+    tests: bool = False,
+    cxx_flags: str = "",
+) -> list[str]:
+    """CMake configure command for one compiler/variant build directory.
+
+    ``cxx_flags`` is appended to the variant's flags; ``tests`` also
+    configures the test suite.
+    """
+    cmd = [
+        "cmake",
+        "-S",
+        str(source_dir),
+        "-B",
+        str(build_dir),
+        "-G",
+        "Ninja",
+        f"-DCMAKE_CXX_COMPILER={cxx_binary(compiler)}",
+        "-DCMAKE_BUILD_TYPE=Release",
+        "-DPOET_BUILD_BENCHMARKS=ON",
+        f"-DPOET_BUILD_TESTS={'ON' if tests else 'OFF'}",
+        "-DPOET_ENABLE_SANITIZERS=OFF",
+        "-DPOET_WARNINGS_AS_ERRORS=OFF",
+        f"-DCPM_SOURCE_CACHE={CPM_CACHE}",
+    ]
+    flags = " ".join(f for f in (variant_flags(variant), cxx_flags) if f)
+    if flags:
+        cmd.append(f"-DCMAKE_CXX_FLAGS={flags}")
+    if perf_counters:
+        cmd.append("-DBENCHMARK_ENABLE_LIBPFM=ON")
+    return cmd
+
+
+def compiler_version(compiler: str) -> str:
+    """First line of ``<cxx> --version``, or '' if it cannot be run."""
+    try:
+        proc = subprocess.run(
+            [cxx_binary(compiler), "--version"],
+            check=False,
+            capture_output=True,
+            text=True,
+        )
+    except OSError:
+        return ""
+    return proc.stdout.partition("\n")[0].strip()
+
+
+def variant_flags(variant: str) -> str:
+    """Extra CMAKE_CXX_FLAGS of a variant (on top of the Release flags)."""
+    return "-march=native" if variant == "native" else ""
+
+
+def context_arg(context: dict[str, str]) -> str:
+    """--benchmark_context argument; commas would split a value, so drop them."""
+    items = (f"{k}={v.replace(',', ';')}" for k, v in context.items() if v)
+    return "--benchmark_context=" + ",".join(items)
+
+
+def bench_binary(build_dir: Path, target: str, variant: str) -> Path:
+    """Benchmark binary path, preferring the _native build for native."""
+    binary = build_dir / "benchmarks" / target
+    if variant == "native":
+        native = build_dir / "benchmarks" / f"{target}_native"
+        if native.is_file():
+            return native
+    return binary
+
+
+class SweepState:
+    """Thread-safe record of finished steps, persisted as JSON.
+
+    Every step is stored with the fingerprint of the pair it belongs to
+    and only counts as done under the same fingerprint, so a new commit
+    or a different configuration repeats it instead of reusing results.
+    A step whose output files have since been deleted is repeated too.
+    """
+
+    def __init__(self, path: Path, fresh: bool = False):
+        self.path = path
+        self._lock = threading.Lock()
+        self._steps: dict[str, dict[str, str]] = {}
+        if not fresh and path.exists():
+            try:
+                self._steps = json.loads(path.read_text())
+            except (json.JSONDecodeError, OSError):
+                self._steps = {}
+
+    def done(self, step: str, fingerprint: str, outputs: Iterable[Path] = ()) -> bool:
+        with self._lock:
+            entry = self._steps.get(step)
+            finished = (
+                isinstance(entry, dict)
+                and entry.get("status") == "done"
+                and entry.get("fingerprint") == fingerprint
+            )
+        return finished and all(path.exists() for path in outputs)
+
+    def mark(self, step: str, status: str, fingerprint: str):
+        with self._lock:
+            self._steps[step] = {"status": status, "fingerprint": fingerprint}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self._steps, indent=2, sort_keys=True))
+            os.replace(tmp, self.path)
+
+
+class CpuPlan:
+    """taskset prefixes: one CPU for benchmark runs, the rest for builds."""
+
+    def __init__(self, run_cpu: int | None):
+        cpus = sorted(os.sched_getaffinity(0))
+        self.enabled = shutil.which("taskset") is not None and len(cpus) > 1
+        self.run_cpu = run_cpu if run_cpu is not None else cpus[-1]
+        self.other_cpus = [c for c in cpus if c != self.run_cpu] or cpus
+        self.build_parallelism = len(self.other_cpus)
+
+    def run_prefix(self) -> list[str]:
+        if not self.enabled:
+            return []
+        return ["taskset", "-c", str(self.run_cpu)]
+
+    def build_prefix(self) -> list[str]:
+        if not self.enabled:
+            return []
+        return ["taskset", "-c", ",".join(str(c) for c in self.other_cpus)]
+
+
+def run_logged(cmd: list[str], label: str) -> bool:
+    """Run a command quietly; on failure print the tail of its output."""
+    proc = subprocess.run(
+        cmd, check=False, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    )
+    if proc.returncode != 0:
+        tail = "\n".join(proc.stdout.splitlines()[-5:])
+        print(f"  WARNING: {label} failed\n{tail}")
+        return False
+    return True
+
+
+class Sweep:
+    def __init__(self, args: argparse.Namespace, state: SweepState, cpus: CpuPlan):
+        self.args = args
+        self.state = state
+        self.cpus = cpus
+        self.build_root = Path(args.build_root)
+        self.results_root = Path(args.results_root)
+        # Provenance recorded in every JSON context for bench_history.py.
+        self.commit = git_output("rev-parse", "HEAD").strip()
+        # Uncommitted edits of tracked files, so they also invalidate steps.
+        self.tree_edits = hashlib.sha256(
+            git_output("diff", "HEAD", "--binary").encode()
+        ).hexdigest()
+        self._fingerprints: dict[tuple[str, str], str] = {}
+
+    def fingerprint(self, compiler: str, variant: str) -> str:
+        """Hash of everything a pair's results depend on."""
+        key = (compiler, variant)
+        if key not in self._fingerprints:
+            inputs = {
+                "commit": self.commit,
+                "tree_edits": self.tree_edits,
+                "configure": cmake_configure_args(
+                    compiler,
+                    variant,
+                    self.build_dir(compiler, variant),
+                    perf_counters=self.args.perf_counters,
+                ),
+                "compiler_version": compiler_version(compiler),
+                "repetitions": self.args.repetitions,
+            }
+            self._fingerprints[key] = hashlib.sha256(
+                json.dumps(inputs, sort_keys=True).encode()
+            ).hexdigest()[:16]
+        return self._fingerprints[key]
+
+    def build_dir(self, compiler: str, variant: str) -> Path:
+        return self.build_root / compiler / variant
+
+    def result_dir(self, compiler: str, variant: str) -> Path:
+        return self.results_root / compiler / variant
+
+    def prepare(self, compiler: str, variant: str) -> bool:
+        """Configure and build one pair (runs on the build pool)."""
+        pair = f"{compiler}/{variant}"
+        fingerprint = self.fingerprint(compiler, variant)
+        build_dir = self.build_dir(compiler, variant)
+        build_dir.mkdir(parents=True, exist_ok=True)
+
+        cache = build_dir / "CMakeCache.txt"
+        if not self.state.done(f"configure:{pair}", fingerprint, [cache]):
+            print(f"Configuring: {pair}")
+            cmd = cmake_configure_args(
+                compiler, variant, build_dir, perf_counters=self.args.perf_counters
+            )
+            if not run_logged(cmd, f"CMake configure for {pair}"):
+                self.state.mark(f"configure:{pair}", "failed", fingerprint)
+                return False
+            self.state.mark(f"configure:{pair}", "done", fingerprint)
+
+        built = [
+            bench_binary(build_dir, target, variant) for target, _ in BENCH_TARGETS
+        ]
+        if not self.state.done(f"build:{pair}", fingerprint, built):
+            print(f"Building: {pair}")
+            jobs = max(1, self.cpus.build_parallelism // self.args.build_jobs)
+            targets = [target for target, _ in BENCH_TARGETS]
+            cmd = self.cpus.build_prefix() + [
+                "cmake",
+                "--build",
+                str(build_dir),
+                "--target",
+                *targets,
+                f"-j{jobs}",
+            ]
+            if run_logged(cmd, f"Build for {pair}"):
+                self.state.mark(f"build:{pair}", "done", fingerprint)
+            else:
+                # Keep going: run whichever benchmarks did build.
+                self.state.mark(f"build:{pair}", "failed", fingerprint)
+        return True
+
+    def run(self, compiler: str, variant: str) -> list[Path]:
+        """Run every benchmark of one pair, serialized and CPU-pinned."""
+        pair = f"{compiler}/{variant}"
+        fingerprint = self.fingerprint(compiler, variant)
+        build_dir = self.build_dir(compiler, variant)
+        result_dir = self.result_dir(compiler, variant)
+        result_dir.mkdir(parents=True, exist_ok=True)
+
+        binaries = []
+        for target, name in BENCH_TARGETS:
+            binary = bench_binary(build_dir, target, variant)
+            if not binary.is_file():
+                print(f"  SKIP: {binary} not found")
+                continue
+            binaries.append(binary)
+
+            step = f"run:{pair}/{name}"
+            json_file = result_dir / f"{name}.json"
+            if self.state.done(step, fingerprint, [json_file]):
+                continue
+            print(f"  Running: {name} ({binary})")
+            cmd = self.cpus.run_prefix() + [
+                str(binary),
+                "--benchmark_format=json",
+                f"--benchmark_out={json_file}",
+            ]
+            if self.args.repetitions > 1:
+                cmd.append(f"--benchmark_repetitions={self.args.repetitions}")
+            if self.args.perf_counters:
+                events = ",".join(PERF_COUNTERS.values())
+                cmd.append(f"--benchmark_perf_counters={events}")
+            cmd.append(
+                context_arg(
+                    {
+                        "poet_commit": self.commit,
+                        "poet_compiler_version": compiler_version(compiler),
+                        "poet_cxx_flags": variant_flags(variant),
+                    }
+                )
+            )
+            proc = subprocess.run(
+                cmd, check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            if proc.returncode == 0:
+                print(f"    OK: {json_file}")
+                self.state.mark(step, "done", fingerprint)
+            else:
+                print(f"    WARNING: {name} crashed (partial output saved)")
+                self.state.mark(step, "failed", fingerprint)
+        return binaries
+
+    def extract(self, compiler: str, variant: str, binaries: list[Path]):
+        """Extract hot-path assembly of one pair (runs on the build pool)."""
+        pair = f"{compiler}/{variant}"
+        fingerprint = self.fingerprint(compiler, variant)
+        asm_dir = self.result_dir(compiler, variant) / "asm"
+        outputs = [asm_dir / f"{bench_name_for(b)}_hot.asm" for b in binaries]
+        if not binaries or self.state.done(f"asm:{pair}", fingerprint, outputs):
+            return
+        cmd = self.cpus.build_prefix() + [
+            sys.executable,
+            str(SCRIPT_DIR / "extract_asm.py"),
+            "--output-dir",
+            str(asm_dir),
+            "--compiler",
+            compiler,
+            "--jobs",
+            str(self.cpus.build_parallelism),
+            *map(str, binaries),
+        ]
+        if run_logged(cmd, f"extract_asm.py for {pair}"):
+            self.state.mark(f"asm:{pair}", "done", fingerprint)
+
+    def measure_size(self, compiler: str, variant: str, binaries: list[Path]):
+        """Per-symbol code size of one pair (runs on the build pool)."""
+        pair = f"{compiler}/{variant}"
+        fingerprint = self.fingerprint(compiler, variant)
+        size_dir = self.result_dir(compiler, variant) / "size"
+        outputs = [size_dir / f"{bench_name_for(b)}.csv" for b in binaries]
+        if not binaries or self.state.done(f"size:{pair}", fingerprint, outputs):
+            return
+        cmd = self.cpus.build_prefix() + [
+            sys.executable,
+            str(SCRIPT_DIR / "code_size.py"),
+            "measure",
+            "--output-dir",
+            str(size_dir),
+            "--compiler",
+            compiler,
+            *map(str, binaries),
+        ]
+        if run_logged(cmd, f"code_size.py for {pair}"):
+            self.state.mark(f"size:{pair}", "done", fingerprint)
+
+    def count(self, compiler: str, variant: str, binaries: list[Path]):
+        """Instruction counts of one pair under cachegrind (on the build pool).
+
+        Counts are deterministic, so these runs need no dedicated CPU, but
+        they are kept off the run CPU so they do not disturb the timings
+        of the pair being benchmarked meanwhile.
+        """
+        pair = f"{compiler}/{variant}"
+        fingerprint = self.fingerprint(compiler, variant)
+        count_dir = self.result_dir(compiler, f"{variant}-cachegrind")
+        outputs = [count_dir / f"{bench_name_for(b)}.json" for b in binaries]
+        if not binaries or self.state.done(f"cachegrind:{pair}", fingerprint, outputs):
+            return
+        cmd = self.cpus.build_prefix() + [
+            sys.executable,
+            str(SCRIPT_DIR / "cachegrind_bench.py"),
+            "--output-dir",
+            str(count_dir),
+            "--jobs",
+            str(self.cpus.build_parallelism),
+            *map(str, binaries),
+        ]
+        if run_logged(cmd, f"cachegrind_bench.py for {pair}"):
+            self.state.mark(f"cachegrind:{pair}", "done", fingerprint)
+
+    def execute(self, pairs: list[tuple[str, str]]):
+        """Pipeline the matrix: parallel builds, serial runs, async extraction."""
+        with ThreadPoolExecutor(max_workers=self.args.build_jobs) as pool:
+            prepared: dict[Future, tuple[str, str]] = {
+                pool.submit(self.prepare, compiler, variant): (compiler, variant)
+                for compiler, variant in pairs
+            }
+            extractions = []
+            # Runs happen on this thread, one pair at a time, in build
+            # completion order while other builds continue in the pool.
+            for future in as_completed(prepared):
+                compiler, variant = prepared[future]
+                if not future.result():
+                    print(f"WARNING: skipping {compiler}/{variant}")
+                    continue
+                print(f"Running: {compiler}/{variant}")
+                binaries = self.run(compiler, variant)
+                extractions.append(
+                    pool.submit(self.extract, compiler, variant, binaries)
+                )
+                extractions.append(
+                    pool.submit(self.measure_size, compiler, variant, binaries)
+                )
+                if self.args.cachegrind:
+                    extractions.append(
+                        pool.submit(self.count, compiler, variant, binaries)
+                    )
+            for future in extractions:
+                future.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build and run POET benchmarks across compilers and variants"
+    )
+    parser.add_argument(
+        "--compilers",
+        nargs="+",
+        help="Compilers to sweep (default: $POET_COMPILERS or all detected)",
+    )
+    parser.add_argument("--variants", nargs="+", default=VARIANTS, choices=VARIANTS)
+    parser.add_argument("--build-root", default="build_bench")
+    parser.add_argument("--results-root", default="results")
+    parser.add_argument(
+        "--build-jobs",
+        type=int,
+        default=2,
+        help="Compiler/variant pairs configured and built concurrently",
+    )
+    parser.add_argument(
+        "--run-cpu",
+        type=int,
+        help="CPU benchmark runs are pinned to (default: last available CPU)",
+    )
+    parser.add_argument(
+        "--repetitions",
+        type=int,
+        default=1,
+        help="--benchmark_repetitions per binary (reports show median ± MAD)",
+    )
+    parser.add_argument(
+        "--no-perf-counters",
+        action="store_true",
+        help="Do not collect cycles/instructions/branch/L1D-miss counters",
+    )
+    parser.add_argument(
+        "--cachegrind",
+        action="store_true",
+        help="Also count instructions under valgrind into <variant>-cachegrind",
+    )
+    parser.add_argument(
+        "--fresh", action="store_true", help="Ignore the saved sweep state"
+    )
+    parser.add_argument(
+        "--no-summary", action="store_true", help="Skip the aggregated reports"
+    )
+    args = parser.parse_args()
+
+    os.chdir(PROJECT_ROOT)
+
+    compilers = args.compilers or discover_compilers()
+    available = []
+    for compiler in compilers:
+        if shutil.which(cxx_binary(compiler)):
+            available.append(compiler)
+        else:
+            print(f"WARNING: {cxx_binary(compiler)} not found, skipping {compiler}")
+    if not available:
+        print(
+            "ERROR: No compilers found. Install g++-{12..15} or clang++-{18..22}.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    cpus = CpuPlan(args.run_cpu)
+    perf_reason = "disabled" if args.no_perf_counters else perf_counters_unavailable()
+    args.perf_counters = perf_reason is None
+    if args.cachegrind and shutil.which("valgrind") is None:
+        print("WARNING: valgrind not found, skipping instruction counts")
+        args.cachegrind = False
+    state = SweepState(Path(args.build_root) / STATE_FILENAME, fresh=args.fresh)
+
+    print("=== POET Multi-Compiler Benchmark ===")
+    print(f"Compilers: {' '.join(available)}")
+    print(f"Project:   {PROJECT_ROOT}")
+    if cpus.enabled:
+        print(f"Run CPU:   {cpus.run_cpu} (builds on {len(cpus.other_cpus)} others)")
+    print(f"Counters:  {'on' if args.perf_counters else f'off, {perf_reason}'}")
+    print("")
+
+    pairs = [(c, v) for c in available for v in args.variants]
+    Sweep(args, state, cpus).execute(pairs)
+
+    if args.no_summary:
+        return
+
+    summary = Path(args.results_root) / "summary"
+    print("\n=== Generating summary reports ===")
+    subprocess.run(
+        [
+            sys.executable,
+            str(SCRIPT_DIR / "analyze_bench.py"),
+            "--results-root",
+            args.results_root,
+            "--output-md",
+            str(summary / "bench_comparison.md"),
+            "--output-csv",
+            str(summary / "bench_comparison.csv"),
+            "--asm-md",
+            str(summary / "asm_analysis.md"),
+        ],
+        check=False,
+    )
+    subprocess.run(
+        [
+            sys.executable,
+            str(SCRIPT_DIR / "code_size.py"),
+            "report",
+            "--results-root",
+            args.results_root,
+            "--output-csv",
+            str(summary / "code_size.csv"),
+            "--output-md",
+            str(summary / "code_size.md"),
+        ],
+        check=False,
+    )
+    mca = find_llvm_mca()
+    if mca is not None:
+        subprocess.run(
+            [
+                sys.executable,
+                str(SCRIPT_DIR / "mca_report.py"),
+                "--results-root",
+                args.results_root,
+                "--output",
+                str(summary / "mca_report.md"),
+                "--llvm-mca",
+                mca,
+            ],
+            check=False,
+        )
+
+    print("\n=== Done ===")
+    print(f"Summary:  {summary / 'bench_comparison.md'}")
+    print(f"CSV:      {summary / 'bench_comparison.csv'}")
+    print(f"ASM:      {summary / 'asm_analysis.md'}")
+    print(f"Size:     {summary / 'code_size.csv'}")
+    if mca is not None:
+        print(f"MCA:      {summary / 'mca_report.md'}")
+
+
+if __name__ == "__main__":
+    main()
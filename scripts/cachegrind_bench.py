@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""Deterministic instruction-count benchmarking under cachegrind.
+
+A local stand-in for CodSpeed's simulation mode: instead of timing each
+benchmark, run it once under ``valgrind --tool=cachegrind`` and count the
+instructions and cache misses it executes. The counts do not depend on
+machine load, so small regressions show up without a quiet machine.
+
+Usage:
+    python3 scripts/cachegrind_bench.py BINARY [BINARY ...]
+                                        --output-dir results/gcc-14/default-cachegrind
+                                        [--filter REGEX] [--jobs N]
+
+Every benchmark listed by --benchmark_list_tests runs alone with
+--benchmark_dry_run (exactly one iteration, ignoring MinTime). The cost of
+a run that matches no benchmark is subtracted, leaving the benchmark's
+setup plus one iteration. Compare counts of one benchmark across builds
+or commits, not across benchmarks.
+
+Writes <output-dir>/<bench>.json in the Google Benchmark JSON schema that
+analyze_bench.py and poet_bench.py read: cpu_time and real_time hold the
+instruction count (Ir), and the INSTRUCTIONS / L1D-miss counter keys hold
+the cachegrind events, so they reach the CSV counter columns.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from result_store import PERF_COUNTERS
+
+# Cachegrind events, as named on its "events:" line.
+EVENTS = ("Ir", "I1mr", "ILmr", "Dr", "D1mr", "DLmr", "Dw", "D1mw", "DLmw")
+
+# POSIX ERE metacharacters, escaped in --benchmark_filter.
+REGEX_SPECIAL = set(".^$|?*+()[]{}\\")
+
+
+def find_valgrind() -> str | None:
+    return shutil.which("valgrind")
+
+
+def filter_for(name: str) -> str:
+    """--benchmark_filter value matching exactly one benchmark name."""
+    escaped = "".join("\\" + c if c in REGEX_SPECIAL else c for c in name)
+    return f"^{escaped}$"
+
+
+def supports_dry_run(binary: Path) -> bool:
+    proc = subprocess.run(
+        [str(binary), "--help"], check=False, capture_output=True, text=True
+    )
+    return "benchmark_dry_run" in proc.stdout + proc.stderr
+
+
+def list_benchmarks(binary: Path, pattern: str | None) -> list[str]:
+    cmd = [str(binary), "--benchmark_list_tests"]
+    if pattern:
+        cmd.append(f"--benchmark_filter={pattern}")
+    proc = subprocess.run(cmd, check=False, capture_output=True, text=True)
+    return [line.strip() for line in proc.stdout.splitlines() if line.strip()]
+
+
+def parse_cachegrind_out(path: Path) -> dict[str, int]:
+    """Event totals from a cachegrind.out file's events:/summary: lines."""
+    events: list[str] = []
+    totals: dict[str, int] = {}
+    with open(path) as f:
+        for line in f:
+            if line.startswith("events:"):
+                events = line.split()[1:]
+            elif line.startswith("summary:"):
+                values = [int(v) for v in line.split()[1:]]
+                totals = dict(zip(events, values))
+    return totals
+
+
+def run_cachegrind(
+    valgrind: str, binary: Path, benchmark_filter: str, workdir: Path
+) -> dict[str, int] | None:
+    """Run one dry-run benchmark selection under cachegrind."""
+    fd, out = tempfile.mkstemp(prefix="cachegrind.", suffix=".out", dir=workdir)
+    os.close(fd)
+    cmd = [
+        valgrind,
+        "--tool=cachegrind",
+        "--cache-sim=yes",
+        f"--cachegrind-out-file={out}",
+        str(binary),
+        f"--benchmark_filter={benchmark_filter}",
+        "--benchmark_dry_run",
+    ]
+    subprocess.run(
+        cmd, check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        totals = parse_cachegrind_out(Path(out))
+    except (OSError, ValueError):
+        return None
+    finally:
+        Path(out).unlink(missing_ok=True)
+    return totals or None
+
+
+def benchmark_entry(name: str, counts: dict[str, int]) -> dict:
+    """Google Benchmark JSON entry carrying cachegrind counts."""
+    entry = {
+        "name": name,
+        "run_name": name,
+        "run_type": "iteration",
+        "repetitions": 1,
+        "repetition_index": 0,
+        "iterations": 1,
+        "real_time": counts.get("Ir", 0),
+        "cpu_time": counts.get("Ir", 0),
+        "time_unit": "Ir",
+        PERF_COUNTERS["instructions"]: counts.get("Ir", 0),
+        PERF_COUNTERS["l1d_misses"]: counts.get("D1mr", 0),
+    }
+    entry.update(counts)
+    return entry
+
+
+def profile_binary(
+    valgrind: str, binary: Path, pattern: str | None, jobs: int, output_dir: Path
+) -> Path | None:
+    """Write <output_dir>/<bench>.json with one entry per benchmark."""
+    if not supports_dry_run(binary):
+        print(
+            f"Warning: {binary} has no --benchmark_dry_run (Google Benchmark "
+            "too old), skipping",
+            file=sys.stderr,
+        )
+        return None
+    names = list_benchmarks(binary, pattern)
+    if not names:
+        print(f"Warning: no benchmarks listed by {binary}", file=sys.stderr)
+        return None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        # A filter that matches nothing measures startup and teardown.
+        filters = ["^$"] + [filter_for(name) for name in names]
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            results = list(
+                pool.map(
+                    lambda f: run_cachegrind(valgrind, binary, f, workdir), filters
+                )
+            )
+
+    baseline = results[0] or {}
+    benchmarks = []
+    for name, counts in zip(names, results[1:]):
+        if counts is None:
+            print(f"Warning: cachegrind failed for {name}", file=sys.stderr)
+            continue
+        net = {e: max(0, counts.get(e, 0) - baseline.get(e, 0)) for e in counts}
+        benchmarks.append(benchmark_entry(name, net))
+
+    bench = binary.name.removeprefix("poet_").removesuffix("_native")
+    output = output_dir / f"{bench}.json"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    context = {
+        "executable": str(binary),
+        "poet_mode": "cachegrind",
+        "poet_events": ",".join(EVENTS),
+    }
+    output.write_text(
+        json.dumps({"context": context, "benchmarks": benchmarks}, indent=2) + "\n"
+    )
+    return output
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Count instructions and cache misses per benchmark under cachegrind"
+    )
+    parser.add_argument("binaries", nargs="+", help="Google Benchmark binaries")
+    parser.add_argument("--output-dir", required=True)
+    parser.add_argument("--filter", help="Only benchmarks matching this regex")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=0,
+        help="Concurrent valgrind processes (0 = all cores)",
+    )
+    args = parser.parse_args(argv)
+
+    valgrind = find_valgrind()
+    if valgrind is None:
+        print("Error: valgrind not found (install valgrind)", file=sys.stderr)
+        sys.exit(1)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    failed = False
+    for binary in (Path(b).resolve() for b in args.binaries):
+        if not binary.is_file():
+            print(f"Warning: {binary} not found", file=sys.stderr)
+            failed = True
+            continue
+        output = profile_binary(
+            valgrind, binary, args.filter, jobs, Path(args.output_dir)
+        )
+        if output is None:
+            failed = True
+        else:
+            print(f"    OK: {output}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
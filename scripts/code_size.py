@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""Template code size of the benchmark binaries, by POET entry point.
+
+Usage:
+    python3 scripts/code_size.py measure BINARY [BINARY ...]
+                                 --output-dir results/gcc-14/default/size
+                                 [--compiler gcc-14]
+    python3 scripts/code_size.py report [--results-root results]
+                                 [--output-csv results/summary/code_size.csv]
+                                 [--output-md results/summary/code_size.md]
+
+measure lists every defined symbol of each binary with ``nm -S`` and
+writes <output-dir>/<bench>.csv, one row per symbol with its size, its
+kind (code or data) and the POET entry point it belongs to. A symbol
+belongs to the entry point whose name appears first in it, which is the
+outermost scope of a demangled name (dispatch_nd<...>::table is
+dispatch_nd, table_builder<...>::make_entry<...> is table_builder).
+Names nm leaves mangled are matched on their source names instead.
+Other poet:: symbols are "poet (other)", everything else "other"; measure
+warns when a _ZN4poet symbol ends up in "other".
+
+report sums those files per benchmark, entry point and compiler/variant
+into a CSV with one column per build, so size regressions show up next to
+the runtime columns of bench_comparison.csv, and a Markdown summary with
+the largest POET symbols of each benchmark.
+"""
+
+import argparse
+import csv
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import NamedTuple
+
+from extract_asm import NM_LINE_RE, TEXT_SYMBOL_TYPES, bench_name_for, find_nm
+from poet_bench import column_key, column_sort_key
+
+# POET entry points: a pattern matched anywhere in a demangled name, or
+# against the whole <length><identifier> source names of a mangled one.
+GROUPS = [
+    ("dispatch_nd", r"dispatch_nd"),
+    ("dispatch_1d", r"dispatch_1d"),
+    ("table_builder", r"(?:nd_)?table_builder"),
+    ("sparse_index", r"sparse_index"),
+    ("run_block_iso", r"run_block_iso"),
+    ("emit_blocks_iso", r"emit_blocks_iso"),
+    ("emit_carried", r"emit_carried(?:_ct)?"),
+    ("tail_binary", r"tail_binary\w*"),
+]
+GROUP_RES = [
+    (label, re.compile(rf"(?<![A-Za-z_]){pattern}(?![A-Za-z_])"))
+    for label, pattern in GROUPS
+]
+MANGLED_GROUP_RES = [(label, re.compile(pattern)) for label, pattern in GROUPS]
+POET_OTHER = "poet (other)"
+OTHER = "other"
+TOTAL = "total"
+GROUP_ORDER = [label for label, _ in GROUPS] + [POET_OTHER, OTHER, TOTAL]
+POET_RE = re.compile(r"\bpoet::")
+# Length prefix of an Itanium source name ("16nd_table_builder"). nm leaves
+# names mangled when they are too deep to demangle, as the call_stateless
+# thunks of a large N-D dispatch table are.
+SOURCE_NAME_RE = re.compile(r"(?<!\d)([1-9]\d*)(?=[A-Za-z_])")
+# Every symbol in this namespace must land in a POET group.
+MANGLED_POET_PREFIX = "_ZN4poet"
+
+# Data symbols: initialized, read-only, BSS, small data, weak and unique objects.
+DATA_SYMBOL_TYPES = frozenset("dDrRbBgGsSvVu")
+
+TOP_SYMBOLS = 10
+MAX_NAME = 160
+
+FIELDS = ["group", "kind", "bytes", "name"]
+
+
+class SymbolSize(NamedTuple):
+    group: str
+    kind: str
+    size: int
+    name: str
+
+
+def source_names(mangled: str) -> list[tuple[int, str]]:
+    """(offset, identifier) of each <length><identifier> in a mangled name."""
+    names = []
+    for m in SOURCE_NAME_RE.finditer(mangled):
+        ident = mangled[m.end() : m.end() + int(m.group(1))]
+        if len(ident) == int(m.group(1)) and ident.isidentifier():
+            names.append((m.start(), ident))
+    return names
+
+
+def group_of(name: str) -> str:
+    """POET entry point whose name occurs first in a symbol name."""
+    if name.startswith("_Z"):
+        idents = source_names(name)
+        matches = [
+            (offset, label)
+            for label, r in MANGLED_GROUP_RES
+            for offset, ident in idents
+            if r.fullmatch(ident)
+        ]
+        poet = any(ident == "poet" for _, ident in idents)
+    else:
+        matches = [
+            (m.start(), label) for label, r in GROUP_RES if (m := r.search(name))
+        ]
+        poet = bool(POET_RE.search(name))
+    if matches:
+        return min(matches)[1]
+    return POET_OTHER if poet else OTHER
+
+
+def read_symbol_sizes(nm: str, binary: Path) -> list[SymbolSize]:
+    """Sized code and data symbols of a binary, largest first."""
+    cmd = [nm, "-C", "-S", "--size-sort", "--defined-only", str(binary)]
+    try:
+        proc = subprocess.run(cmd, check=False, capture_output=True, text=True)
+    except FileNotFoundError:
+        print(f"Error: {nm} not found", file=sys.stderr)
+        return []
+    symbols = []
+    for line in proc.stdout.splitlines():
+        m = NM_LINE_RE.match(line)
+        if not m or not m.group(2):
+            continue
+        kind_code = m.group(3)
+        if kind_code in TEXT_SYMBOL_TYPES:
+            kind = "code"
+        elif kind_code in DATA_SYMBOL_TYPES:
+            kind = "data"
+        else:
+            continue
+        size = int(m.group(2), 16)
+        if size:
+            name = m.group(4)
+            symbols.append(SymbolSize(group_of(name), kind, size, name))
+    symbols.sort(key=lambda s: (-s.size, s.name))
+    return symbols
+
+
+def measure(binaries: list[Path], output_dir: Path, nm: str) -> bool:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    ok = True
+    for binary in binaries:
+        symbols = read_symbol_sizes(nm, binary)
+        if not symbols:
+            print(f"Warning: no sized symbols in {binary} (stripped?)", file=sys.stderr)
+            ok = False
+            continue
+        stray = [
+            s
+            for s in symbols
+            if s.group == OTHER and s.name.startswith(MANGLED_POET_PREFIX)
+        ]
+        if stray:
+            print(
+                f"Warning: {len(stray)} poet symbols of {binary} grouped as "
+                f"{OTHER}, e.g. {stray[0].name[:MAX_NAME]}",
+                file=sys.stderr,
+            )
+        output = output_dir / f"{bench_name_for(binary)}.csv"
+        with open(output, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(FIELDS)
+            writer.writerows((s.group, s.kind, s.size, s.name) for s in symbols)
+        print(f"    OK: {output}")
+    return ok
+
+
+def read_size_file(path: Path) -> list[SymbolSize]:
+    with open(path, newline="") as f:
+        return [
+            SymbolSize(row["group"], row["kind"], int(row["bytes"]), row["name"])
+            for row in csv.DictReader(f)
+        ]
+
+
+class SizeTotals(NamedTuple):
+    code: int
+    data: int
+    symbols: int
+
+
+def totals_of(symbols: list[SymbolSize]) -> dict[str, SizeTotals]:
+    """Code bytes, data bytes and symbol count per group, plus the total."""
+    sums: dict[str, list[int]] = defaultdict(lambda: [0, 0, 0])
+    for s in symbols:
+        for group in (s.group, TOTAL):
+            sums[group][0 if s.kind == "code" else 1] += s.size
+            sums[group][2] += 1
+    return {group: SizeTotals(*values) for group, values in sums.items()}
+
+
+def load_sizes(
+    results_root: Path,
+) -> dict[tuple[str, str, str], list[SymbolSize]]:
+    """(compiler, variant, bench) -> symbols, from results/<c>/<v>/size/*.csv."""
+    sizes = {}
+    for path in sorted(results_root.rglob("size/*.csv")):
+        parts = path.relative_to(results_root).parts
+        if len(parts) != 4:
+            continue
+        sizes[(parts[0], parts[1], path.stem)] = read_size_file(path)
+    return sizes
+
+
+def write_csv(sizes, columns: list[tuple[str, str]], output: Path):
+    output.parent.mkdir(parents=True, exist_ok=True)
+    benches = sorted({bench for _, _, bench in sizes})
+    fieldnames = ["bench", "group"]
+    for compiler, variant in columns:
+        key = column_key(compiler, variant)
+        fieldnames += [f"{key}_code_bytes", f"{key}_data_bytes", f"{key}_symbols"]
+    totals = {key: totals_of(symbols) for key, symbols in sizes.items()}
+    with open(output, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        for bench in benches:
+            for group in GROUP_ORDER:
+                cells = [
+                    totals.get((compiler, variant, bench), {}).get(group)
+                    for compiler, variant in columns
+                ]
+                if not any(cells):
+                    continue
+                row = [bench, group]
+                for t in cells:
+                    row += ["", "", ""] if t is None else [t.code, t.data, t.symbols]
+                writer.writerow(row)
+
+
+def size_cell(t: SizeTotals | None) -> str:
+    if t is None:
+        return "—"
+    cell = f"{t.code:,}"
+    if t.data:
+        cell += f" + {t.data:,} data"
+    return cell
+
+
+def write_markdown(sizes, columns: list[tuple[str, str]], output: Path):
+    output.parent.mkdir(parents=True, exist_ok=True)
+    benches = sorted({bench for _, _, bench in sizes})
+    totals = {key: totals_of(symbols) for key, symbols in sizes.items()}
+    with open(output, "w") as f:
+        f.write("# Code Size\n\n")
+        f.write(
+            "Bytes of code (+ data, such as dispatch tables) per POET entry point, "
+            "summed over the symbols whose outermost scope is that entry point.\n\n"
+        )
+        if not sizes:
+            f.write("No size files found.\n")
+            return
+        header = "| Group | " + " | ".join(column_key(c, v) for c, v in columns)
+        rule = "|:------|" + "|".join("------:" for _ in columns)
+        for bench in benches:
+            f.write(f"## {bench}\n\n{header} |\n{rule}|\n")
+            for group in GROUP_ORDER:
+                cells = [
+                    totals.get((compiler, variant, bench), {}).get(group)
+                    for compiler, variant in columns
+                ]
+                if any(cells):
+                    f.write(f"| {group} | {' | '.join(map(size_cell, cells))} |\n")
+            f.write("\n")
+
+            # Largest POET symbols of the build where POET code is largest.
+            builds = [key for key in sizes if key[2] == bench]
+            build = max(
+                builds,
+                key=lambda key: sum(s.size for s in sizes[key] if s.group != OTHER),
+            )
+            top = [s for s in sizes[build] if s.group != OTHER][:TOP_SYMBOLS]
+            if not top:
+                continue
+            f.write(f"Largest POET symbols ({column_key(build[0], build[1])}):\n\n")
+            f.write(
+                "| Bytes | Kind | Group | Symbol |\n|------:|:-----|:------|:-------|\n"
+            )
+            for s in top:
+                name = s.name if len(s.name) <= MAX_NAME else s.name[:MAX_NAME] + "…"
+                name = name.replace("|", "\\|")
+                f.write(f"| {s.size:,} | {s.kind} | {s.group} | `{name}` |\n")
+            f.write("\n")
+
+
+def write_reports(results_root: Path, output_csv: Path, output_md: Path) -> bool:
+    """Write the size CSV and Markdown; False when no size files exist."""
+    sizes = load_sizes(results_root)
+    if not sizes:
+        return False
+    columns = sorted(
+        {(compiler, variant) for compiler, variant, _ in sizes},
+        key=lambda c: column_sort_key(*c),
+    )
+    write_csv(sizes, columns, output_csv)
+    write_markdown(sizes, columns, output_md)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Code size of benchmark binaries by POET entry point"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("measure", help="Write per-symbol sizes of binaries")
+    p.add_argument("binaries", nargs="+", help="Benchmark binaries")
+    p.add_argument("--output-dir", required=True)
+    p.add_argument("--compiler", default="", help="Compiler, to pick nm")
+    p = sub.add_parser("report", help="Summarize a results tree")
+    p.add_argument("--results-root", default="results")
+    p.add_argument("--output-csv", default="results/summary/code_size.csv")
+    p.add_argument("--output-md", default="results/summary/code_size.md")
+    args = parser.parse_args()
+
+    if args.command == "measure":
+        binaries = [Path(b) for b in args.binaries]
+        missing = [b for b in binaries if not b.is_file()]
+        for binary in missing:
+            print(f"Warning: {binary} not found", file=sys.stderr)
+        present = [b for b in binaries if b.is_file()]
+        ok = measure(present, Path(args.output_dir), find_nm(args.compiler))
+        if missing or not ok:
+            sys.exit(1)
+        return
+
+    if not write_reports(
+        Path(args.results_root), Path(args.output_csv), Path(args.output_md)
+    ):
+        print("Error: no size files under the results root", file=sys.stderr)
+        sys.exit(1)
+    print(f"Wrote {args.output_csv}")
+    print(f"Wrote {args.output_md}")
+
+
+if __name__ == "__main__":
+    main()
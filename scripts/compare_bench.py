@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""Statistical regression gate between two benchmark result trees.
+
+Compares the repetition samples of every benchmark present in both a
+baseline and a candidate results root. Each benchmark gets a relative
+median delta with a bootstrap confidence interval and a two-sided
+Mann-Whitney U test; a delta beyond --threshold that is also significant at
+--alpha is a regression (or an improvement).
+
+Usage:
+    python3 scripts/poet_bench.py compare BASELINE CANDIDATE
+                                  [--threshold 5] [--alpha 0.05]
+                                  [--confidence 0.95] [--output-md FILE]
+
+Run the binaries with --benchmark_repetitions (>= 4) to get samples: the
+U test cannot reach p < 0.05 with fewer than four repetitions per side.
+Instruction counts from cachegrind (time_unit "Ir") are deterministic, so
+a single run per side is exact: their delta is held against --threshold
+directly, without the U test. Exits with status 1 when any benchmark
+regresses.
+"""
+
+import argparse
+import math
+import random
+import statistics
+import sys
+from pathlib import Path
+from typing import NamedTuple
+
+from poet_bench import column_key, column_sort_key, load_results
+from result_cache import ResultCache
+from result_store import DEFAULT_TIME_UNIT
+
+# Exact U distribution up to this many samples per side (and no ties).
+EXACT_MAX_SAMPLES = 20
+
+BOOTSTRAP_SEED = 0x5EED
+
+# Units of deterministic measurements, compared without statistics.
+EXACT_UNITS = frozenset({"Ir"})
+
+
+class Comparison(NamedTuple):
+    """Baseline vs candidate statistics for one benchmark in one build."""
+
+    key: tuple[str, str, str, str, str]
+    baseline: float
+    candidate: float
+    delta: float
+    ci_low: float
+    ci_high: float
+    p_value: float
+    n_baseline: int
+    n_candidate: int
+    verdict: str
+    unit: str = DEFAULT_TIME_UNIT
+
+
+# ── Statistics ───────────────────────────────────────────────────────────────
+
+
+def _ranks(values: list[float]) -> tuple[list[float], list[int]]:
+    """Average ranks (1-based) of values, plus the sizes of tied groups."""
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    ties = []
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        rank = (i + j) / 2 + 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = rank
+        if j > i:
+            ties.append(j - i + 1)
+        i = j + 1
+    return ranks, ties
+
+
+def _exact_u_cdf(n: int, m: int) -> list[float]:
+    """P(U <= u) for u = 0..n*m under the null hypothesis, without ties."""
+    # counts[j][u]: arrangements of i x-samples and j y-samples with U = u.
+    counts = [[1] + [0] * (n * m) for _ in range(m + 1)]
+    for _ in range(n):
+        new = [[0] * (n * m + 1) for _ in range(m + 1)]
+        new[0] = counts[0][:]
+        for j in range(1, m + 1):
+            prev_x, prev_y = counts[j], new[j - 1]
+            row = new[j]
+            for u in range(n * m + 1):
+                row[u] = prev_y[u] + (prev_x[u - j] if u >= j else 0)
+        counts = new
+    total = math.comb(n + m, n)
+    cdf = []
+    acc = 0
+    for c in counts[m]:
+        acc += c
+        cdf.append(acc / total)
+    return cdf
+
+
+def mann_whitney_u(x: list[float], y: list[float]) -> float:
+    """Two-sided Mann-Whitney U test p-value for samples x and y.
+
+    Uses the exact null distribution for small tie-free samples and the
+    tie-corrected normal approximation (with continuity correction)
+    otherwise.
+    """
+    n, m = len(x), len(y)
+    if n == 0 or m == 0:
+        return 1.0
+    ranks, ties = _ranks(x + y)
+    u = sum(ranks[:n]) - n * (n + 1) / 2
+    u_min = min(u, n * m - u)
+
+    if not ties and n <= EXACT_MAX_SAMPLES and m <= EXACT_MAX_SAMPLES:
+        return min(1.0, 2 * _exact_u_cdf(n, m)[int(u_min)])
+
+    total = n + m
+    tie_term = sum(t**3 - t for t in ties) / (total * (total - 1))
+    variance = n * m / 12 * ((total + 1) - tie_term)
+    if variance <= 0:
+        return 1.0
+    z = (abs(u - n * m / 2) - 0.5) / math.sqrt(variance)
+    return min(1.0, math.erfc(max(z, 0.0) / math.sqrt(2)))
+
+
+def bootstrap_ci(
+    x: list[float],
+    y: list[float],
+    confidence: float,
+    resamples: int,
+    rng: random.Random,
+) -> tuple[float, float]:
+    """Percentile bootstrap interval of median(y) / median(x) - 1."""
+    deltas = []
+    for _ in range(resamples):
+        base = statistics.median(rng.choices(x, k=len(x)))
+        cand = statistics.median(rng.choices(y, k=len(y)))
+        if base > 0:
+            deltas.append(cand / base - 1)
+    if not deltas:
+        return (math.nan, math.nan)
+    deltas.sort()
+    tail = (1 - confidence) / 2
+    low = deltas[int(tail * (len(deltas) - 1))]
+    high = deltas[int(math.ceil((1 - tail) * (len(deltas) - 1)))]
+    return (low, high)
+
+
+def compare_samples(
+    key: tuple[str, str, str, str, str],
+    x: list[float],
+    y: list[float],
+    args: argparse.Namespace,
+    rng: random.Random,
+    unit: str = DEFAULT_TIME_UNIT,
+) -> Comparison:
+    """Compare one benchmark's baseline samples x against candidate samples y."""
+    base = statistics.median(x)
+    cand = statistics.median(y)
+    delta = cand / base - 1 if base > 0 else math.nan
+    threshold = args.threshold / 100
+
+    if unit in EXACT_UNITS:
+        verdict = "unchanged"
+        if delta >= threshold:
+            verdict = "regression"
+        elif delta <= -threshold:
+            verdict = "improvement"
+        return Comparison(
+            key,
+            base,
+            cand,
+            delta,
+            delta,
+            delta,
+            math.nan,
+            len(x),
+            len(y),
+            verdict,
+            unit,
+        )
+
+    if len(x) < 2 or len(y) < 2:
+        return Comparison(
+            key, base, cand, delta, math.nan, math.nan, math.nan, len(x), len(y), "n/a"
+        )
+
+    p_value = mann_whitney_u(x, y)
+    ci_low, ci_high = bootstrap_ci(x, y, args.confidence, args.resamples, rng)
+    verdict = "unchanged"
+    if p_value < args.alpha and delta >= threshold:
+        verdict = "regression"
+    elif p_value < args.alpha and delta <= -threshold:
+        verdict = "improvement"
+    return Comparison(
+        key, base, cand, delta, ci_low, ci_high, p_value, len(x), len(y), verdict
+    )
+
+
+def compare_trees(
+    baseline: dict[tuple, list[float]],
+    candidate: dict[tuple, list[float]],
+    args: argparse.Namespace,
+    units: dict[tuple, str] | None = None,
+) -> list[Comparison]:
+    """Compare every benchmark present in both sample maps."""
+    rng = random.Random(BOOTSTRAP_SEED)
+    units = units or {}
+    shared = [key for key in baseline if key in candidate]
+    shared.sort(key=lambda k: (k[0], k[1], k[2], column_sort_key(k[3], k[4])))
+    return [
+        compare_samples(
+            key,
+            baseline[key],
+            candidate[key],
+            args,
+            rng,
+            units.get(key, DEFAULT_TIME_UNIT),
+        )
+        for key in shared
+    ]
+
+
+# ── Report ───────────────────────────────────────────────────────────────────
+
+
+def _pct(value: float) -> str:
+    return "—" if math.isnan(value) else f"{value * 100:+.1f}%"
+
+
+def _row(c: Comparison) -> str:
+    bench, section, name, compiler, variant = c.key
+    full_name = f"{section}/{name}" if section else name
+    ci = "—" if math.isnan(c.ci_low) else f"[{_pct(c.ci_low)}, {_pct(c.ci_high)}]"
+    p_value = "—" if math.isnan(c.p_value) else f"{c.p_value:.3f}"
+    if c.unit in EXACT_UNITS:
+        ci, p_value = "exact", "—"
+    suffix = "" if c.unit == DEFAULT_TIME_UNIT else f" {c.unit}"
+    return (
+        f"| {bench} | {full_name} | {column_key(compiler, variant)} "
+        f"| {c.baseline:.2f}{suffix} | {c.candidate:.2f}{suffix} "
+        f"| {_pct(c.delta)} | {ci} "
+        f"| {p_value} | {c.n_baseline}/{c.n_candidate} | {c.verdict} |"
+    )
+
+
+TABLE_HEADER = (
+    "| Bench | Benchmark | Build | Baseline (ns) | Candidate (ns) "
+    "| Δ median | CI | p | n | Verdict |\n"
+    "|:------|:----------|:------|--------------:|---------------:"
+    "|---------:|:---|--:|--:|:--------|\n"
+)
+
+
+def write_markdown(
+    comparisons: list[Comparison],
+    missing: tuple[int, int],
+    args: argparse.Namespace,
+    output: Path,
+):
+    """Write the Markdown verdict."""
+    output.parent.mkdir(parents=True, exist_ok=True)
+    by_verdict: dict[str, list[Comparison]] = {}
+    for c in comparisons:
+        by_verdict.setdefault(c.verdict, []).append(c)
+    regressions = by_verdict.get("regression", [])
+    improvements = by_verdict.get("improvement", [])
+
+    with open(output, "w") as f:
+        f.write("# Benchmark Regression Check\n\n")
+        f.write(f"- Baseline: `{args.baseline}`\n")
+        f.write(f"- Candidate: `{args.candidate}`\n")
+        f.write(
+            f"- Threshold: {args.threshold:g}% at α = {args.alpha:g} "
+            f"(Mann-Whitney U), {args.confidence:.0%} bootstrap CI\n\n"
+        )
+
+        verdict = "FAIL" if regressions else "PASS"
+        f.write(f"**{verdict}**: {len(comparisons)} benchmarks compared, ")
+        f.write(f"{len(regressions)} regressions, {len(improvements)} improvements, ")
+        f.write(f"{len(by_verdict.get('unchanged', []))} unchanged, ")
+        f.write(f"{len(by_verdict.get('n/a', []))} with fewer than 2 repetitions.\n")
+        if any(missing):
+            f.write(
+                f"\n*{missing[0]} benchmarks only in the baseline, "
+                f"{missing[1]} only in the candidate.*\n"
+            )
+        f.write("\n")
+
+        for title, rows in (
+            ("Regressions", regressions),
+            ("Improvements", improvements),
+        ):
+            if not rows:
+                continue
+            f.write(f"## {title}\n\n")
+            f.write(TABLE_HEADER)
+            for c in sorted(rows, key=lambda c: -abs(c.delta)):
+                f.write(_row(c) + "\n")
+            f.write("\n")
+
+        f.write("## All benchmarks\n\n")
+        f.write(TABLE_HEADER)
+        for c in comparisons:
+            f.write(_row(c) + "\n")
+
+    print(f"Wrote {output}")
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────────
+
+
+def load_samples(
+    results_root: Path, use_cache: bool
+) -> tuple[dict[tuple, list[float]], dict[tuple, str]]:
+    """(samples, time units) per benchmark and build of a results tree."""
+    if not results_root.exists():
+        print(f"Error: results root not found: {results_root}", file=sys.stderr)
+        sys.exit(1)
+    cache = ResultCache(results_root) if use_cache else None
+    store = load_results(results_root, cache=cache)
+    return store.samples(), store.sample_units()
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        prog="poet_bench.py compare",
+        description="Compare a candidate results tree against a baseline",
+    )
+    parser.add_argument("baseline", help="Baseline results root")
+    parser.add_argument("candidate", help="Candidate results root")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=5.0,
+        help="Median slowdown (percent) that counts as a regression (default: 5)",
+    )
+    parser.add_argument(
+        "--alpha", type=float, default=0.05, help="Significance level (default: 0.05)"
+    )
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=0.95,
+        help="Bootstrap confidence level for the delta (default: 0.95)",
+    )
+    parser.add_argument(
+        "--resamples", type=int, default=2000, help="Bootstrap resamples"
+    )
+    parser.add_argument(
+        "--output-md",
+        default="results/summary/bench_regressions.md",
+        help="Markdown verdict (default: results/summary/bench_regressions.md)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or update the parsed-results caches",
+    )
+    args = parser.parse_args(argv)
+
+    baseline, units = load_samples(Path(args.baseline), not args.no_cache)
+    candidate, candidate_units = load_samples(Path(args.candidate), not args.no_cache)
+    if not baseline or not candidate:
+        print("Error: no benchmark JSON data found", file=sys.stderr)
+        sys.exit(1)
+
+    comparisons = compare_trees(baseline, candidate, args, units | candidate_units)
+    missing = (
+        sum(1 for key in baseline if key not in candidate),
+        sum(1 for key in candidate if key not in baseline),
+    )
+    write_markdown(comparisons, missing, args, Path(args.output_md))
+
+    regressions = [c for c in comparisons if c.verdict == "regression"]
+    if regressions:
+        print(
+            f"FAIL: {len(regressions)} benchmarks regressed by more than "
+            f"{args.threshold:g}%",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    print(f"PASS: no regressions among {len(comparisons)} benchmarks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""Compile-time cost of static_for, dynamic_for and dispatch.
+
+Usage:
+    python3 scripts/compile_bench.py [--compilers gcc-14 clang-21]
+                                     [--results-root results] [--repetitions 3]
+                                     [--families static_for dynamic_for dispatch]
+                                     [--no-chart]
+
+Generates one translation unit per point of each scaling series and
+compiles it (-std=c++20 -O3 -DNDEBUG -c) with every compiler of the
+benchmark sweep ($POET_COMPILERS, or every ALL_COMPILERS entry on PATH).
+Each compile is repeated; the median wall time and the largest peak RSS
+of the compiler (cc1plus/clang included, via wait4) are recorded.
+
+Series:
+    static_for  range   static_for<0, N>, BlockSize N (the default)
+    static_for  block   static_for<0, 256, 1, BlockSize>
+    dynamic_for unroll  dynamic_for<Unroll> over a runtime range
+    dispatch    dims    D-dimensional dispatch over 4 values per dimension
+    dispatch    width   1-D dispatch over W values
+    include     -       an empty TU including <poet/poet.hpp>, the floor
+
+Writes results/compile/<compiler>.csv and draws
+results/summary/compile_cost.svg (compile-cost curves, one panel per
+series); poet_bench.py redraws the chart next to the runtime charts.
+"""
+
+import argparse
+import csv
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+from bench_matrix import cxx_binary, discover_compilers
+from poet_bench import compiler_sort_key
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+INCLUDE_DIR = SCRIPT_DIR.parent / "include"
+
+FLAGS = ["-std=c++20", "-O3", "-DNDEBUG"]
+
+STATIC_FOR_RANGES = (16, 64, 256, 1024)
+STATIC_FOR_BLOCK_RANGE = 256
+STATIC_FOR_BLOCKS = (4, 16, 64, 256)
+DYNAMIC_FOR_UNROLLS = (1, 2, 4, 8, 16, 32, 64)
+DISPATCH_DIMS = (1, 2, 3, 4, 5)
+DISPATCH_DIM_WIDTH = 4
+DISPATCH_WIDTHS = (4, 16, 64, 256)
+
+FAMILIES = ("include", "static_for", "dynamic_for", "dispatch")
+
+FIELDS = [
+    "compiler",
+    "family",
+    "parameter",
+    "value",
+    "wall_s",
+    "wall_min_s",
+    "peak_rss_mib",
+    "repetitions",
+    "status",
+]
+
+PRELUDE = "#include <cstddef>\n#include <tuple>\n\n#include <poet/poet.hpp>\n\n"
+
+STATIC_FOR_TU = """double kernel(const double *x) {{
+    double s = 0.0;
+    poet::static_for<0, {n}, 1, {block}>([&](auto i) {{ s += x[i] * (double(i) + 1.0); }});
+    return s;
+}}
+"""
+
+DYNAMIC_FOR_TU = """double kernel(const double *x, std::size_t n) {{
+    double s = 0.0;
+    poet::dynamic_for<{unroll}>(std::size_t{{ 0 }}, n, [&](std::size_t i) {{ s += x[i]; }});
+    return s;
+}}
+"""
+
+DISPATCH_TU = """namespace {{
+struct kernel_fn {{
+    template<int... Vs> int operator()(int scale) const {{
+        int s = 0;
+        ((s = s * 31 + Vs * scale), ...);
+        return s;
+    }}
+}};
+using range = poet::inclusive_range<0, {last}>;
+}}// namespace
+
+int kernel({args}, int scale) {{
+    return poet::dispatch(kernel_fn{{}}, {params}, scale);
+}}
+"""
+
+INCLUDE_TU = "int kernel(int x) { return x; }\n"
+
+
+class Case(NamedTuple):
+    family: str
+    parameter: str
+    value: int
+    source: str
+
+
+class CompileResult(NamedTuple):
+    compiler: str
+    family: str
+    parameter: str
+    value: int
+    wall_s: float | None
+    wall_min_s: float | None
+    peak_rss_mib: float | None
+    repetitions: int
+    status: str
+
+
+def dispatch_source(dims: int, width: int) -> str:
+    args = ", ".join(f"int a{d}" for d in range(dims))
+    params = [f"poet::dispatch_param<range>{{ a{d} }}" for d in range(dims)]
+    joined = params[0] if dims == 1 else f"std::make_tuple({', '.join(params)})"
+    return DISPATCH_TU.format(last=width - 1, args=args, params=joined)
+
+
+def cases(families: list[str]) -> list[Case]:
+    """Every translation unit of the selected series."""
+    out = []
+    if "include" in families:
+        out.append(Case("include", "-", 0, PRELUDE + INCLUDE_TU))
+    if "static_for" in families:
+        for n in STATIC_FOR_RANGES:
+            source = STATIC_FOR_TU.format(n=n, block=n)
+            out.append(Case("static_for", "range", n, PRELUDE + source))
+        for block in STATIC_FOR_BLOCKS:
+            source = STATIC_FOR_TU.format(n=STATIC_FOR_BLOCK_RANGE, block=block)
+            out.append(Case("static_for", "block", block, PRELUDE + source))
+    if "dynamic_for" in families:
+        for unroll in DYNAMIC_FOR_UNROLLS:
+            source = DYNAMIC_FOR_TU.format(unroll=unroll)
+            out.append(Case("dynamic_for", "unroll", unroll, PRELUDE + source))
+    if "dispatch" in families:
+        for dims in DISPATCH_DIMS:
+            source = dispatch_source(dims, DISPATCH_DIM_WIDTH)
+            out.append(Case("dispatch", "dims", dims, PRELUDE + source))
+        for width in DISPATCH_WIDTHS:
+            out.append(
+                Case("dispatch", "width", width, PRELUDE + dispatch_source(1, width))
+            )
+    return out
+
+
+def compile_once(cxx: str, source: Path, log: Path) -> tuple[float, int, bool]:
+    """(wall seconds, peak RSS in KiB, success) of one compile.
+
+    wait4 reports the driver's resource usage including the compiler
+    process it ran, so ru_maxrss is the peak of cc1plus/clang -cc1.
+    """
+    cmd = [cxx, *FLAGS, f"-I{INCLUDE_DIR}", "-c", str(source), "-o", os.devnull]
+    with open(log, "w") as err:
+        start = time.perf_counter()
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=err)
+        _, status, usage = os.wait4(proc.pid, 0)
+        wall = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return wall, usage.ru_maxrss, proc.returncode == 0
+
+
+def measure(
+    compiler: str, case: Case, repetitions: int, workdir: Path
+) -> CompileResult:
+    source = workdir / f"{case.family}_{case.parameter}_{case.value}.cpp"
+    source.write_text(case.source)
+    log = source.with_suffix(".log")
+    walls, peak = [], 0
+    for _ in range(repetitions):
+        wall, rss, ok = compile_once(cxx_binary(compiler), source, log)
+        if not ok:
+            first = log.read_text().strip().splitlines()[:1]
+            print(
+                f"Warning: {compiler} failed on {source.name}: {''.join(first)}",
+                file=sys.stderr,
+            )
+            return CompileResult(
+                compiler,
+                case.family,
+                case.parameter,
+                case.value,
+                None,
+                None,
+                None,
+                len(walls),
+                "failed",
+            )
+        walls.append(wall)
+        peak = max(peak, rss)
+    return CompileResult(
+        compiler,
+        case.family,
+        case.parameter,
+        case.value,
+        round(statistics.median(walls), 4),
+        round(min(walls), 4),
+        round(peak / 1024, 1),
+        repetitions,
+        "ok",
+    )
+
+
+def write_results(results: list[CompileResult], output: Path):
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
+        for r in results:
+            writer.writerow("" if v is None else v for v in r)
+
+
+def optional_float(text: str) -> float | None:
+    return float(text) if text else None
+
+
+def load_compile_results(results_root: Path) -> list[CompileResult]:
+    """Every results/compile/<compiler>.csv, in compiler order."""
+    results = []
+    for path in sorted(
+        (results_root / "compile").glob("*.csv"),
+        key=lambda p: compiler_sort_key(p.stem),
+    ):
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                results.append(
+                    CompileResult(
+                        row["compiler"],
+                        row["family"],
+                        row["parameter"],
+                        int(row["value"]),
+                        optional_float(row["wall_s"]),
+                        optional_float(row["wall_min_s"]),
+                        optional_float(row["peak_rss_mib"]),
+                        int(row["repetitions"]),
+                        row["status"],
+                    )
+                )
+    return results
+
+
+SERIES_TITLES = {
+    ("static_for", "range"): "static_for range length",
+    ("static_for", "block"): f"static_for BlockSize (N={STATIC_FOR_BLOCK_RANGE})",
+    ("dynamic_for", "unroll"): "dynamic_for Unroll",
+    ("dispatch", "dims"): f"dispatch dimensions ({DISPATCH_DIM_WIDTH} values each)",
+    ("dispatch", "width"): "dispatch range width (1-D)",
+}
+
+
+def generate_compile_cost_chart(results: list[CompileResult], output: Path) -> bool:
+    """Wall time and peak RSS against each series parameter, per compiler."""
+    ok = [r for r in results if r.status == "ok"]
+    series = [
+        key for key in SERIES_TITLES if any((r.family, r.parameter) == key for r in ok)
+    ]
+    if not series:
+        print("Warning: no compile-time results to chart", file=sys.stderr)
+        return False
+
+    # Imported here: measuring needs no matplotlib.
+    import matplotlib.pyplot as plt
+    from generate_charts import compiler_color, style_chart
+
+    floor = {r.compiler: r for r in ok if r.family == "include"}
+    compilers = list(dict.fromkeys(r.compiler for r in ok))
+    fig, axes = plt.subplots(
+        2, len(series), figsize=(4.5 * len(series), 8), squeeze=False
+    )
+    for col, key in enumerate(series):
+        time_ax, rss_ax = axes[0][col], axes[1][col]
+        for i, compiler in enumerate(compilers):
+            points = sorted(
+                (
+                    r
+                    for r in ok
+                    if r.compiler == compiler and (r.family, r.parameter) == key
+                ),
+                key=lambda r: r.value,
+            )
+            if not points:
+                continue
+            x = [r.value for r in points]
+            style = {
+                "color": compiler_color(compiler),
+                "marker": "os^vD<>p"[i % 8],
+                "label": compiler,
+                "linewidth": 1.5,
+            }
+            time_ax.plot(x, [r.wall_s for r in points], **style)
+            rss_ax.plot(x, [r.peak_rss_mib for r in points], **style)
+            if compiler in floor:
+                time_ax.axhline(
+                    floor[compiler].wall_s,
+                    color=style["color"],
+                    linestyle=":",
+                    linewidth=0.8,
+                )
+        for ax in (time_ax, rss_ax):
+            ax.set_xscale("log", base=2)
+            ax.set_xlabel(key[1])
+        time_ax.set_ylabel("Compile time (s)")
+        rss_ax.set_ylabel("Peak RSS (MiB)")
+        style_chart(time_ax, SERIES_TITLES[key])
+        style_chart(rss_ax, "")
+    axes[0][0].legend(loc="upper left", framealpha=0.9, fontsize=8)
+
+    fig.tight_layout()
+    output.parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(str(output), format="svg", bbox_inches="tight")
+    plt.close(fig)
+    print(f"  Wrote {output}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure compile time and memory of POET's scaling parameters"
+    )
+    parser.add_argument(
+        "--compilers",
+        nargs="+",
+        help="Compilers (default: $POET_COMPILERS or all detected)",
+    )
+    parser.add_argument("--results-root", default="results")
+    parser.add_argument(
+        "--families", nargs="+", default=list(FAMILIES), choices=FAMILIES
+    )
+    parser.add_argument(
+        "--repetitions",
+        type=int,
+        default=3,
+        help="Compiles per point (median wall time)",
+    )
+    parser.add_argument("--no-chart", action="store_true", help="Skip compile_cost.svg")
+    args = parser.parse_args()
+
+    compilers = []
+    for compiler in args.compilers or discover_compilers():
+        if shutil.which(cxx_binary(compiler)):
+            compilers.append(compiler)
+        else:
+            print(f"Warning: {cxx_binary(compiler)} not found, skipping {compiler}")
+    if not compilers:
+        print("Error: no compilers found", file=sys.stderr)
+        sys.exit(1)
+
+    results_root = Path(args.results_root)
+    selected = cases(args.families)
+    with tempfile.TemporaryDirectory(prefix="poet_compile_") as tmp:
+        for compiler in compilers:
+            print(f"Compiling {len(selected)} translation units with {compiler}")
+            results = [
+                measure(compiler, case, args.repetitions, Path(tmp))
+                for case in selected
+            ]
+            output = results_root / "compile" / f"{compiler}.csv"
+            write_results(results, output)
+            print(f"    OK: {output}")
+
+    if not args.no_chart:
+        generate_compile_cost_chart(
+            load_compile_results(results_root),
+            results_root / "summary" / "compile_cost.svg",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,769 @@
+#!/usr/bin/env python3
+"""Jump-table shape of the dispatch benchmarks, read from the binaries.
+
+Usage:
+    python3 scripts/dispatch_shape.py BINARY [BINARY ...] [--output dispatch_shape.md]
+                                      [--filter REGEX] [--compiler gcc-14]
+
+For every benchmark matching --filter (default: the DispatchBaselines/* and
+Dispatch/<N>D_* benchmarks of poet_compiler_comparison_bench and
+poet_dispatch_bench), the lambda registered under that name is located
+from main's RegisterBenchmark calls and its Run() function is
+disassembled, together with the non-library functions it calls directly.
+
+Every indirect call or jump indexed by a register is a dispatch site. Its
+table address comes from the RIP-relative lea (adrp/add on AArch64) that
+loads the table base, its size from the table's symbol or else from the
+bounds check on the lookup path, cut at the next symbol or code-referenced
+address, and its targets from the relative relocations that fill it in a
+PIE (or the raw table words). A table with neither is reported as "?". The lookup path is the shortest
+path through the benchmark loop from the loop header to the site, and the
+iteration is the shortest cycle through the site; both are counted in
+instructions and compared against the if_else, switch and fn_ptr
+baselines.
+"""
+
+import argparse
+import bisect
+import math
+import re
+import struct
+import subprocess
+import sys
+from collections import deque
+from pathlib import Path
+from typing import NamedTuple
+
+from asm_loops import (
+    ANNOTATION_RE,
+    BasicBlock,
+    Instruction,
+    basic_blocks,
+    gpr,
+    innermost,
+    natural_loops,
+    parse_instructions,
+)
+from elf_info import object_sizes, read_at, relative_relocations, section_range
+from extract_asm import (
+    NM_LINE_RE,
+    find_nm,
+    find_objdump,
+    iter_functions,
+    iter_objdump_ranges,
+    read_text_symbols,
+    symbol_ranges,
+)
+
+DEFAULT_FILTER = r"^DispatchBaselines/|^Dispatch/\d+D_"
+BASELINES = ("if_else", "switch", "fn_ptr")
+
+# Type of the callable a benchmark name was registered with.
+LAMBDA_RE = re.compile(r"(?:LambdaBenchmark|RegisterBenchmark)<(.+?)>(?:\(|$)")
+# Library code the dispatch path never lives in.
+LIBRARY_RE = re.compile(r"@plt$|^(?:benchmark|std|__gnu_cxx)::|^operator ")
+# Callees followed from Run(): its direct calls and theirs.
+CALL_DEPTH = 2
+MAX_NAME = 256
+
+# "# b0d7 <_IO_stdin_used+0xd7>" (GNU) or "# 0xb0d7 <...>" (llvm-objdump).
+X86_COMMENT_ADDRESS_RE = re.compile(r"#\s*(?:0x)?([0-9a-f]+)")
+X86_RIP_LEA_RE = re.compile(r"^-?(?:0x)?[0-9a-f]+\(%rip\),%(\w+)$")
+# "*0x0(%rbp,%rax,8)", "*0x4020(,%rax,8)", "*%rax".
+X86_INDIRECT_RE = re.compile(
+    r"^\*(?:(-?(?:0x)?[0-9a-f]+)?\((%\w+)?,(%\w+),(\d)\)|(%\w+))$"
+)
+# "(%rdx,%rax,4),%rax" of the movslq/mov that loads a table entry.
+X86_TABLE_LOAD_RE = re.compile(r"^(-?(?:0x)?[0-9a-f]+)?\((%\w+)?,(%\w+),(\d)\),(%\w+)$")
+X86_CMP_IMMEDIATE_RE = re.compile(r"^\$(0x[0-9a-f]+|\d+),(%\w+)$")
+AARCH64_ADRP_RE = re.compile(r"^([xw]\d+),\s*(?:0x)?([0-9a-f]+)")
+AARCH64_ADD_RE = re.compile(r"^([xw]\d+),\s*([xw]\d+),\s*#(0x[0-9a-f]+|\d+)$")
+AARCH64_TABLE_LOAD_RE = re.compile(
+    r"^([xw]\d+),\s*\[([xw]\d+),\s*([xw]\d+)(?:,\s*(?:lsl|[su]xtw)\s*#(\d))?\]$"
+)
+AARCH64_CMP_IMMEDIATE_RE = re.compile(r"^([xw]\d+),\s*#(0x[0-9a-f]+|\d+)$")
+
+# Unsigned branches that leave the table on index > limit (ja/b.hi) and on
+# index >= limit (jae/b.hs); their inverses keep the in-range path.
+INCLUSIVE_BRANCHES = frozenset({"ja", "jbe", "b.hi", "b.ls"})
+EXCLUSIVE_BRANCHES = frozenset({"jae", "jb", "jnb", "jnae", "b.hs", "b.lo", "b.cs"})
+# Larger compares are hashing or divisibility tests, not table limits.
+MAX_BOUND = 1 << 16
+
+
+class Site(NamedTuple):
+    """One indirect call or jump through a table."""
+
+    function: str
+    address: int
+    mnemonic: str
+    table: int | None
+    table_symbol: str | None
+    entry_size: int
+    entries: int | None
+    targets: tuple[str, ...]
+    # Table limits from the compare-and-branch checks on the lookup path.
+    bounds: tuple[int, ...]
+    lookup_insns: int | None
+    # None when the site is in a function called from the benchmark loop.
+    iteration_insns: int | None
+
+
+class DispatchShape(NamedTuple):
+    benchmark: str
+    function: str | None
+    sites: list[Site]
+    # Shortest cycle of the benchmark loop, with or without a site.
+    iteration_insns: int | None
+
+    @property
+    def iteration(self) -> int | None:
+        """Instructions per iteration, through the site when it is in the loop."""
+        if self.sites and self.sites[0].iteration_insns is not None:
+            return self.sites[0].iteration_insns
+        return self.iteration_insns
+
+    @property
+    def baseline(self) -> str | None:
+        name = self.benchmark.rsplit("/", 1)[-1]
+        return name if self.benchmark.startswith("DispatchBaselines/") else None
+
+
+class Image(NamedTuple):
+    """What the analysis needs from one binary."""
+
+    path: Path
+    symbols: dict[int, str]
+    relocations: dict[int, int]
+    objects: dict[int, int]
+    text: tuple[int, int] | None
+
+
+def parse_number(text: str) -> int:
+    return int(text, 16) if text.startswith(("0x", "-0x")) else int(text)
+
+
+def register(name: str, aarch64: bool) -> str | None:
+    """Architectural register of an operand, ignoring width."""
+    return gpr(name.lstrip("%"), aarch64)
+
+
+def written_register(insn: Instruction) -> str | None:
+    """Register written by an instruction (destination of two-operand forms)."""
+    code = insn.code
+    if insn.aarch64:
+        first = code.split(",", 1)[0].strip()
+        return register(first, True)
+    if "," not in code:
+        return None
+    return register(code.rsplit(",", 1)[1].strip(), False)
+
+
+def comment_address(insn: Instruction) -> int | None:
+    m = X86_COMMENT_ADDRESS_RE.search(insn.operands)
+    return int(m.group(1), 16) if m else None
+
+
+def annotation(insn: Instruction) -> str | None:
+    """Symbol objdump printed for the instruction, in its operands or comment."""
+    m = ANNOTATION_RE.search(insn.operands)
+    return m.group(1) if m else None
+
+
+def read_string(path: Path, address: int) -> str | None:
+    """NUL-terminated printable string at an address, if there is one."""
+    data = read_at(path, address, MAX_NAME)
+    if not data or b"\0" not in data:
+        return None
+    text = data.split(b"\0", 1)[0]
+    if not text or not all(32 <= c < 127 for c in text):
+        return None
+    return text.decode()
+
+
+def referenced_addresses(insns: list[Instruction]) -> list[int | None]:
+    """Address each instruction materializes: RIP-relative lea, adrp + add."""
+    pages: dict[str, int] = {}
+    addresses: list[int | None] = []
+    for insn in insns:
+        address = None
+        if insn.aarch64:
+            if insn.mnemonic == "adrp" and (m := AARCH64_ADRP_RE.match(insn.code)):
+                pages[m.group(1)] = int(m.group(2), 16)
+                address = pages[m.group(1)]
+            elif insn.mnemonic == "add" and (m := AARCH64_ADD_RE.match(insn.code)):
+                if m.group(2) in pages:
+                    address = pages[m.group(2)] + parse_number(m.group(3))
+        elif insn.mnemonic.startswith("lea") and X86_RIP_LEA_RE.match(insn.code):
+            address = comment_address(insn)
+        addresses.append(address)
+    return addresses
+
+
+def registered_lambdas(main: list[Instruction], path: Path) -> dict[str, str]:
+    """Benchmark name -> callable type, from main's RegisterBenchmark calls.
+
+    Each registration loads the name literal and then refers to the
+    LambdaBenchmark<T> vtable or to RegisterBenchmark<T>; the most recent
+    string is paired with T.
+    """
+    lambdas: dict[str, str] = {}
+    name = None
+    for insn, address in zip(main, referenced_addresses(main)):
+        if m := LAMBDA_RE.search(annotation(insn) or ""):
+            if name is not None:
+                lambdas.setdefault(name, m.group(1))
+                name = None
+        elif address is not None and (text := read_string(path, address)):
+            name = text
+    return lambdas
+
+
+def disassemble(
+    objdump: str, binary: Path, symbols: list[tuple[int, int, str]], wanted
+) -> dict[str, list[Instruction]]:
+    selected = [s for s in symbols if wanted(s[2])]
+    lines = iter_objdump_ranges(objdump, str(binary), symbol_ranges(symbols, selected))
+    return {
+        name: parse_instructions(body.splitlines())
+        for name, body in iter_functions(lines)
+    }
+
+
+def callees(insns: list[Instruction]) -> set[str]:
+    calls = set()
+    for insn in insns:
+        if insn.mnemonic.startswith(("call", "bl")) or insn.is_unconditional:
+            symbol = insn.symbol
+            if symbol and "+0x" not in insn.operands and not LIBRARY_RE.search(symbol):
+                calls.add(symbol)
+    return calls
+
+
+class FunctionGraph:
+    """CFG of one function, with instruction counts along shortest paths."""
+
+    def __init__(self, insns: list[Instruction]):
+        self.insns = insns
+        self.blocks: list[BasicBlock] = basic_blocks(insns)
+        self.block_of = {}
+        for b, block in enumerate(self.blocks):
+            for i in range(block.start, block.end):
+                self.block_of[i] = b
+        self.loops = innermost(natural_loops(self.blocks))
+
+    def size(self, b: int) -> int:
+        return self.blocks[b].end - self.blocks[b].start
+
+    def path(self, source: int, target: int, allowed: frozenset[int]) -> list[int]:
+        """Blocks of the shortest path source -> target (by instructions)."""
+        best = {source: self.size(source)}
+        previous: dict[int, int] = {}
+        queue = deque([source])
+        while queue:
+            b = queue.popleft()
+            for s in self.blocks[b].successors:
+                if s not in allowed or s == source:
+                    continue
+                cost = best[b] + self.size(s)
+                if cost < best.get(s, cost + 1):
+                    best[s] = cost
+                    previous[s] = b
+                    queue.append(s)
+        if target not in best:
+            return []
+        blocks = [target]
+        while blocks[-1] != source:
+            blocks.append(previous[blocks[-1]])
+        return blocks[::-1]
+
+    def loop_of(self, b: int):
+        """Innermost loop containing a block."""
+        loops = [loop for loop in self.loops if b in loop.blocks]
+        return min(loops, key=lambda loop: len(loop.blocks)) if loops else None
+
+    def cycle(self, loop, through: int) -> list[int]:
+        """Shortest cycle header -> through -> header, as instruction indices."""
+        there = self.path(loop.header, through, loop.blocks)
+        if not there:
+            return []
+        back = [
+            self.path(through, latch, loop.blocks) if latch != through else [through]
+            for latch in loop.latches
+        ]
+        back = [p for p in back if p]
+        if not back:
+            return []
+        blocks = there + min(back, key=self.instructions_in)[1:]
+        return [
+            i for b in blocks for i in range(self.blocks[b].start, self.blocks[b].end)
+        ]
+
+    def instructions_in(self, blocks: list[int]) -> int:
+        return sum(self.size(b) for b in blocks)
+
+    def shortest_cycle(self) -> list[int]:
+        """Shortest cycle of any innermost loop of the function."""
+        cycles = [self.cycle(loop, loop.header) for loop in self.loops]
+        return min((c for c in cycles if c), key=len, default=[])
+
+
+def table_load(
+    insns: list[Instruction], site: int, bases: list[int | None]
+) -> tuple[int | None, str | None, int, str | None] | None:
+    """(table address, base register, entry size, index register) of a site."""
+    insn = insns[site]
+    if insn.aarch64:
+        target = insn.code.split(",")[-1].strip()
+        for i in range(site - 1, -1, -1):
+            m = AARCH64_TABLE_LOAD_RE.match(insns[i].code)
+            if insns[i].mnemonic.startswith("ldr") and m and m.group(1) == target:
+                size = 1 << int(m.group(4) or 0)
+                return (
+                    base_address(insns, i, m.group(2), bases),
+                    m.group(2),
+                    size,
+                    m.group(3),
+                )
+            if written_register(insns[i]) == register(target, True):
+                return None
+        return None
+
+    m = X86_INDIRECT_RE.match(insn.code)
+    if not m:
+        return None
+    if m.group(5) is not None:
+        # "jmp *%rax": the table entry was loaded just before.
+        target = register(m.group(5), False)
+        for i in range(site - 1, -1, -1):
+            load = X86_TABLE_LOAD_RE.match(insns[i].code)
+            if (
+                load
+                and insns[i].mnemonic.startswith("mov")
+                and register(load.group(5), False) == target
+            ):
+                displacement, base, index, scale = load.group(1, 2, 3, 4)
+                return _x86_table(
+                    insns, i, displacement, base, index, int(scale), bases
+                )
+            if insns[i].is_branch or insns[i].mnemonic.startswith("call"):
+                return None
+        return None
+    displacement, base, index, scale = m.group(1, 2, 3, 4)
+    return _x86_table(insns, site, displacement, base, index, int(scale), bases)
+
+
+def _x86_table(
+    insns: list[Instruction],
+    i: int,
+    displacement: str | None,
+    base: str | None,
+    index: str,
+    scale: int,
+    bases: list[int | None],
+):
+    """table_load() result for a "disp(base,index,scale)" operand."""
+    offset = parse_number(displacement) if displacement else 0
+    if base is None:
+        return offset, None, scale, index
+    table = base_address(insns, i, base, bases)
+    return (None if table is None else table + offset), base, scale, index
+
+
+def base_address(
+    insns: list[Instruction], site: int, base: str, bases: list[int | None]
+) -> int | None:
+    """Address last loaded into the base register before the site."""
+    reg = register(base, insns[site].aarch64)
+    for i in range(site - 1, -1, -1):
+        if written_register(insns[i]) == reg:
+            return bases[i]
+    return None
+
+
+def table_entries(
+    image: Image, table: int, entry_size: int, bound: int | None, anchors: list[int]
+) -> tuple[int | None, list[int]]:
+    """(entry count, target addresses) of a table.
+
+    An unsymbolized table ends at the site's bounds-check limit and at the
+    next symbol or code-referenced address, where a neighbouring table may
+    start. Without a symbol size or a bounds check the count is unknown.
+    """
+    size = image.objects.get(table)
+    if size:
+        count = size // entry_size
+    else:
+        k = bisect.bisect_right(anchors, table)
+        if k < len(anchors):
+            span = (anchors[k] - table) // entry_size
+            bound = span if bound is None else min(bound, span)
+        count = bound
+        if count is None:
+            return None, []
+    targets: list[int] = []
+    if entry_size == 8 and table in image.relocations:
+        for k in range(count):
+            if table + 8 * k not in image.relocations:
+                break
+            targets.append(image.relocations[table + 8 * k])
+    else:
+        data = read_at(image.path, table, entry_size * count) or b""
+        fmt = {4: "i", 8: "Q"}.get(entry_size)
+        if fmt is None:
+            return count, []
+        for k in range(len(data) // entry_size):
+            (word,) = struct.unpack_from("<" + fmt, data, entry_size * k)
+            # 4-byte entries are offsets from the table (switch tables).
+            address = table + word if entry_size == 4 else word
+            if image.text and not image.text[0] <= address < image.text[1]:
+                break
+            targets.append(address)
+    return count, targets
+
+
+def bounds_checks(insns: list[Instruction], path: list[int]) -> tuple[int, ...]:
+    """Table limits enforced by compare + unsigned branch pairs on a path."""
+    limits = []
+    for a, b in zip(path, path[1:]):
+        cmp, branch = insns[a], insns[b]
+        if not cmp.mnemonic.startswith("cmp") or not branch.is_branch:
+            continue
+        if cmp.aarch64:
+            m = AARCH64_CMP_IMMEDIATE_RE.match(cmp.code)
+            value = parse_number(m.group(2)) if m else None
+        else:
+            m = X86_CMP_IMMEDIATE_RE.match(cmp.code)
+            value = parse_number(m.group(1)) if m else None
+        if value is None or value >= MAX_BOUND:
+            continue
+        if branch.mnemonic in INCLUSIVE_BRANCHES:
+            limits.append(value + 1)
+        elif branch.mnemonic in EXCLUSIVE_BRANCHES:
+            limits.append(value)
+    return tuple(limits)
+
+
+def find_sites(
+    image: Image, name: str, insns: list[Instruction], anchors: list[int]
+) -> list[Site]:
+    """Table sites of a function; anchors are sorted addresses tables end at."""
+    graph = FunctionGraph(insns)
+    bases = referenced_addresses(insns)
+    sites = []
+    for i, insn in enumerate(insns):
+        indirect = (
+            insn.mnemonic.startswith(("call", "jmp", "notrack")) and "*" in insn.code
+        )
+        if insn.aarch64:
+            indirect = insn.mnemonic in ("blr", "br")
+        if not indirect:
+            continue
+        load = table_load(insns, i, bases)
+        if load is None:
+            continue
+        table, _, entry_size, _ = load
+
+        b = graph.block_of[i]
+        # In the benchmark loop, the lookup starts at the loop header; in a
+        # called dispatch function, at its entry.
+        loop = graph.loop_of(b)
+        if loop is not None:
+            blocks = graph.path(loop.header, b, loop.blocks)
+            iteration = len(graph.cycle(loop, b)) or None
+        else:
+            blocks = graph.path(0, b, frozenset(range(len(graph.blocks))))
+            iteration = None
+        path = [
+            k for p in blocks for k in range(graph.blocks[p].start, graph.blocks[p].end)
+        ]
+        path = path[: path.index(i) + 1] if i in path else path
+        lookup = len(path) or None
+        bounds = bounds_checks(insns, path)
+        entries, targets = (None, [])
+        if table is not None:
+            entries, targets = table_entries(
+                image, table, entry_size, math.prod(bounds) if bounds else None, anchors
+            )
+        names = tuple(dict.fromkeys(image.symbols.get(t, f"{t:#x}") for t in targets))
+        sites.append(
+            Site(
+                name,
+                insn.address,
+                insn.mnemonic,
+                table,
+                image.symbols.get(table) if table is not None else None,
+                entry_size,
+                entries,
+                names,
+                bounds,
+                lookup,
+                iteration,
+            )
+        )
+    return sites
+
+
+def symbol_names(nm: str, binary: Path) -> dict[int, str]:
+    """Demangled name of every defined symbol, by address (code and data)."""
+    names: dict[int, str] = {}
+    try:
+        proc = subprocess.run(
+            [nm, "-C", "--defined-only", str(binary)],
+            check=False,
+            capture_output=True,
+            text=True,
+        )
+    except FileNotFoundError:
+        return names
+    for line in proc.stdout.splitlines():
+        if m := NM_LINE_RE.match(line):
+            names.setdefault(int(m.group(1), 16), m.group(4))
+    return names
+
+
+def analyze_binary(
+    binary: Path, pattern: re.Pattern, objdump: str, nm: str
+) -> list[DispatchShape]:
+    symbols = read_text_symbols(nm, str(binary))
+    if not symbols:
+        print(f"Warning: no symbols in {binary} (stripped?)", file=sys.stderr)
+        return []
+    image = Image(
+        binary,
+        symbol_names(nm, binary),
+        relative_relocations(binary),
+        object_sizes(binary),
+        section_range(binary, ".text"),
+    )
+
+    main = disassemble(objdump, binary, symbols, lambda n: n == "main").get("main", [])
+    lambdas = {
+        name: kind
+        for name, kind in registered_lambdas(main, binary).items()
+        if pattern.search(name)
+    }
+    if not lambdas:
+        print(
+            f"Warning: no matching benchmarks registered in {binary}", file=sys.stderr
+        )
+        return []
+
+    runs = {kind: f"LambdaBenchmark<{kind}>::Run(" for kind in lambdas.values()}
+    functions = disassemble(
+        objdump,
+        binary,
+        symbols,
+        lambda n: any(run in n for run in runs.values()),
+    )
+    # Follow direct calls out of Run(): non-inlined dispatch helpers.
+    frontier = set().union(*(callees(insns) for insns in functions.values()))
+    for _ in range(CALL_DEPTH):
+        frontier -= functions.keys()
+        if not frontier:
+            break
+        found = disassemble(objdump, binary, symbols, frontier.__contains__)
+        functions.update(found)
+        frontier = set().union(*(callees(insns) for insns in found.values()), set())
+
+    # Where an unsymbolized table may end: the next symbol, or the next
+    # address the code materializes (adrp pages excluded).
+    anchors = sorted(
+        set(image.symbols)
+        | {
+            address
+            for insns in functions.values()
+            for insn, address in zip(insns, referenced_addresses(insns))
+            if address is not None and insn.mnemonic != "adrp"
+        }
+    )
+    shapes = []
+    for name, kind in lambdas.items():
+        run = next((f for f in functions if runs[kind] in f), None)
+        if run is None:
+            shapes.append(DispatchShape(name, None, [], None))
+            continue
+        reached = [run]
+        for _ in range(CALL_DEPTH):
+            calls = [c for f in reached for c in sorted(callees(functions[f]))]
+            reached = list(
+                dict.fromkeys(reached + [c for c in calls if c in functions])
+            )
+        sites = [
+            s for f in reached for s in find_sites(image, f, functions[f], anchors)
+        ]
+        graph = FunctionGraph(functions[run])
+        cycle = graph.shortest_cycle()
+        shapes.append(DispatchShape(name, run, sites, len(cycle) or None))
+    return shapes
+
+
+def comparison(shapes: list[DispatchShape]) -> str:
+    """POET against the baselines, in instructions per iteration."""
+    by_name = {s.baseline: s for s in shapes if s.baseline}
+    poet = by_name.get("POET")
+    if poet is None or poet.iteration is None:
+        return ""
+    parts = []
+    for baseline in BASELINES:
+        other = by_name.get(baseline)
+        if other is None or other.iteration is None:
+            continue
+        delta = poet.iteration - other.iteration
+        parts.append(f"{delta:+d} vs {baseline}")
+    fn_ptr = by_name.get("fn_ptr")
+    if poet.sites and fn_ptr and fn_ptr.sites:
+        p, f = poet.sites[0].lookup_insns, fn_ptr.sites[0].lookup_insns
+        if p is not None and f is not None:
+            parts.append(f"lookup {p} vs {f} insns for fn_ptr")
+    if not parts:
+        return ""
+    return (
+        f"POET iterates in {poet.iteration} instructions: " + ", ".join(parts) + ".\n\n"
+    )
+
+
+def warnings(shape: DispatchShape) -> list[str]:
+    notes = []
+    if shape.function is None:
+        return ["Run() not found"]
+    if not shape.sites and shape.baseline in (None, "POET", "fn_ptr"):
+        notes.append("no indirect call or jump through a table")
+    for site in shape.sites:
+        if site.table is None:
+            notes.append(f"{site.address:#x}: table address not resolved")
+            continue
+        if site.entries is None:
+            notes.append(f"{site.address:#x}: table size not resolved")
+        elif site.bounds:
+            covered = 1
+            for limit in site.bounds:
+                covered *= limit
+            if covered > site.entries and len(site.bounds) == 1:
+                notes.append(
+                    f"{site.address:#x}: bounds check allows {covered} entries, "
+                    f"table has {site.entries}"
+                )
+    if len({s.table for s in shape.sites}) > 1:
+        notes.append(f"{len(shape.sites)} dispatch sites")
+    return notes
+
+
+def cell(value) -> str:
+    return "—" if value is None else str(value)
+
+
+def entries_cell(site: Site | None) -> str:
+    """Table size; ? for a resolved table of unknown size."""
+    if site is not None and site.table is not None and site.entries is None:
+        return "?"
+    return cell(site.entries if site else None)
+
+
+def targets_cell(site: Site | None) -> str:
+    if site is None:
+        return "—"
+    return (
+        "?"
+        if site.table is not None and site.entries is None
+        else str(len(site.targets))
+    )
+
+
+def table_label(symbol: str) -> str:
+    """Table symbol with template arguments elided: "f<…>::table"."""
+    if "<" not in symbol:
+        return symbol
+    return f"{symbol.split('<', 1)[0]}<…>::{symbol.rsplit('::', 1)[-1]}"
+
+
+def iteration_cell(shape: DispatchShape) -> str:
+    """Iteration through the site, or the loop plus a call to the site."""
+    if shape.sites and shape.sites[0].iteration_insns is None:
+        if shape.iteration_insns is not None:
+            return f"{shape.iteration_insns} + call"
+    return cell(shape.iteration)
+
+
+def write_report(results: list[tuple[Path, list[DispatchShape]]], out):
+    out.write("# Dispatch Shape\n\n")
+    out.write(
+        "Indirect calls and jumps through a table in each dispatch benchmark. "
+        "Entries is the table size (from its symbol, or else its bounds check; "
+        "? when neither is known), Targets "
+        "the distinct functions it points to, and Bounds the limits checked "
+        "on the way to the site. Lookup counts the instructions from the loop "
+        "header (or the called function's entry) to the site, Iteration the "
+        "shortest loop cycle through it (+ call when it is in a called "
+        "function); — marks a "
+        "benchmark without a table site.\n\n"
+    )
+    if not any(shapes for _, shapes in results):
+        out.write("No dispatch benchmarks found.\n")
+        return
+    for binary, shapes in results:
+        if not shapes:
+            continue
+        out.write(f"## {binary.name}\n\n")
+        out.write(comparison(shapes))
+        out.write(
+            "| Benchmark | Sites | Table | Entries | Targets | Bounds "
+            "| Lookup insns | Iteration insns |\n"
+            "|:----------|------:|:------|--------:|--------:|:-------"
+            "|-------------:|----------------:|\n"
+        )
+        notes = []
+        for shape in shapes:
+            site = shape.sites[0] if shape.sites else None
+            table = "—"
+            if site is not None and site.table is not None:
+                label = table_label(site.table_symbol or "")
+                table = f"{site.table:#x} {label}".strip().replace("|", "\\|")
+            out.write(
+                f"| {shape.benchmark} | {len(shape.sites)} | {table} "
+                f"| {entries_cell(site)} "
+                f"| {targets_cell(site)} "
+                f"| {'×'.join(map(str, site.bounds)) if site and site.bounds else '—'} "
+                f"| {cell(site.lookup_insns if site else None)} "
+                f"| {iteration_cell(shape)} |\n"
+            )
+            notes += [f"{shape.benchmark}: {n}" for n in warnings(shape)]
+        out.write("\n")
+        for note in notes:
+            out.write(f"- WARNING: {note}\n")
+        if notes:
+            out.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report jump-table dispatch sites of the dispatch benchmarks"
+    )
+    parser.add_argument("binaries", nargs="+", help="Benchmark binaries")
+    parser.add_argument("--output", help="Markdown report (default: stdout)")
+    parser.add_argument("--filter", default=DEFAULT_FILTER, help="Benchmark regex")
+    parser.add_argument("--compiler", default="", help="Compiler, to pick objdump/nm")
+    args = parser.parse_args()
+
+    objdump = find_objdump(args.compiler)
+    nm = find_nm(args.compiler)
+    pattern = re.compile(args.filter)
+    results = []
+    for binary in map(Path, args.binaries):
+        if not binary.is_file():
+            print(f"Warning: {binary} not found", file=sys.stderr)
+            continue
+        results.append((binary, analyze_binary(binary, pattern, objdump, nm)))
+
+    if args.output is None:
+        write_report(results, sys.stdout)
+        return
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        write_report(results, f)
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""Minimal ELF reader for the benchmark tooling (no third-party dependencies).
+
+Only parses what the scripts need: section headers, the GNU build-id note,
+object symbol sizes, relative relocations and raw bytes at an address.
+"""
+
+import hashlib
+import struct
+from pathlib import Path
+from typing import BinaryIO, NamedTuple
+
+SHT_SYMTAB = 2
+SHT_RELA = 4
+SHT_NOTE = 7
+SHT_NOBITS = 8
+SHT_RELR = 19
+NT_GNU_BUILD_ID = 3
+STT_OBJECT = 1
+# R_X86_64_RELATIVE and R_AARCH64_RELATIVE.
+RELATIVE_TYPES = frozenset({8, 1027})
+
+
+class Section(NamedTuple):
+    name_offset: int
+    type: int
+    flags: int
+    addr: int
+    offset: int
+    size: int
+    link: int
+    entsize: int
+
+
+class ElfHeader(NamedTuple):
+    is64: bool
+    endian: str
+    shoff: int
+    shentsize: int
+    shnum: int
+    shstrndx: int
+
+
+def read_header(f: BinaryIO) -> ElfHeader | None:
+    """Parse the ELF file header, or return None if f is not an ELF file."""
+    f.seek(0)
+    ident = f.read(16)
+    if len(ident) < 16 or ident[:4] != b"\x7fELF":
+        return None
+    is64 = ident[4] == 2
+    endian = "<" if ident[5] == 1 else ">"
+    rest = f.read(48 if is64 else 36)
+    if is64:
+        (shoff,) = struct.unpack_from(endian + "Q", rest, 40 - 16)
+        shentsize, shnum, shstrndx = struct.unpack_from(endian + "HHH", rest, 58 - 16)
+    else:
+        (shoff,) = struct.unpack_from(endian + "I", rest, 32 - 16)
+        shentsize, shnum, shstrndx = struct.unpack_from(endian + "HHH", rest, 46 - 16)
+    return ElfHeader(is64, endian, shoff, shentsize, shnum, shstrndx)
+
+
+def read_sections(f: BinaryIO, hdr: ElfHeader) -> list[Section]:
+    """Read all section headers."""
+    f.seek(hdr.shoff)
+    raw = f.read(hdr.shentsize * hdr.shnum)
+    fmt = hdr.endian + ("IIQQQQIIQQ" if hdr.is64 else "IIIIIIIIII")
+    sections = []
+    for i in range(hdr.shnum):
+        (name, type_, flags, addr, offset, size, link, _info, _align, entsize) = (
+            struct.unpack_from(fmt, raw, i * hdr.shentsize)
+        )
+        sections.append(Section(name, type_, flags, addr, offset, size, link, entsize))
+    return sections
+
+
+def section_names(f: BinaryIO, hdr: ElfHeader, sections: list[Section]) -> list[str]:
+    """Resolve section names through the section-header string table."""
+    if hdr.shstrndx >= len(sections):
+        return [""] * len(sections)
+    strtab = sections[hdr.shstrndx]
+    f.seek(strtab.offset)
+    data = f.read(strtab.size)
+    names = []
+    for s in sections:
+        end = data.find(b"\0", s.name_offset)
+        names.append(data[s.name_offset : end].decode(errors="replace"))
+    return names
+
+
+def section_range(path: Path, name: str) -> tuple[int, int] | None:
+    """[start, end) virtual address range of a named section, if present."""
+    try:
+        with open(path, "rb") as f:
+            hdr = read_header(f)
+            if hdr is None:
+                return None
+            sections = read_sections(f, hdr)
+            for s, s_name in zip(sections, section_names(f, hdr, sections)):
+                if s_name == name:
+                    return (s.addr, s.addr + s.size)
+    except (OSError, struct.error):
+        return None
+    return None
+
+
+def read_at(path: Path, address: int, size: int) -> bytes | None:
+    """Bytes at a virtual address, from the section that contains it."""
+    try:
+        with open(path, "rb") as f:
+            hdr = read_header(f)
+            if hdr is None:
+                return None
+            for s in read_sections(f, hdr):
+                if s.type == SHT_NOBITS or not s.addr <= address < s.addr + s.size:
+                    continue
+                f.seek(s.offset + address - s.addr)
+                return f.read(min(size, s.addr + s.size - address))
+    except (OSError, struct.error):
+        return None
+    return None
+
+
+def object_sizes(path: Path) -> dict[int, int]:
+    """Size of every data object in the symbol table, by address."""
+    sizes: dict[int, int] = {}
+    try:
+        with open(path, "rb") as f:
+            hdr = read_header(f)
+            if hdr is None or not hdr.is64:
+                return sizes
+            for s in read_sections(f, hdr):
+                if s.type != SHT_SYMTAB:
+                    continue
+                f.seek(s.offset)
+                data = f.read(s.size)
+                for pos in range(0, len(data) - 23, 24):
+                    _, info, _, _, value, size = struct.unpack_from(
+                        hdr.endian + "IBBHQQ", data, pos
+                    )
+                    if info & 0xF == STT_OBJECT and size:
+                        sizes[value] = max(size, sizes.get(value, 0))
+    except (OSError, struct.error):
+        return {}
+    return sizes
+
+
+def relative_relocations(path: Path) -> dict[int, int]:
+    """Target of every relative relocation (RELA and RELR), by patched address.
+
+    In a position-independent binary these are the pointers stored in
+    read-only data, such as function-pointer tables.
+    """
+    targets: dict[int, int] = {}
+    try:
+        with open(path, "rb") as f:
+            hdr = read_header(f)
+            if hdr is None or not hdr.is64:
+                return targets
+            sections = read_sections(f, hdr)
+            for s in sections:
+                if s.type not in (SHT_RELA, SHT_RELR):
+                    continue
+                f.seek(s.offset)
+                data = f.read(s.size)
+                if s.type == SHT_RELA:
+                    for pos in range(0, len(data) - 23, 24):
+                        offset, info, addend = struct.unpack_from(
+                            hdr.endian + "QQq", data, pos
+                        )
+                        if info & 0xFFFFFFFF in RELATIVE_TYPES:
+                            targets[offset] = addend
+                    continue
+                # RELR: an address, then bitmaps of the following 63 words.
+                where = 0
+                for (entry,) in struct.iter_unpack(hdr.endian + "Q", data):
+                    if entry & 1 == 0:
+                        targets[entry] = -1
+                        where = entry + 8
+                        continue
+                    for bit in range(63):
+                        if entry >> (bit + 1) & 1:
+                            targets[where + 8 * bit] = -1
+                    where += 63 * 8
+            # RELR addends are stored in place.
+            for address in [a for a, t in targets.items() if t == -1]:
+                for s in sections:
+                    if s.type != SHT_NOBITS and s.addr <= address < s.addr + s.size:
+                        f.seek(s.offset + address - s.addr)
+                        (targets[address],) = struct.unpack(hdr.endian + "Q", f.read(8))
+                        break
+    except (OSError, struct.error):
+        return {}
+    return targets
+
+
+def read_build_id(path: Path) -> str | None:
+    """Return the hex GNU build-id of an ELF file, if it has one."""
+    try:
+        with open(path, "rb") as f:
+            hdr = read_header(f)
+            if hdr is None:
+                return None
+            for s in read_sections(f, hdr):
+                if s.type != SHT_NOTE:
+                    continue
+                f.seek(s.offset)
+                data = f.read(s.size)
+                pos = 0
+                while pos + 12 <= len(data):
+                    namesz, descsz, ntype = struct.unpack_from(
+                        hdr.endian + "III", data, pos
+                    )
+                    pos += 12
+                    name = data[pos : pos + namesz]
+                    pos += (namesz + 3) & ~3
+                    desc = data[pos : pos + descsz]
+                    pos += (descsz + 3) & ~3
+                    if ntype == NT_GNU_BUILD_ID and name.rstrip(b"\0") == b"GNU":
+                        return desc.hex()
+    except (OSError, struct.error):
+        return None
+    return None
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a file's contents, read in chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def binary_identity(path: Path) -> str:
+    """Stable identity of a binary: its build-id, else a content hash."""
+    build_id = read_build_id(path)
+    if build_id:
+        return f"build-id:{build_id}"
+    return f"sha256:{file_digest(path)}"
@@ -3,17 +3,31 @@
 
 Usage:
     python3 extract_asm.py BINARY OUTPUT.asm [--compiler clang-22] [--bench compiler_comparison_bench]
+    python3 extract_asm.py --output-dir ASM_DIR [--jobs N] BINARY... [--compiler clang-22]
 
 Selects objdump binary: llvm-objdump-N for clang-N, else objdump.
 Filters to hot functions via configurable regex patterns per benchmark.
+objdump output is consumed as a stream, and extracted listings are cached by
+the binary's build-id (or content hash) so unchanged binaries are skipped.
 """
 
 import argparse
+import hashlib
+import os
 import re
 import shutil
 import subprocess
 import sys
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import TextIO
+
+from elf_info import binary_identity, section_range
+
+# Bump when the extracted listing changes for the same binary, so cached
+# listings are extracted again.
+EXTRACT_VERSION = 2
 
 # Per-benchmark hot function patterns
 BENCH_PATTERNS: dict[str, list[str]] = {
@@ -49,12 +63,36 @@ BENCH_PATTERNS: dict[str, list[str]] = {
         r"dynamic_for",
         r"execute_block",
         r"dispatch_tail",
+        r"tail_binary",
     ],
 }
 
 # Max stubs to keep for dispatch bench
 MAX_STUBS = 20
 
+# Function label: address <name>:
+FUNCTION_LABEL_RE = re.compile(r"^[0-9a-f]+ <(.+)>:\s*$")
+HEX_DIGITS = frozenset("0123456789abcdef")
+
+# nm -C -S line: address [size] type name
+NM_LINE_RE = re.compile(r"^([0-9a-f]+) (?:([0-9a-f]+) )?([A-Za-z]) (.+)$")
+TEXT_SYMBOL_TYPES = frozenset("TtWw")
+
+# "full" dumps all of .text and filters by name; "symbols" resolves the
+# matching symbols with nm first and disassembles only their address ranges.
+MODES = ("symbols", "full")
+# Selected symbols closer than this share one objdump address range.
+MAX_RANGE_GAP = 1 << 16
+
+# Extracted listings are stored here keyed by binary identity (build-id or
+# content hash), objdump and patterns, so an unchanged binary is never
+# disassembled twice.
+DEFAULT_CACHE_DIR = (
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    / "poet"
+    / "extract_asm"
+)
+
 
 def find_objdump(compiler: str) -> str:
     """Find the appropriate objdump for the given compiler."""
@@ -71,124 +109,425 @@ def find_objdump(compiler: str) -> str:
     return "objdump"
 
 
+def find_nm(compiler: str) -> str:
+    """Find the nm matching the given compiler (llvm-nm-N for clang-N)."""
+    if compiler.startswith("clang-"):
+        version = compiler.split("-", 1)[1]
+        for candidate in (f"llvm-nm-{version}", "llvm-nm"):
+            if shutil.which(candidate):
+                return candidate
+    return "nm"
+
+
+def _objdump_commands(
+    objdump_bin: str, binary: str, extra_args: list[str]
+) -> list[list[str]]:
+    return [
+        [objdump_bin, "-d", "--demangle", *extra_args, "-j", ".text", binary],
+        # Some objdump versions don't support -j .text; retry without
+        [objdump_bin, "-d", "--demangle", *extra_args, binary],
+    ]
+
+
+def iter_objdump(
+    objdump_bin: str, binary: str, extra_args: list[str] | None = None
+) -> Iterator[str]:
+    """Run objdump and yield its disassembly line by line as it is produced."""
+    extra_args = extra_args or []
+    for cmd in _objdump_commands(objdump_bin, binary, extra_args):
+        try:
+            proc = subprocess.Popen(
+                cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+            )
+        except FileNotFoundError:
+            if objdump_bin == "objdump":
+                return
+            print(f"Warning: {objdump_bin} not found, trying objdump", file=sys.stderr)
+            yield from iter_objdump("objdump", binary, extra_args)
+            return
+
+        saw_function = False
+        with proc:
+            for line in proc.stdout:
+                if not saw_function and FUNCTION_LABEL_RE.match(line):
+                    saw_function = True
+                yield line.rstrip("\n")
+        if proc.returncode == 0 or saw_function:
+            return
+
+
 def run_objdump(objdump_bin: str, binary: str) -> str:
     """Run objdump and return the disassembly text."""
-    cmd = [objdump_bin, "-d", "--demangle", "-j", ".text", binary]
+    return "\n".join(iter_objdump(objdump_bin, binary))
+
+
+def read_text_symbols(nm_bin: str, binary: str) -> list[tuple[int, int, str]]:
+    """Read (address, size, demangled_name) of every code symbol, by address.
+
+    Aliases sharing an address are reported once. Returns an empty list when
+    nm is unavailable or the binary is stripped.
+    """
+    cmd = [nm_bin, "-C", "-S", "--defined-only", binary]
     try:
-        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
-        if proc.returncode != 0:
-            # Some objdump versions don't support -j .text; retry without
-            cmd_fallback = [objdump_bin, "-d", "--demangle", binary]
-            proc = subprocess.run(
-                cmd_fallback, capture_output=True, text=True, timeout=120
-            )
-        return proc.stdout
+        proc = subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+        )
     except FileNotFoundError:
-        print(f"Warning: {objdump_bin} not found, trying objdump", file=sys.stderr)
-        cmd = ["objdump", "-d", "--demangle", binary]
-        return subprocess.run(cmd, capture_output=True, text=True, timeout=120).stdout
+        return []
+
+    by_address: dict[int, tuple[int, int, str]] = {}
+    with proc:
+        for line in proc.stdout:
+            m = NM_LINE_RE.match(line)
+            if not m or m.group(3) not in TEXT_SYMBOL_TYPES:
+                continue
+            address = int(m.group(1), 16)
+            size = int(m.group(2), 16) if m.group(2) else 0
+            if address not in by_address or size > by_address[address][1]:
+                by_address[address] = (address, size, m.group(4))
+    if proc.returncode != 0:
+        return []
+    return sorted(by_address.values())
+
 
+def symbol_ranges(
+    symbols: list[tuple[int, int, str]], selected: list[tuple[int, int, str]]
+) -> list[tuple[int, int]]:
+    """Address ranges covering the selected symbols.
 
-def split_functions(disasm: str) -> list[tuple[str, str]]:
-    """Split disassembly into (function_name, body) tuples."""
-    functions = []
+    Selected symbols less than MAX_RANGE_GAP bytes apart share one range,
+    even across unselected symbols (the name filter drops those again), so
+    a binary needs one objdump invocation per cluster of hot functions.
+    """
+    wanted = {address for address, _, _ in selected}
+    ranges: list[tuple[int, int]] = []
+    for address, size, _ in symbols:
+        if address not in wanted or size == 0:
+            continue
+        if ranges and address - ranges[-1][1] < MAX_RANGE_GAP:
+            ranges[-1] = (ranges[-1][0], max(ranges[-1][1], address + size))
+        else:
+            ranges.append((address, address + size))
+    return ranges
+
+
+def iter_objdump_ranges(
+    objdump_bin: str, binary: str, ranges: list[tuple[int, int]]
+) -> Iterator[str]:
+    """Disassemble only the given [start, stop) address ranges.
+
+    Each invocation's banner ("file format", "Disassembly of section")
+    precedes its first function label and is dropped, so it does not end
+    up in the body of the previous range's last function.
+    """
+    for start, stop in ranges:
+        lines = iter_objdump(
+            objdump_bin,
+            binary,
+            [f"--start-address={start:#x}", f"--stop-address={stop:#x}"],
+        )
+        in_function = False
+        for line in lines:
+            if not in_function:
+                if line[:1] not in HEX_DIGITS or not FUNCTION_LABEL_RE.match(line):
+                    continue
+                in_function = True
+            yield line
+
+
+class NameFilter:
+    """Match function names against BENCH_PATTERNS-style regexes.
+
+    Stateful: stub functions are capped at MAX_STUBS across all calls, and
+    ``seen`` counts every name tested.
+    """
+
+    def __init__(self, patterns: list[str]):
+        self.compiled = [re.compile(p, re.IGNORECASE) for p in patterns]
+        self.stub_count = 0
+        self.seen = 0
+
+    def __call__(self, name: str) -> bool:
+        self.seen += 1
+        for pat in self.compiled:
+            if pat.search(name):
+                # Cap stub functions
+                if "stub" in name.lower() or "_FUN" in name:
+                    self.stub_count += 1
+                    if self.stub_count > MAX_STUBS:
+                        continue
+                return True
+        return False
+
+
+def iter_functions(
+    lines: Iterable[str], keep: Callable[[str], bool] | None = None
+) -> Iterator[tuple[str, str]]:
+    """Yield (function_name, body) from a stream of disassembly lines.
+
+    The label pattern is only tried on lines that start with a hex digit
+    (instruction lines are indented), and ``keep`` is asked once per
+    function. Bodies of rejected functions are skipped without being
+    buffered, so memory is bounded by the largest kept function.
+    """
     current_name = None
     current_lines: list[str] = []
+    keeping = False
 
-    for line in disasm.splitlines():
-        # Function label: address <name>:
-        m = re.match(r"^[0-9a-f]+ <(.+)>:\s*$", line)
+    for line in lines:
+        m = FUNCTION_LABEL_RE.match(line) if line[:1] in HEX_DIGITS else None
         if m:
-            if current_name and current_lines:
-                functions.append((current_name, "\n".join(current_lines)))
+            if keeping and current_name:
+                yield current_name, "\n".join(current_lines)
             current_name = m.group(1)
-            current_lines = [line]
-        elif current_name is not None:
+            keeping = keep is None or keep(current_name)
+            current_lines = [line] if keeping else []
+        elif keeping:
             current_lines.append(line)
 
-    if current_name and current_lines:
-        functions.append((current_name, "\n".join(current_lines)))
+    if keeping and current_name:
+        yield current_name, "\n".join(current_lines)
+
 
-    return functions
+def split_functions(disasm: str | Iterable[str]) -> list[tuple[str, str]]:
+    """Split disassembly text or lines into (function_name, body) tuples."""
+    lines = disasm.splitlines() if isinstance(disasm, str) else disasm
+    return list(iter_functions(lines))
+
+
+def select_by_name(items: list, patterns: list[str], name=lambda item: item[0]):
+    """Keep items whose name matches any of the given regex patterns."""
+    keep = NameFilter(patterns)
+    return [item for item in items if keep(name(item))]
 
 
 def filter_functions(
     functions: list[tuple[str, str]], patterns: list[str]
 ) -> list[tuple[str, str]]:
     """Filter functions matching any of the given regex patterns."""
-    compiled = [re.compile(p, re.IGNORECASE) for p in patterns]
-    matched = []
-    stub_count = 0
+    return select_by_name(functions, patterns)
 
-    for name, body in functions:
-        for pat in compiled:
-            if pat.search(name):
-                # Cap stub functions
-                if "stub" in name.lower() or "_FUN" in name:
-                    stub_count += 1
-                    if stub_count > MAX_STUBS:
-                        continue
-                matched.append((name, body))
-                break
 
-    return matched
+def bench_name_for(binary_path: Path) -> str:
+    """Benchmark name of a poet_<bench>[_native] binary."""
+    return binary_path.stem.replace("poet_", "").replace("_native", "")
+
+
+def write_header(
+    out: TextIO,
+    binary_path: Path,
+    compiler: str,
+    objdump_bin: str,
+    patterns: list[str],
+    n_matched: int,
+    n_functions: int,
+):
+    out.write(f"; Hot-path assembly: {binary_path.name}\n")
+    out.write(f"; Compiler: {compiler}\n")
+    out.write(f"; Objdump: {objdump_bin}\n")
+    out.write(f"; Patterns: {patterns}\n")
+    out.write(f"; Functions matched: {n_matched} / {n_functions}\n")
+    out.write(f"; {'=' * 72}\n\n")
+
+
+def write_function(out: TextIO, name: str, body: str):
+    out.write(f"; --- {name} ---\n")
+    out.write(body)
+    out.write("\n\n")
+
+
+def cache_key(
+    binary_path: Path, compiler: str, objdump_bin: str, patterns, mode: str
+) -> str:
+    """Key an extracted listing by everything that determines its content."""
+    h = hashlib.sha256()
+    for part in (
+        str(EXTRACT_VERSION),
+        binary_identity(binary_path),
+        binary_path.name,
+        compiler,
+        objdump_bin,
+        repr(patterns),
+        mode,
+    ):
+        h.update(part.encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def extract(
+    binary_path: Path,
+    output_path: Path,
+    compiler: str,
+    bench_name: str = "",
+    cache_dir: Path | None = None,
+    mode: str = "symbols",
+) -> tuple[int, bool]:
+    """Extract hot functions of one binary into output_path.
+
+    In "symbols" mode only the address ranges of symbols matching the
+    benchmark's patterns are disassembled; it falls back to a full .text
+    dump when the symbol table cannot be read.
+
+    Returns (functions_matched, from_cache); functions_matched is -1 when
+    the disassembly came back empty.
+    """
+    if not bench_name:
+        bench_name = bench_name_for(binary_path)
+    patterns = BENCH_PATTERNS.get(bench_name, [r".*"])
+    objdump_bin = find_objdump(compiler)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    cached = None
+    if cache_dir is not None:
+        key = cache_key(binary_path, compiler, objdump_bin, patterns, mode)
+        cached = cache_dir / key[:2] / f"{key}.asm"
+        if cached.exists():
+            shutil.copyfile(cached, output_path)
+            with open(cached) as f:
+                for line in f:
+                    if line.startswith("; Functions matched:"):
+                        return int(line.split(":")[1].split("/")[0]), True
+            return 0, True
+
+    symbols = []
+    if mode == "symbols":
+        symbols = read_text_symbols(find_nm(compiler), str(binary_path))
+        text = section_range(binary_path, ".text")
+        if text is not None:
+            symbols = [sym for sym in symbols if text[0] <= sym[0] < text[1]]
+
+    keep = NameFilter(patterns)
+    if symbols:
+        selected = select_by_name(symbols, patterns, name=lambda sym: sym[2])
+        ranges = symbol_ranges(symbols, selected)
+        lines = iter_objdump_ranges(objdump_bin, str(binary_path), ranges)
+    else:
+        lines = iter_objdump(objdump_bin, str(binary_path))
+
+    # Hot functions are streamed to a body file as they arrive; the header
+    # needs the final counts, so it is prepended afterwards.
+    body_tmp = output_path.with_name(output_path.name + ".body.tmp")
+    n_matched = 0
+    with open(body_tmp, "w") as body:
+        for name, text in iter_functions(lines, keep):
+            write_function(body, name, text)
+            n_matched += 1
+
+    n_functions = len(symbols) if symbols else keep.seen
+    if n_functions == 0:
+        body_tmp.unlink()
+        return -1, False
+
+    tmp = output_path.with_name(output_path.name + ".tmp")
+    with open(tmp, "w") as f:
+        write_header(
+            f, binary_path, compiler, objdump_bin, patterns, n_matched, n_functions
+        )
+        with open(body_tmp) as body:
+            shutil.copyfileobj(body, f)
+    body_tmp.unlink()
+    if cached is not None:
+        # Copy next to the entry and rename it into place, so an
+        # interrupted copy never leaves a truncated listing in the cache.
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        cached_tmp = cached.with_name(f"{cached.name}.{os.getpid()}.tmp")
+        shutil.copyfile(tmp, cached_tmp)
+        os.replace(cached_tmp, cached)
+    os.replace(tmp, output_path)
+
+    return n_matched, False
+
+
+def _extract_job(
+    job: tuple[Path, Path, str, str, Path | None, str],
+) -> tuple[int, bool]:
+    return extract(*job)
 
 
 def main():
     parser = argparse.ArgumentParser(
         description="Extract hot-path assembly from benchmark binaries"
     )
-    parser.add_argument("binary", help="Path to the benchmark binary")
-    parser.add_argument("output", help="Output .asm file path")
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        help="BINARY OUTPUT.asm, or BINARY... with --output-dir",
+    )
     parser.add_argument(
         "--compiler", default="gcc", help="Compiler name (e.g., gcc-15, clang-22)"
     )
     parser.add_argument(
         "--bench", default="", help="Benchmark name for pattern selection"
     )
+    parser.add_argument(
+        "--output-dir",
+        help="Batch mode: write <bench>_hot.asm here for every BINARY given",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Batch mode: binaries disassembled in parallel (0 = all cores)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=str(DEFAULT_CACHE_DIR),
+        help=f"Cache of extracted listings (default: {DEFAULT_CACHE_DIR})",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Always run objdump")
+    parser.add_argument(
+        "--mode",
+        choices=MODES,
+        default="symbols",
+        help="symbols: disassemble only matching symbols (default); "
+        "full: dump all of .text and filter",
+    )
     args = parser.parse_args()
 
-    binary_path = Path(args.binary)
-    if not binary_path.exists():
-        print(f"Error: binary not found: {binary_path}", file=sys.stderr)
-        sys.exit(1)
-
-    # Select patterns
-    bench_name = args.bench
-    if not bench_name:
-        bench_name = binary_path.stem.replace("poet_", "").replace("_native", "")
-    patterns = BENCH_PATTERNS.get(bench_name, [r".*"])
-
-    # Find and run objdump
-    objdump_bin = find_objdump(args.compiler)
-    disasm = run_objdump(objdump_bin, str(binary_path))
+    cache_dir = None if args.no_cache else Path(args.cache_dir)
 
-    if not disasm:
-        print(f"Warning: empty disassembly for {binary_path}", file=sys.stderr)
-        sys.exit(1)
+    if args.output_dir is None:
+        if len(args.paths) != 2:
+            parser.error("expected BINARY OUTPUT.asm (or use --output-dir)")
+        binaries = [Path(args.paths[0])]
+        outputs = [Path(args.paths[1])]
+    else:
+        if args.bench:
+            parser.error("--bench cannot be combined with --output-dir")
+        binaries = [Path(p) for p in args.paths]
+        outputs = [
+            Path(args.output_dir) / f"{bench_name_for(b)}_hot.asm" for b in binaries
+        ]
 
-    # Split and filter
-    functions = split_functions(disasm)
-    hot_functions = filter_functions(functions, patterns)
+    for binary_path in binaries:
+        if not binary_path.exists():
+            print(f"Error: binary not found: {binary_path}", file=sys.stderr)
+            sys.exit(1)
 
-    # Write output
-    output_path = Path(args.output)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    jobs = [
+        (binary_path, output_path, args.compiler, args.bench, cache_dir, args.mode)
+        for binary_path, output_path in zip(binaries, outputs)
+    ]
+    n_workers = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    if n_workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            results = list(pool.map(_extract_job, jobs))
+    else:
+        results = [_extract_job(job) for job in jobs]
 
-    with open(output_path, "w") as f:
-        f.write(f"; Hot-path assembly: {binary_path.name}\n")
-        f.write(f"; Compiler: {args.compiler}\n")
-        f.write(f"; Objdump: {objdump_bin}\n")
-        f.write(f"; Patterns: {patterns}\n")
-        f.write(f"; Functions matched: {len(hot_functions)} / {len(functions)}\n")
-        f.write(f"; {'=' * 72}\n\n")
+    failed = False
+    for (binary_path, output_path, *_), (matched, from_cache) in zip(jobs, results):
+        if matched < 0:
+            print(f"Warning: empty disassembly for {binary_path}", file=sys.stderr)
+            failed = True
+            continue
+        suffix = " (cached)" if from_cache else ""
+        print(f"Extracted {matched} functions -> {output_path}{suffix}")
 
-        for name, body in hot_functions:
-            f.write(f"; --- {name} ---\n")
-            f.write(body)
-            f.write("\n\n")
-
-    print(f"Extracted {len(hot_functions)} functions -> {output_path}")
+    if failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
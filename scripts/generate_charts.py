@@ -9,14 +9,12 @@ Reads results/<compiler>/default/<bench>.json (Google Benchmark JSON) and produc
     docs/benchmarks/static_for_speedup.svg
     docs/benchmarks/dispatch_optimization.svg
     docs/benchmarks/cross_compiler_overview.svg
+    docs/benchmarks/ipc.svg  (only when hardware counters were recorded)
 """
 
 import argparse
-import json
 import math
-import re
 import sys
-from collections import defaultdict
 from pathlib import Path
 
 import matplotlib
@@ -24,21 +22,11 @@ import matplotlib
 matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import matplotlib.ticker as ticker
+from poet_bench import add_load_arguments, compiler_sort_key, load_from_args
+from result_store import ResultStore, ipc_of
 
 # ── Styling ──────────────────────────────────────────────────────────────────
 
-COMPILER_ORDER = [
-    "gcc-12",
-    "gcc-13",
-    "gcc-14",
-    "gcc-15",
-    "clang-18",
-    "clang-19",
-    "clang-20",
-    "clang-21",
-    "clang-22",
-]
-
 COMPILER_COLORS = {
     "gcc": "#4C72B0",
     "clang": "#DD8452",
@@ -51,13 +39,6 @@ def compiler_color(name: str) -> str:
     return COMPILER_COLORS["clang"]
 
 
-def compiler_sort_key(name: str) -> int:
-    for i, c in enumerate(COMPILER_ORDER):
-        if c == name:
-            return i
-    return 100
-
-
 def style_chart(ax: plt.Axes, title: str):
     ax.set_title(title, fontsize=13, fontweight="bold", pad=12)
     ax.spines["top"].set_visible(False)
@@ -66,74 +47,46 @@ def style_chart(ax: plt.Axes, title: str):
     ax.yaxis.set_major_formatter(ticker.FormatStrFormatter("%.1f"))
 
 
-# ── Data loading ─────────────────────────────────────────────────────────────
-
-
-def load_results(results_root: Path) -> dict[str, dict[str, list[dict]]]:
-    """Load all Google Benchmark JSON results from results/<compiler>/default/<bench>.json.
-
-    Returns: {bench_name: {compiler: [benchmark_entries]}}
-    """
-    data: dict[str, dict[str, list[dict]]] = defaultdict(dict)
-
-    for json_file in sorted(results_root.rglob("*.json")):
-        parts = json_file.relative_to(results_root).parts
-        if len(parts) < 3:
-            continue
-        compiler = parts[0]
-        variant = parts[1]
-        if variant != "default":
-            continue
-        bench_name = json_file.stem
-
-        try:
-            parsed = json.loads(json_file.read_text())
-        except (json.JSONDecodeError, OSError) as e:
-            print(f"Warning: failed to load {json_file}: {e}", file=sys.stderr)
-            continue
-
-        benchmarks = parsed.get("benchmarks", [])
-        if benchmarks:
-            data[bench_name][compiler] = benchmarks
+# ── Data access ──────────────────────────────────────────────────────────────
 
-    return dict(data)
+# Charts compare compilers on the portable build only.
+CHART_VARIANT = "default"
 
 
-def clean_name(name: str) -> str:
-    """Strip Google Benchmark suffixes like '/min_time:0.100'."""
-    return re.sub(r"/min_time:[0-9.]+$", "", name)
+def bench_compilers(store: ResultStore, bench: str) -> list[str]:
+    """Compilers with results for bench, in chart order."""
+    compilers = store.values("compiler", bench=bench, variant=CHART_VARIANT)
+    return sorted(compilers, key=compiler_sort_key)
 
 
-def find_entry(entries: list[dict], pattern: str) -> dict | None:
-    """Find first benchmark entry whose name matches pattern."""
-    for entry in entries:
-        if re.search(pattern, clean_name(entry.get("name", ""))):
-            return entry
-    return None
+def find_nsop(
+    store: ResultStore, bench: str, compiler: str, pattern: str
+) -> float | None:
+    """Median cpu_time (ns) of the first bench/compiler run matching pattern."""
+    row = store.find(pattern, bench=bench, compiler=compiler, variant=CHART_VARIANT)
+    if row is None:
+        return None
+    return store.stats(row).median
 
 
-def entry_nsop(entry: dict | None) -> float | None:
-    """Extract cpu_time (ns) from a benchmark entry."""
-    if entry is None:
-        return None
-    cpu_time = entry.get("cpu_time")
-    if isinstance(cpu_time, (int, float)):
-        return float(cpu_time)
-    return None
+def find_counters(
+    store: ResultStore, bench: str, compiler: str, pattern: str
+) -> dict[str, float]:
+    """Median hardware counters of the first bench/compiler run matching pattern."""
+    row = store.find(pattern, bench=bench, compiler=compiler, variant=CHART_VARIANT)
+    if row is None:
+        return {}
+    return store.counter_medians(row)
 
 
 # ── Chart generators ─────────────────────────────────────────────────────────
 
 
-def generate_dynamic_for_chart(data: dict[str, dict], output: Path):
+def generate_dynamic_for_chart(store: ResultStore, output: Path):
     """dynamic_for speedup: grouped bars per compiler."""
-    bench_data = data.get("dynamic_for_bench")
-    if not bench_data:
-        print("Warning: no dynamic_for_bench data found", file=sys.stderr)
-        return
-
-    compilers = sorted(bench_data.keys(), key=compiler_sort_key)
+    compilers = bench_compilers(store, "dynamic_for_bench")
     if not compilers:
+        print("Warning: no dynamic_for_bench data found", file=sys.stderr)
         return
 
     method_patterns = [
@@ -155,9 +108,7 @@ def generate_dynamic_for_chart(data: dict[str, dict], output: Path):
     for mi, (label, pattern) in enumerate(method_patterns):
         values = []
         for compiler in compilers:
-            entries = bench_data[compiler]
-            entry = find_entry(entries, pattern)
-            nsop = entry_nsop(entry)
+            nsop = find_nsop(store, "dynamic_for_bench", compiler, pattern)
             values.append(nsop if nsop is not None else 0)
 
         if mi == 0:
@@ -197,15 +148,11 @@ def generate_dynamic_for_chart(data: dict[str, dict], output: Path):
     print(f"  Wrote {output}")
 
 
-def generate_static_for_chart(data: dict[str, dict], output: Path):
+def generate_static_for_chart(store: ResultStore, output: Path):
     """static_for speedup: two subplots (Map + Multi-acc)."""
-    bench_data = data.get("static_for_bench")
-    if not bench_data:
-        print("Warning: no static_for_bench data found", file=sys.stderr)
-        return
-
-    compilers = sorted(bench_data.keys(), key=compiler_sort_key)
+    compilers = bench_compilers(store, "static_for_bench")
     if not compilers:
+        print("Warning: no static_for_bench data found", file=sys.stderr)
         return
 
     sections = [
@@ -241,9 +188,7 @@ def generate_static_for_chart(data: dict[str, dict], output: Path):
         for mi, (label, pattern) in enumerate(methods):
             values = []
             for compiler in compilers:
-                entries = bench_data[compiler]
-                entry = find_entry(entries, pattern)
-                nsop = entry_nsop(entry)
+                nsop = find_nsop(store, "static_for_bench", compiler, pattern)
                 values.append(nsop if nsop is not None else 0)
 
             if mi == 0:
@@ -285,15 +230,12 @@ def generate_static_for_chart(data: dict[str, dict], output: Path):
     print(f"  Wrote {output}")
 
 
-def generate_dispatch_optimization_chart(data: dict[str, dict], output: Path):
+def generate_dispatch_optimization_chart(store: ResultStore, output: Path):
     """Dispatch optimization: runtime vs dispatched for each N, per compiler."""
-    bench_data = data.get("dispatch_optimization_bench")
-    if not bench_data:
-        print("Warning: no dispatch_optimization_bench data found", file=sys.stderr)
-        return
-
-    compilers = sorted(bench_data.keys(), key=compiler_sort_key)
+    bench = "dispatch_optimization_bench"
+    compilers = bench_compilers(store, bench)
     if not compilers:
+        print("Warning: no dispatch_optimization_bench data found", file=sys.stderr)
         return
 
     n_values = [4, 8, 16, 32]
@@ -314,12 +256,11 @@ def generate_dispatch_optimization_chart(data: dict[str, dict], output: Path):
     dispatched_vals = []
 
     for compiler in compilers:
-        entries = bench_data[compiler]
         for n in n_values:
-            rt = find_entry(entries, rf"Horner/N={n}_runtime")
-            disp = find_entry(entries, rf"Horner/N={n}_dispatched")
-            runtime_vals.append(entry_nsop(rt) or 0)
-            dispatched_vals.append(entry_nsop(disp) or 0)
+            rt = find_nsop(store, bench, compiler, rf"Horner/N={n}_runtime")
+            disp = find_nsop(store, bench, compiler, rf"Horner/N={n}_dispatched")
+            runtime_vals.append(rt or 0)
+            dispatched_vals.append(disp or 0)
 
     speedups = []
     for rt, disp in zip(runtime_vals, dispatched_vals):
@@ -354,7 +295,7 @@ def generate_dispatch_optimization_chart(data: dict[str, dict], output: Path):
     print(f"  Wrote {output}")
 
 
-def generate_cross_compiler_chart(data: dict[str, dict], output: Path):
+def generate_cross_compiler_chart(store: ResultStore, output: Path):
     """Cross-compiler overview: speedup of POET vs baseline across all benches."""
     bench_configs = {
         "dynamic_for_bench": {
@@ -376,8 +317,7 @@ def generate_cross_compiler_chart(data: dict[str, dict], output: Path):
 
     all_compilers: set[str] = set()
     for bench_name in bench_configs:
-        if bench_name in data:
-            all_compilers.update(data[bench_name].keys())
+        all_compilers.update(bench_compilers(store, bench_name))
 
     compilers = sorted(all_compilers, key=compiler_sort_key)
     if not compilers:
@@ -390,20 +330,17 @@ def generate_cross_compiler_chart(data: dict[str, dict], output: Path):
     speedup_matrix = []
 
     for bench_name, cfg in bench_configs.items():
-        if bench_name not in data:
+        bench_compilers_found = set(bench_compilers(store, bench_name))
+        if not bench_compilers_found:
             continue
-        bench_data = data[bench_name]
         bench_labels.append(cfg["label"])
         row_speedups = []
         for compiler in compilers:
-            if compiler not in bench_data:
+            if compiler not in bench_compilers_found:
                 row_speedups.append(0)
                 continue
-            entries = bench_data[compiler]
-            baseline = find_entry(entries, cfg["baseline_pattern"])
-            poet = find_entry(entries, cfg["poet_pattern"])
-            b_nsop = entry_nsop(baseline)
-            p_nsop = entry_nsop(poet)
+            b_nsop = find_nsop(store, bench_name, compiler, cfg["baseline_pattern"])
+            p_nsop = find_nsop(store, bench_name, compiler, cfg["poet_pattern"])
             if b_nsop and p_nsop and p_nsop > 0:
                 row_speedups.append(b_nsop / p_nsop)
             else:
@@ -455,7 +392,7 @@ def generate_cross_compiler_chart(data: dict[str, dict], output: Path):
     print(f"  Wrote {output}")
 
 
-def generate_average_improvement_chart(data: dict[str, dict], output: Path):
+def generate_average_improvement_chart(store: ResultStore, output: Path):
     """Average improvement: geometric mean speedup per compiler across all benchmarks."""
     bench_configs = {
         "dynamic_for_bench": {
@@ -474,8 +411,7 @@ def generate_average_improvement_chart(data: dict[str, dict], output: Path):
 
     all_compilers: set[str] = set()
     for bench_name in bench_configs:
-        if bench_name in data:
-            all_compilers.update(data[bench_name].keys())
+        all_compilers.update(bench_compilers(store, bench_name))
 
     compilers = sorted(all_compilers, key=compiler_sort_key)
     if not compilers:
@@ -488,13 +424,8 @@ def generate_average_improvement_chart(data: dict[str, dict], output: Path):
     for compiler in compilers:
         speedups = []
         for bench_name, cfg in bench_configs.items():
-            if bench_name not in data or compiler not in data[bench_name]:
-                continue
-            entries = data[bench_name][compiler]
-            baseline = find_entry(entries, cfg["baseline_pattern"])
-            poet = find_entry(entries, cfg["poet_pattern"])
-            b_nsop = entry_nsop(baseline)
-            p_nsop = entry_nsop(poet)
+            b_nsop = find_nsop(store, bench_name, compiler, cfg["baseline_pattern"])
+            p_nsop = find_nsop(store, bench_name, compiler, cfg["poet_pattern"])
             if b_nsop and p_nsop and p_nsop > 0:
                 speedups.append(b_nsop / p_nsop)
 
@@ -558,16 +489,107 @@ def generate_average_improvement_chart(data: dict[str, dict], output: Path):
     print(f"  Wrote {output}")
 
 
+def generate_ipc_chart(store: ResultStore, output: Path):
+    """IPC of baseline vs POET per compiler, with the instruction-count ratio."""
+    if not store.has_counters:
+        print(
+            "Warning: no hardware counters recorded, skipping IPC chart",
+            file=sys.stderr,
+        )
+        return
+
+    bench_configs = {
+        "dynamic_for_bench": {
+            "baseline_pattern": r"Multi-acc/for_loop_1_acc",
+            "poet_pattern": r"Multi-acc/dynamic_for_optimal_accs",
+            "label": "dynamic_for",
+        },
+        "static_for_bench": {
+            "baseline_pattern": r"MultiAcc/for_loop",
+            "poet_pattern": r"MultiAcc/static_for_tuned_BS",
+            "label": "static_for",
+        },
+        "dispatch_optimization_bench": {
+            "baseline_pattern": r"Horner/N=16_runtime",
+            "poet_pattern": r"Horner/N=16_dispatched",
+            "label": "dispatch (N=16)",
+        },
+    }
+
+    panels = []
+    for bench_name, cfg in bench_configs.items():
+        compilers = bench_compilers(store, bench_name)
+        rows = []
+        for compiler in compilers:
+            base = find_counters(store, bench_name, compiler, cfg["baseline_pattern"])
+            poet = find_counters(store, bench_name, compiler, cfg["poet_pattern"])
+            if ipc_of(base) and ipc_of(poet):
+                rows.append((compiler, base, poet))
+        if rows:
+            panels.append((cfg["label"], rows))
+
+    if not panels:
+        print("Warning: no IPC data for the chart", file=sys.stderr)
+        return
+
+    import numpy as np
+
+    fig, axes = plt.subplots(
+        1, len(panels), figsize=(5 * len(panels), 5), squeeze=False
+    )
+    width = 0.38
+    for ax, (label, rows) in zip(axes[0], panels):
+        x = np.arange(len(rows))
+        base_ipc = [ipc_of(base) for _, base, _ in rows]
+        poet_ipc = [ipc_of(poet) for _, _, poet in rows]
+        ax.bar(x, base_ipc, width, label="baseline", color="#AAAAAA")
+        bars = ax.bar(x + width, poet_ipc, width, label="POET", color="#4C72B0")
+        for bar, (_, base, poet) in zip(bars, rows):
+            ratio = poet["instructions"] / base["instructions"]
+            ax.text(
+                bar.get_x() + bar.get_width() / 2,
+                bar.get_height() + 0.02,
+                f"{ratio:.2f}x insns",
+                ha="center",
+                va="bottom",
+                fontsize=7,
+            )
+        ax.set_xticks(x + width / 2)
+        ax.set_xticklabels([c for c, _, _ in rows], rotation=30, ha="right")
+        ax.set_ylabel("Instructions per cycle")
+        style_chart(ax, f"{label}: IPC")
+
+    axes[0][0].legend(loc="upper left", framealpha=0.9, fontsize=9)
+
+    fig.tight_layout()
+    fig.savefig(str(output), format="svg", bbox_inches="tight")
+    plt.close(fig)
+    print(f"  Wrote {output}")
+
+
 # ── Main ─────────────────────────────────────────────────────────────────────
 
 
+CHARTS = [
+    ("dynamic_for_speedup.svg", generate_dynamic_for_chart),
+    ("static_for_speedup.svg", generate_static_for_chart),
+    ("dispatch_optimization.svg", generate_dispatch_optimization_chart),
+    ("cross_compiler_overview.svg", generate_cross_compiler_chart),
+    ("average_improvement.svg", generate_average_improvement_chart),
+    ("ipc.svg", generate_ipc_chart),
+]
+
+
+def generate_all_charts(store: ResultStore, output_dir: Path):
+    """Render every chart in CHARTS into output_dir."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for filename, generate in CHARTS:
+        generate(store, output_dir / filename)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Generate SVG benchmark charts")
-    parser.add_argument(
-        "--results-root",
-        default="results",
-        help="Root directory of results (default: results)",
-    )
+    add_load_arguments(parser)
     parser.add_argument(
         "--output-dir",
         default="docs/benchmarks",
@@ -575,35 +597,20 @@ def main():
     )
     args = parser.parse_args()
 
-    results_root = Path(args.results_root)
-    output_dir = Path(args.output_dir)
-
-    if not results_root.exists():
-        print(f"Error: results root not found: {results_root}", file=sys.stderr)
-        sys.exit(1)
-
-    output_dir.mkdir(parents=True, exist_ok=True)
-
     print("Loading benchmark results...")
-    data = load_results(results_root)
-    if not data:
+    store = load_from_args(args, variants=(CHART_VARIANT,))
+    if not len(store):
         print("Error: no benchmark JSON data found", file=sys.stderr)
         sys.exit(1)
 
-    print(f"Found benchmarks: {', '.join(sorted(data.keys()))}")
-    compilers_found: set[str] = set()
-    for bench_data in data.values():
-        compilers_found.update(bench_data.keys())
+    print(f"Found benchmarks: {', '.join(sorted(store.labels('bench')))}")
+    compilers_found = store.labels("compiler")
     print(
         f"Found compilers: {', '.join(sorted(compilers_found, key=compiler_sort_key))}"
     )
 
     print("\nGenerating charts...")
-    generate_dynamic_for_chart(data, output_dir / "dynamic_for_speedup.svg")
-    generate_static_for_chart(data, output_dir / "static_for_speedup.svg")
-    generate_dispatch_optimization_chart(data, output_dir / "dispatch_optimization.svg")
-    generate_cross_compiler_chart(data, output_dir / "cross_compiler_overview.svg")
-    generate_average_improvement_chart(data, output_dir / "average_improvement.svg")
+    generate_all_charts(store, Path(args.output_dir))
     print("\nDone.")
 
 
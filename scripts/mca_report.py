@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""Predict hot-loop throughput with llvm-mca for several target CPUs.
+
+Usage:
+    python3 scripts/mca_report.py [--results-root results]
+                                  [--output results/summary/mca_report.md]
+                                  [--cpus skylake znver4 neoverse-v2]
+                                  [--llvm-mca llvm-mca-19] [--iterations 100]
+
+Reads every results/<compiler>/<variant>/asm/<bench>_hot.asm written by
+extract_asm.py, finds the innermost loops of each hot function and runs
+llvm-mca on each loop body for every --cpus target. The report lists
+predicted cycles per iteration, the most loaded execution resource, the
+peak physical-register usage of each register file the CPU model defines
+(-register-file-stats) and the architectural registers the loop names.
+Next to them is the measured median ns/op of the benchmarks named after
+the function.
+
+A CPU is only simulated for listings of its own architecture (x86-64 or
+AArch64), and CPUs unknown to the installed llvm-mca are reported as n/a.
+"""
+
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+from asm_loops import (
+    TARGET_RE,
+    Instruction,
+    innermost_loops,
+    parse_instructions,
+    registers_used,
+)
+from extract_asm import iter_functions
+from poet_bench import add_load_arguments, column_sort_key, load_from_args
+from result_store import ResultStore
+
+DEFAULT_CPUS = ["skylake", "znver4", "neoverse-v2"]
+
+# Target triple per -mcpu; unlisted CPUs are assumed to match the listing.
+CPU_ARCH = {
+    "skylake": "x86_64",
+    "skylake-avx512": "x86_64",
+    "icelake-server": "x86_64",
+    "sapphirerapids": "x86_64",
+    "znver3": "x86_64",
+    "znver4": "x86_64",
+    "neoverse-n1": "aarch64",
+    "neoverse-n2": "aarch64",
+    "neoverse-v1": "aarch64",
+    "neoverse-v2": "aarch64",
+    "apple-m1": "aarch64",
+}
+
+# Benchmarks that time each hot function: (function regex, benchmark regex).
+# Functions not listed are matched to benchmarks containing their name.
+FUNCTION_BENCHMARKS = [
+    (r"hand_unrolled_multi_acc", r"for_loop_optimal_accs|tuned-acc"),
+    (r"dynamic_for_multi_acc", r"Multi-acc/dynamic_for|Unroll/dynamic_for"),
+    (r"execute_block|dispatch_tail", r"dynamic_for"),
+    (r"dispatch_if_else", r"DispatchBaselines/if_else"),
+    (r"dispatch_switch", r"DispatchBaselines/switch"),
+    (r"dispatch_fnptr", r"DispatchBaselines/fn_ptr"),
+    (r"MultiAccFunctor", r"MultiAcc/static_for"),
+    (r"MapFunctor", r"Map/static_for"),
+]
+
+LLVM_VERSIONS = range(22, 13, -1)
+
+SUMMARY_RE = re.compile(r"^(Iterations|Total Cycles):\s+(\d+)", re.MULTILINE)
+RESOURCE_RE = re.compile(r"^\[([\d.]+)\]\s+- (\S+)", re.MULTILINE)
+PRESSURE_HEADER = "Resource pressure per iteration:"
+# -register-file-stats: the total over all files, then one block per file
+# the CPU model defines (models without register files print the total only).
+REGISTER_TOTAL_RE = re.compile(r"^Max number of mappings used:\s+(\d+)", re.MULTILINE)
+REGISTER_FILE_RE = re.compile(
+    r"^\*\s+Register File #\d+ -- (\S+):\n"
+    r"\s+Number of physical registers:\s+(\d+|unbounded)\n"
+    r"(?:.*\n)*?\s+Max number of mappings used:\s+(\d+)",
+    re.MULTILINE,
+)
+
+
+class Prediction(NamedTuple):
+    cycles: float | None
+    bottleneck: str
+    # Set when llvm-mca could not simulate the loop for this CPU.
+    error: str = ""
+    # (register file, most physical registers in use, file size); a single
+    # ("PRF", total, None) when the CPU model defines no register files.
+    registers: tuple[tuple[str, int, int | None], ...] = ()
+
+    def cell(self) -> str:
+        if self.error:
+            return self.error
+        cell = f"{self.cycles:.2f} ({self.bottleneck})"
+        files = [
+            f"{name} {used}" if size is None else f"{name} {used}/{size}"
+            for name, used, size in self.registers
+        ]
+        return "<br>".join([cell] + files)
+
+
+class Loop(NamedTuple):
+    function: str
+    body: list[Instruction]
+
+    @property
+    def arch(self) -> str:
+        return "aarch64" if self.body[0].aarch64 else "x86_64"
+
+    @property
+    def has_call(self) -> bool:
+        return any(i.mnemonic.startswith(("call", "bl")) for i in self.body)
+
+
+def find_llvm_mca() -> str | None:
+    """Newest llvm-mca on PATH: newer releases model more CPUs."""
+    for version in LLVM_VERSIONS:
+        if shutil.which(f"llvm-mca-{version}"):
+            return f"llvm-mca-{version}"
+    return "llvm-mca" if shutil.which("llvm-mca") else None
+
+
+def benchmark_pattern(function: str) -> re.Pattern:
+    """Regex on benchmark names that time a demangled hot function."""
+    for function_re, bench_re in FUNCTION_BENCHMARKS:
+        if re.search(function_re, function):
+            return re.compile(bench_re)
+    # Unqualified name without template arguments.
+    m = re.search(r"([A-Za-z_]\w*)(?:<[^()]*>)?\(", function)
+    return re.compile(re.escape(m.group(1) if m else function), re.IGNORECASE)
+
+
+def mca_source(loop: Loop) -> str:
+    """Loop body as assembler input, with branch and call targets as labels."""
+    head = loop.body[0].address
+    lines = [".Lhead:"]
+    for insn in loop.body:
+        operands = insn.code
+        if insn.target is not None:
+            label = ".Lhead" if insn.target == head else ".Lexit"
+            prefix, comma, _ = operands.rpartition(",")
+            operands = f"{prefix}, {label}" if comma else label
+        elif insn.mnemonic.startswith(("call", "bl")) and TARGET_RE.search(operands):
+            operands = ".Lexit"
+        lines.append(f"\t{insn.mnemonic}\t{operands}")
+    lines.append(".Lexit:")
+    return "\n".join(lines) + "\n"
+
+
+def parse_mca(output: str) -> Prediction:
+    """Cycles per iteration and the most loaded resource from llvm-mca's views."""
+    summary = dict(SUMMARY_RE.findall(output))
+    if "Iterations" not in summary or "Total Cycles" not in summary:
+        return Prediction(None, "", "no output")
+    cycles = int(summary["Total Cycles"]) / max(1, int(summary["Iterations"]))
+
+    bottleneck = ""
+    resources = [name for _, name in RESOURCE_RE.findall(output)]
+    _, found, rest = output.partition(PRESSURE_HEADER)
+    if found and resources:
+        row = rest.strip().splitlines()[1].split()
+        pressure = [0.0 if v == "-" else float(v) for v in row]
+        load, name = max(zip(pressure, resources))
+        bottleneck = f"{name} {load:.2f}"
+
+    registers = tuple(
+        (name, int(used), None if size == "unbounded" else int(size))
+        for name, size, used in REGISTER_FILE_RE.findall(output)
+    )
+    if not registers and (m := REGISTER_TOTAL_RE.search(output)):
+        registers = (("PRF", int(m.group(1)), None),)
+    return Prediction(cycles, bottleneck, registers=registers)
+
+
+def run_mca(llvm_mca: str, cpu: str, loop: Loop, iterations: int) -> Prediction:
+    arch = CPU_ARCH.get(cpu, loop.arch)
+    if arch != loop.arch:
+        return Prediction(None, "", "—")
+    cmd = [
+        llvm_mca,
+        f"-mtriple={arch}",
+        f"-mcpu={cpu}",
+        f"-iterations={iterations}",
+        "-summary-view",
+        "-resource-pressure",
+        "-register-file-stats",
+        "-instruction-info=false",
+        "-timeline=false",
+    ]
+    proc = subprocess.run(
+        cmd, input=mca_source(loop), check=False, capture_output=True, text=True
+    )
+    if "not a recognized processor" in proc.stderr:
+        return Prediction(None, "", "n/a")
+    if proc.returncode != 0:
+        return Prediction(None, "", "unsupported")
+    return parse_mca(proc.stdout)
+
+
+def hot_loops(asm_file: Path) -> list[Loop]:
+    """Innermost loops of every function in an extracted listing."""
+    with open(asm_file) as f:
+        functions = list(iter_functions(line.rstrip("\n") for line in f))
+    return [
+        Loop(name, body)
+        for name, text in functions
+        for body in innermost_loops(parse_instructions(text.splitlines()))
+    ]
+
+
+def measured(store: ResultStore, bench: str, compiler: str, variant: str, name: str):
+    """'name: ns/op' of every benchmark timing the function."""
+    pattern = benchmark_pattern(name)
+    cells = []
+    for row in store.select(bench=bench, compiler=compiler, variant=variant):
+        full = store.full_name(row)
+        if pattern.search(full):
+            cells.append(f"{full}: {store.stats(row).median:.2f}")
+    return "<br>".join(dict.fromkeys(cells)) or "—"
+
+
+def write_report(
+    store: ResultStore,
+    results_root: Path,
+    output: Path,
+    llvm_mca: str,
+    cpus: list[str],
+    iterations: int,
+    jobs: int,
+):
+    listings = []
+    for asm_file in sorted(results_root.rglob("asm/*_hot.asm")):
+        parts = asm_file.relative_to(results_root).parts
+        if len(parts) != 4:
+            continue
+        bench = asm_file.stem.removesuffix("_hot")
+        listings.append((parts[0], parts[1], bench, hot_loops(asm_file)))
+    listings.sort(key=lambda item: (column_sort_key(item[0], item[1]), item[2]))
+
+    # One llvm-mca run per (loop, CPU), in listing order.
+    runs = [(loop, cpu) for *_, loops in listings for loop in loops for cpu in cpus]
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        results = iter(
+            pool.map(lambda run: run_mca(llvm_mca, run[1], run[0], iterations), runs)
+        )
+        predictions = [
+            [[next(results) for _ in cpus] for _ in loops] for *_, loops in listings
+        ]
+    for i, cpu in enumerate(cpus):
+        if any(row[i].error == "n/a" for rows in predictions for row in rows):
+            print(f"Warning: {llvm_mca} does not know -mcpu={cpu}", file=sys.stderr)
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        f.write("# llvm-mca Throughput Prediction\n\n")
+        f.write(
+            f"Predicted cycles per loop iteration and the most loaded resource "
+            f"(pressure per iteration), from {llvm_mca} over {iterations} "
+            "iterations of each innermost loop, with the most physical registers "
+            "in use at once per register file of the CPU model (used/size; PRF "
+            "is the total when the model has no register files). Named regs "
+            "counts the general-purpose / vector registers the loop's "
+            "instructions name. Measured is the median ns/op "
+            "of benchmarks named after the function. — marks a CPU of another "
+            "architecture, n/a a CPU this llvm-mca does not model.\n\n"
+        )
+        if not any(loops for *_, loops in listings):
+            f.write("No loops found in the extracted assembly.\n")
+        header = "| Function | Loop | Insns | Named regs | " + " | ".join(cpus)
+        rule = "|:---------|:-----|------:|-----------:|" + "|".join(
+            "---:" for _ in cpus
+        )
+        for (compiler, variant, bench, loops), rows in zip(listings, predictions):
+            if not loops:
+                continue
+            f.write(f"## {compiler} {variant} / {bench}\n\n")
+            f.write(f"{header} | Measured |\n{rule}|:---------|\n")
+            for loop, row in zip(loops, rows):
+                gprs, vecs = registers_used(loop.body)
+                cells = [p.cell() for p in row]
+                name = loop.function.replace("|", "\\|")
+                note = " (call)" if loop.has_call else ""
+                f.write(
+                    f"| `{name}` | {loop.body[0].address:#x}{note} "
+                    f"| {len(loop.body)} | {len(gprs)}/{len(vecs)} "
+                    f"| {' | '.join(cells)} "
+                    f"| {measured(store, bench, compiler, variant, loop.function)} |\n"
+                )
+            f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Predict hot-loop throughput with llvm-mca"
+    )
+    add_load_arguments(parser)
+    parser.add_argument("--output", default="results/summary/mca_report.md")
+    parser.add_argument("--cpus", nargs="+", default=DEFAULT_CPUS)
+    parser.add_argument("--llvm-mca", help="llvm-mca binary (default: newest found)")
+    parser.add_argument("--iterations", type=int, default=100)
+    args = parser.parse_args()
+
+    llvm_mca = args.llvm_mca or find_llvm_mca()
+    if llvm_mca is None or shutil.which(llvm_mca) is None:
+        print("Error: llvm-mca not found (install llvm)", file=sys.stderr)
+        sys.exit(1)
+
+    store = load_from_args(args)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    write_report(
+        store,
+        Path(args.results_root),
+        Path(args.output),
+        llvm_mca,
+        args.cpus,
+        args.iterations,
+        jobs,
+    )
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
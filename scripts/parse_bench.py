@@ -10,161 +10,232 @@ Handles:
 - relative(true) tables (extra relative_pct column)
 - Register-info preamble (=== ... === blocks) as metadata
 - Stability warnings from nanobench
+
+The input is read line by line: ``iter_tables(stream)`` yields each table as
+soon as it is complete, and the CLI streams tables straight to the output.
 """
 
+import io
+import itertools
 import json
 import re
 import sys
+from collections.abc import Iterable, Iterator
 from pathlib import Path
+from typing import TextIO
 
+# Metadata section header: === Some Title ===
+SECTION_RE = re.compile(r"^===\s*(.+?)\s*===$")
+# Key: value metadata (allow parens/hyphens in key names)
+METADATA_RE = re.compile(r"^([\w][\w\s()\-]*?):\s+(.+)$")
+# Table separator (all dashes/pipes/colons)
+SEPARATOR_RE = re.compile(r"^[\s|:\-+]+$")
+
+HEADER_KEYWORDS = ("ns/op", "op/s", "err%", "cyc/op")
+
+
+def _iter_lines(stream: Iterable[str]) -> Iterator[str]:
+    """Yield logical lines from a text stream, matching str.splitlines()."""
+    for raw in stream:
+        yield from raw.splitlines()
+
+
+def _is_warning(stripped: str) -> bool:
+    """Nanobench warning/recommendation lines."""
+    return (
+        stripped.startswith("Warning")
+        or "stability" in stripped.lower()
+        or stripped.startswith("Recommendations")
+        or stripped.startswith("* ")
+        or stripped.startswith("See ")
+    )
 
-def parse_bench_file(text: str) -> dict:
-    """Parse a nanobench text output into structured data."""
-    result = {
-        "metadata": {},
-        "tables": [],
-        "warnings": [],
-    }
 
-    lines = text.splitlines()
-    i = 0
+def _split_cells(stripped: str) -> list[str]:
+    """Split a table line on '|', dropping empties from leading/trailing '|'."""
+    parts = [p.strip() for p in stripped.split("|")]
+    return [p for p in parts if p]
+
+
+def _parse_row(header_cols: list[str], parts: list[str]) -> dict:
+    """Map data cells onto header columns, parsing numeric values."""
+    row = {}
+    for ci, col in enumerate(header_cols):
+        if ci < len(parts):
+            val = parts[ci].strip()
+            # Try to parse numeric values
+            cleaned = val.replace(",", "").replace("%", "").strip()
+            try:
+                if "." in cleaned:
+                    row[col] = float(cleaned)
+                else:
+                    row[col] = int(cleaned)
+            except ValueError:
+                row[col] = val
+        else:
+            row[col] = None
+    return row
+
+
+def iter_tables(
+    stream: Iterable[str],
+    metadata: dict | None = None,
+    warnings: list[str] | None = None,
+) -> Iterator[dict]:
+    """Incrementally parse nanobench output, yielding one table at a time.
+
+    Lines are consumed lazily from ``stream`` and each table is yielded as
+    soon as the blank line (or next title) closing it is read, so memory is
+    bounded by the largest table rather than the whole log. The preamble
+    metadata and any nanobench warnings are collected into ``metadata`` and
+    ``warnings`` when given; ``metadata`` is complete once the first table
+    has been yielded.
+    """
+    if metadata is None:
+        metadata = {}
+    if warnings is None:
+        warnings = []
+
+    lines = _iter_lines(stream)
 
     # Parse metadata preamble (=== Title === blocks and key: value lines)
-    while i < len(lines):
-        line = lines[i].strip()
-        if not line:
-            i += 1
+    first = None
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
             continue
-        # Metadata section header: === Some Title ===
-        m = re.match(r"^===\s*(.+?)\s*===$", line)
+        m = SECTION_RE.match(stripped)
         if m:
-            section = m.group(1)
-            result["metadata"]["_section"] = section
-            i += 1
+            metadata["_section"] = m.group(1)
             continue
-        # Key: value metadata (allow parens/hyphens in key names)
-        m = re.match(r"^([\w][\w\s()\-]*?):\s+(.+)$", line)
-        if m and not line.startswith("|") and "ns/op" not in line:
-            result["metadata"][m.group(1).strip()] = m.group(2).strip()
-            i += 1
+        m = METADATA_RE.match(stripped)
+        if m and not stripped.startswith("|") and "ns/op" not in stripped:
+            metadata[m.group(1).strip()] = m.group(2).strip()
             continue
         # Once we hit a table header or separator, stop metadata parsing
+        first = line
         break
 
+    if first is None:
+        return
+
     # Parse tables
     current_title = None
     header_cols = None
     rows = []
 
-    while i < len(lines):
-        line = lines[i]
+    for line in itertools.chain((first,), lines):
         stripped = line.strip()
 
-        # Nanobench warning/recommendation lines
-        if (
-            stripped.startswith("Warning")
-            or "stability" in stripped.lower()
-            or stripped.startswith("Recommendations")
-            or stripped.startswith("* ")
-            or stripped.startswith("See ")
-        ):
-            result["warnings"].append(stripped)
-            i += 1
+        if _is_warning(stripped):
+            warnings.append(stripped)
             continue
 
         # Empty line: flush current table
         if not stripped:
             if header_cols and rows:
-                result["tables"].append(
-                    {
-                        "title": current_title or "",
-                        "columns": header_cols,
-                        "rows": rows,
-                    }
-                )
+                yield {
+                    "title": current_title or "",
+                    "columns": header_cols,
+                    "rows": rows,
+                }
                 header_cols = None
                 rows = []
-            i += 1
             continue
 
-        # Table separator (all dashes/pipes/colons)
-        if re.match(r"^[\s|:\-+]+$", stripped) and len(stripped) > 3:
-            i += 1
+        if len(stripped) > 3 and SEPARATOR_RE.match(stripped):
             continue
 
         # Table header line containing ns/op
         if "ns/op" in stripped and "|" in stripped:
-            # Parse column headers
-            parts = [p.strip() for p in stripped.split("|")]
-            parts = [p for p in parts if p]  # remove empty from leading/trailing |
+            parts = _split_cells(stripped)
             # nanobench embeds the table title as the last column header
             # (the benchmark name column). Extract it as the title.
-            if parts and not any(
-                kw in parts[-1].lower() for kw in ["ns/op", "op/s", "err%", "cyc/op"]
-            ):
+            if parts and not any(kw in parts[-1].lower() for kw in HEADER_KEYWORDS):
                 current_title = parts[-1]
             header_cols = parts
             rows = []
-            i += 1
             continue
 
         # Table title line (no | separator, not metadata)
-        if "|" not in stripped and not stripped.startswith("Warning"):
-            # Could be a table title
+        if "|" not in stripped:
             if header_cols and rows:
                 # Flush previous table
-                result["tables"].append(
-                    {
-                        "title": current_title or "",
-                        "columns": header_cols,
-                        "rows": rows,
-                    }
-                )
+                yield {
+                    "title": current_title or "",
+                    "columns": header_cols,
+                    "rows": rows,
+                }
                 header_cols = None
                 rows = []
             current_title = stripped
-            i += 1
             continue
 
         # Data row
-        if "|" in stripped and header_cols:
-            parts = [p.strip() for p in stripped.split("|")]
-            parts = [p for p in parts if p]
-
+        if header_cols:
+            parts = _split_cells(stripped)
             if len(parts) >= 2:
-                row = {}
-                for ci, col in enumerate(header_cols):
-                    if ci < len(parts):
-                        val = parts[ci].strip()
-                        # Try to parse numeric values
-                        cleaned = val.replace(",", "").replace("%", "").strip()
-                        try:
-                            if "." in cleaned:
-                                row[col] = float(cleaned)
-                            else:
-                                row[col] = int(cleaned)
-                        except ValueError:
-                            row[col] = val
-                    else:
-                        row[col] = None
-                rows.append(row)
-
-            i += 1
-            continue
-
-        i += 1
+                rows.append(_parse_row(header_cols, parts))
 
     # Flush final table
     if header_cols and rows:
-        result["tables"].append(
-            {
-                "title": current_title or "",
-                "columns": header_cols,
-                "rows": rows,
-            }
-        )
+        yield {
+            "title": current_title or "",
+            "columns": header_cols,
+            "rows": rows,
+        }
+
+
+def parse_bench_stream(stream: Iterable[str]) -> dict:
+    """Parse a nanobench text stream into structured data."""
+    metadata: dict = {}
+    warnings: list[str] = []
+    tables = list(iter_tables(stream, metadata, warnings))
+    return {
+        "metadata": metadata,
+        "tables": tables,
+        "warnings": warnings,
+    }
+
+
+def parse_bench_file(text: str) -> dict:
+    """Parse a nanobench text output into structured data."""
+    return parse_bench_stream(io.StringIO(text))
+
+
+def _dumps_nested(obj, level: int) -> str:
+    """json.dumps(indent=2) for a value nested ``level`` objects deep."""
+    return json.dumps(obj, indent=2).replace("\n", "\n" + "  " * level)
 
-    return result
+
+def write_json(stream: Iterable[str], out: TextIO):
+    """Stream parsed tables to ``out`` as JSON.
+
+    The output is byte-identical to ``json.dumps(parse_bench_stream(stream),
+    indent=2)``, but tables are written as they are parsed instead of being
+    accumulated first.
+    """
+    metadata: dict = {}
+    warnings: list[str] = []
+    tables = iter_tables(stream, metadata, warnings)
+    # Advancing to the first table completes the metadata preamble.
+    table = next(tables, None)
+
+    out.write('{\n  "metadata": ')
+    out.write(_dumps_nested(metadata, 1))
+    out.write(',\n  "tables": ')
+    if table is None:
+        out.write("[]")
+    else:
+        out.write("[\n    ")
+        out.write(_dumps_nested(table, 2))
+        for table in tables:
+            out.write(",\n    ")
+            out.write(_dumps_nested(table, 2))
+        out.write("\n  ]")
+    out.write(',\n  "warnings": ')
+    out.write(_dumps_nested(warnings, 1))
+    out.write("\n}")
 
 
 def main():
@@ -173,15 +244,15 @@ def main():
         sys.exit(1)
 
     input_path = Path(sys.argv[1])
-    text = input_path.read_text()
-    parsed = parse_bench_file(text)
-
-    if len(sys.argv) >= 3:
-        output_path = Path(sys.argv[2])
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        output_path.write_text(json.dumps(parsed, indent=2))
-    else:
-        print(json.dumps(parsed, indent=2))
+    with open(input_path) as stream:
+        if len(sys.argv) >= 3:
+            output_path = Path(sys.argv[2])
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(output_path, "w") as out:
+                write_json(stream, out)
+        else:
+            write_json(stream, sys.stdout)
+            sys.stdout.write("\n")
 
 
 if __name__ == "__main__":
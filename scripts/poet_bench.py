@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""Single-load benchmark reporting pipeline.
+
+Loads every Google Benchmark JSON file under the results root once and
+produces the Markdown/CSV comparison tables, the ASM analysis and all SVG
+charts from that one load. Also holds the compiler ordering and result
+loader shared by analyze_bench.py and generate_charts.py.
+
+Usage:
+    python3 scripts/poet_bench.py [--results-root results]
+                                  [--output-dir benchmark-results]
+                                  [--jobs N] [--no-cache] [--no-charts]
+    python3 scripts/poet_bench.py compare BASELINE CANDIDATE [...]
+
+Writes into --output-dir:
+    bench_comparison.md, bench_comparison.csv, asm_analysis.md, *.svg,
+    code_size.csv/code_size.md when the tree has size/ files, and
+    compile_cost.svg when it has compile_bench.py results
+
+The compare subcommand is the regression gate in compare_bench.py.
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+from result_cache import ResultCache, load_benchmark_files
+from result_store import ResultStore
+
+# Compiler sort order: GCC (12→15) then Clang (18→22)
+COMPILER_ORDER = [
+    "gcc-12",
+    "gcc-13",
+    "gcc-14",
+    "gcc-15",
+    "clang-18",
+    "clang-19",
+    "clang-20",
+    "clang-21",
+    "clang-22",
+]
+
+VARIANT_ORDER = ["default", "native"]
+
+
+def compiler_sort_key(name: str) -> int:
+    """Position of a compiler in COMPILER_ORDER (unknown compilers last)."""
+    for i, c in enumerate(COMPILER_ORDER):
+        if c == name:
+            return i
+    return 100
+
+
+def column_key(compiler: str, variant: str) -> str:
+    return f"{compiler} {variant}"
+
+
+def column_sort_key(compiler: str, variant: str) -> tuple[int, int]:
+    """Sort key for result columns: variant first, then compiler."""
+    return (
+        VARIANT_ORDER.index(variant) if variant in VARIANT_ORDER else 99,
+        compiler_sort_key(compiler),
+    )
+
+
+def load_results(
+    results_root: Path,
+    jobs: int = 1,
+    cache: ResultCache | None = None,
+    variants: tuple[str, ...] | None = None,
+) -> ResultStore:
+    """Load Google Benchmark JSON results into a columnar store.
+
+    Reads results/<compiler>/<variant>/<bench>.json, optionally restricted
+    to ``variants``. With ``jobs > 1`` the files are decoded on a process
+    pool. Results are appended in sorted path order either way, so the
+    output does not depend on ``jobs``. Files unchanged since they were
+    stored in ``cache`` are not decoded again.
+    """
+    json_files = []
+    for json_file in sorted(results_root.rglob("*.json")):
+        parts = json_file.relative_to(results_root).parts
+        if len(parts) < 3:
+            continue
+        compiler = parts[0]
+        variant = parts[1]
+        if variants is not None and variant not in variants:
+            continue
+        json_files.append((json_file, compiler, variant))
+
+    paths = [json_file for json_file, _, _ in json_files]
+    decoded = load_benchmark_files(paths, jobs=jobs, cache=cache)
+
+    store = ResultStore()
+    for (json_file, compiler, variant), benchmarks in zip(json_files, decoded):
+        store.extend(json_file.stem, compiler, variant, benchmarks)
+
+    return store
+
+
+def add_load_arguments(parser: argparse.ArgumentParser):
+    """Add the --results-root/--jobs/--no-cache options shared by the CLIs."""
+    parser.add_argument(
+        "--results-root", default="results", help="Root directory of results"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for decoding JSON files (0 = all cores)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or update the parsed-results cache in <results-root>/.cache",
+    )
+
+
+def load_from_args(args: argparse.Namespace, **kwargs) -> ResultStore:
+    """Validate --results-root and load it as configured on the command line."""
+    results_root = Path(args.results_root)
+    if not results_root.exists():
+        print(f"Error: results root not found: {results_root}", file=sys.stderr)
+        sys.exit(1)
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    cache = None if args.no_cache else ResultCache(results_root)
+    return load_results(results_root, jobs=jobs, cache=cache, **kwargs)
+
+
+def main():
+    if sys.argv[1:2] == ["compare"]:
+        import compare_bench
+
+        compare_bench.main(sys.argv[2:])
+        return
+
+    parser = argparse.ArgumentParser(
+        description="Generate all benchmark reports and charts from one load"
+    )
+    add_load_arguments(parser)
+    parser.add_argument(
+        "--output-dir",
+        default="results/summary",
+        help="Output directory for reports and charts (default: results/summary)",
+    )
+    parser.add_argument(
+        "--no-charts",
+        action="store_true",
+        help="Skip the SVG charts (no matplotlib required)",
+    )
+    args = parser.parse_args()
+
+    # Imported here: both modules import this one for the shared loader.
+    import analyze_bench
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    print("Loading benchmark results...")
+    store = load_from_args(args)
+    if not len(store):
+        print("Error: no benchmark JSON data found", file=sys.stderr)
+        sys.exit(1)
+
+    analyze_bench.write_reports(
+        store,
+        Path(args.results_root),
+        output_md=output_dir / "bench_comparison.md",
+        output_csv=output_dir / "bench_comparison.csv",
+        asm_md=output_dir / "asm_analysis.md",
+        use_cache=not args.no_cache,
+    )
+
+    import code_size
+
+    if code_size.write_reports(
+        Path(args.results_root),
+        output_dir / "code_size.csv",
+        output_dir / "code_size.md",
+    ):
+        print(f"Wrote {output_dir / 'code_size.csv'}")
+
+    if not args.no_charts:
+        import generate_charts
+
+        print("\nGenerating charts...")
+        generate_charts.generate_all_charts(store, output_dir)
+
+        import compile_bench
+
+        compile_results = compile_bench.load_compile_results(Path(args.results_root))
+        if compile_results:
+            compile_bench.generate_compile_cost_chart(
+                compile_results, output_dir / "compile_cost.svg"
+            )
+
+    print("\nDone.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""On-disk cache of decoded Google Benchmark result files.
+
+Shared by analyze_bench.py and generate_charts.py. Each results/**/*.json
+file is decoded once into its "benchmarks" array and stored in a pickle
+under <results-root>/.cache, keyed by relative path and validated against
+the file's mtime and size. Re-running a report after one compiler finishes
+only decodes that compiler's files.
+"""
+
+import json
+import os
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+CACHE_DIRNAME = ".cache"
+CACHE_FILENAME = "results.pkl"
+
+# Bump when the decoded result-file format changes. Caches of analyzer
+# output pass their analyzer's own version to ResultCache as well.
+CACHE_VERSION = 1
+
+
+def read_benchmarks(json_file: Path) -> list[dict]:
+    """Decode one Google Benchmark JSON file and return its "benchmarks" array."""
+    try:
+        parsed = json.loads(json_file.read_text())
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"Warning: failed to load {json_file}: {e}", file=sys.stderr)
+        return []
+
+    # Google Benchmark JSON has a "benchmarks" array
+    return parsed.get("benchmarks", [])
+
+
+def _stat_key(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class ResultCache:
+    """Pickle-backed map of result file -> decoded value.
+
+    Entries are keyed by the path relative to ``results_root`` and are only
+    returned while the file's (mtime_ns, size) still matches. ``version``
+    is the version of the code that produced the cached values; a cache
+    written under another version is discarded.
+    """
+
+    def __init__(
+        self, results_root: Path, filename: str = CACHE_FILENAME, version: int = 0
+    ):
+        self.results_root = results_root
+        self.path = results_root / CACHE_DIRNAME / filename
+        self.version = (CACHE_VERSION, version)
+        self._entries: dict[str, tuple[tuple[int, int], object]] = self._read()
+        self._dirty = False
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, "rb") as f:
+                version, entries = pickle.load(f)
+        except (
+            OSError,
+            pickle.UnpicklingError,
+            EOFError,
+            ValueError,
+            TypeError,
+            AttributeError,
+            ImportError,
+        ):
+            return {}
+        if version != self.version or not isinstance(entries, dict):
+            return {}
+        return entries
+
+    def _key(self, path: Path) -> str:
+        try:
+            return path.relative_to(self.results_root).as_posix()
+        except ValueError:
+            return path.resolve().as_posix()
+
+    def get(self, path: Path):
+        """Return the cached value for path, or None if missing or stale."""
+        hit = self._entries.get(self._key(path))
+        if hit is None:
+            return None
+        stat, value = hit
+        if stat != _stat_key(path):
+            return None
+        return value
+
+    def put(self, path: Path, value):
+        stat = _stat_key(path)
+        if stat is None:
+            return
+        self._entries[self._key(path)] = (stat, value)
+        self._dirty = True
+
+    def save(self):
+        """Write the cache back to disk, dropping entries for deleted files."""
+        stale = [key for key in self._entries if not (self.results_root / key).exists()]
+        for key in stale:
+            del self._entries[key]
+        if not self._dirty and not stale:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(
+                (self.version, self._entries), f, protocol=pickle.HIGHEST_PROTOCOL
+            )
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
+def load_benchmark_files(
+    paths: list[Path], jobs: int = 1, cache: ResultCache | None = None
+) -> list[list[dict]]:
+    """Decode the "benchmarks" array of each path, in order.
+
+    Cache hits are returned directly; only missing or changed files are
+    decoded (on a process pool when ``jobs > 1``) and then stored back.
+    """
+    decoded: list[list[dict] | None] = [
+        cache.get(path) if cache is not None else None for path in paths
+    ]
+    misses = [i for i, value in enumerate(decoded) if value is None]
+    miss_paths = [paths[i] for i in misses]
+
+    if jobs > 1 and len(miss_paths) > 1:
+        chunksize = max(1, len(miss_paths) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            fresh = list(pool.map(read_benchmarks, miss_paths, chunksize=chunksize))
+    else:
+        fresh = [read_benchmarks(path) for path in miss_paths]
+
+    for i, benchmarks in zip(misses, fresh):
+        decoded[i] = benchmarks
+        if cache is not None:
+            cache.put(paths[i], benchmarks)
+
+    if cache is not None:
+        cache.save()
+
+    return decoded
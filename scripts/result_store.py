@@ -0,0 +1,428 @@
+"""Columnar store for Google Benchmark entries.
+
+Shared by analyze_bench.py and generate_charts.py. Instead of keeping every
+decoded entry dict alive, each benchmark entry becomes one row of parallel
+``array`` columns: string fields (bench, section, name, compiler, variant,
+aggregate) are interned into per-column label tables and stored as integer
+codes, and numeric fields (cpu_time, real_time, iterations and the
+hardware counters in PERF_COUNTERS) are stored unboxed.
+"""
+
+import math
+import re
+import statistics
+from array import array
+from typing import NamedTuple
+
+STRING_COLUMNS = (
+    "bench",
+    "section",
+    "name",
+    "compiler",
+    "variant",
+    "aggregate",
+    "time_unit",
+)
+
+# Rows sharing these columns are repetitions of one benchmark run.
+GROUP_COLUMNS = ("bench", "section", "name", "compiler", "variant")
+
+# Hardware counters requested with --benchmark_perf_counters (libpfm event
+# names), keyed by column name. Google Benchmark reports them per iteration
+# under the event name.
+PERF_COUNTERS = {
+    "cycles": "CYCLES",
+    "instructions": "INSTRUCTIONS",
+    "branch_misses": "BRANCH-MISSES",
+    "l1d_misses": "PERF_COUNT_HW_CACHE_L1D:READ:MISS",
+}
+
+
+def ipc_of(counters: dict[str, float]) -> float | None:
+    """Instructions per cycle, when both counters were recorded."""
+    cycles = counters.get("cycles")
+    instructions = counters.get("instructions")
+    if not cycles or instructions is None:
+        return None
+    return instructions / cycles
+
+
+# Google Benchmark's default when an entry has no time_unit.
+DEFAULT_TIME_UNIT = "ns"
+
+MIN_TIME_RE = re.compile(r"/min_time:[0-9.]+$")
+
+
+def clean_bench_name(name: str) -> str:
+    """Strip Google Benchmark suffixes like '/min_time:0.100'."""
+    return MIN_TIME_RE.sub("", name)
+
+
+def split_bench_name(name: str) -> tuple[str, str]:
+    """Split 'Section/bench_name' into (section, bench_name)."""
+    name = clean_bench_name(name)
+    if "/" in name:
+        parts = name.split("/", 1)
+        return parts[0], parts[1]
+    return "", name
+
+
+def _number(value, default: float = math.nan) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    return default
+
+
+class RunStats(NamedTuple):
+    """cpu_time statistics over the repetitions of one run.
+
+    ``mad`` is the (unscaled) median absolute deviation and ``cv`` the
+    coefficient of variation (stddev / mean, as a fraction); both are NaN
+    when they cannot be computed. ``n`` counts the repetitions, and is 0
+    when only Google Benchmark's aggregates were reported.
+    """
+
+    median: float
+    mad: float
+    cv: float
+    n: int
+
+
+def summarize(samples: list[float], aggregates: dict[str, float]) -> RunStats:
+    """Median ± MAD and CV of a run's repetitions.
+
+    Falls back to the reported median (or mean) and cv aggregates when the
+    file only holds aggregates (--benchmark_report_aggregates_only).
+    """
+    if samples:
+        median = statistics.median(samples)
+        if len(samples) == 1:
+            return RunStats(median, math.nan, math.nan, 1)
+        mad = statistics.median(abs(x - median) for x in samples)
+        mean = statistics.fmean(samples)
+        cv = statistics.stdev(samples) / mean if mean else math.nan
+        return RunStats(median, mad, cv, len(samples))
+    median = aggregates.get("median", aggregates.get("mean", math.nan))
+    return RunStats(median, math.nan, aggregates.get("cv", math.nan), 0)
+
+
+class PivotTable(NamedTuple):
+    """cpu_time pivoted to one row per benchmark and one column per build.
+
+    ``keys[r]`` holds the (bench, section, name) codes of row ``r``;
+    ``values`` (median), ``mad``, ``cv`` and ``counts`` are row-major grids
+    of ``len(keys) * len(columns)`` cells. ``counters`` holds one such grid
+    of median per-iteration values for each recorded hardware counter.
+    ``units[c]`` is the time_unit of column ``c`` ("ns", or "Ir" for
+    instruction counts from cachegrind_bench.py).
+    """
+
+    columns: list[tuple[str, str]]
+    keys: list[tuple[int, int, int]]
+    values: array
+    mad: array
+    cv: array
+    counts: array
+    counters: dict[str, array]
+    units: list[str]
+
+    def cell(self, row: int, col: int) -> float | None:
+        """Median cpu_time of one cell, or None where that build has no entry."""
+        v = self.values[row * len(self.columns) + col]
+        return None if math.isnan(v) else v
+
+    def stats(self, row: int, col: int) -> RunStats | None:
+        """Full repetition statistics of one cell, or None if it is empty."""
+        i = row * len(self.columns) + col
+        if math.isnan(self.values[i]):
+            return None
+        return RunStats(self.values[i], self.mad[i], self.cv[i], self.counts[i])
+
+    def counter(self, row: int, col: int, name: str) -> float | None:
+        """Median per-iteration hardware counter of one cell, if recorded."""
+        grid = self.counters.get(name)
+        if grid is None:
+            return None
+        v = grid[row * len(self.columns) + col]
+        return None if math.isnan(v) else v
+
+
+class ResultStore:
+    """Append-only columnar table of benchmark entries.
+
+    Row ``i`` is described by ``code(column, i)`` for the string columns and
+    by ``cpu_time[i]``, ``real_time[i]``, ``iterations[i]`` and
+    ``counters[name][i]`` (NaN when not recorded). Rows keep
+    their insertion order, which is the sorted result-file order the
+    loaders use. Repetitions and aggregates of one run share their name
+    (taken from Google Benchmark's run_name) and differ in ``aggregate``.
+    """
+
+    def __init__(self):
+        self._codes = {col: array("I") for col in STRING_COLUMNS}
+        self._labels: dict[str, list[str]] = {col: [] for col in STRING_COLUMNS}
+        self._lookup: dict[str, dict[str, int]] = {col: {} for col in STRING_COLUMNS}
+        self.cpu_time = array("d")
+        self.real_time = array("d")
+        self.iterations = array("q")
+        self.counters = {name: array("d") for name in PERF_COUNTERS}
+        self._counter_rows = 0
+        self._groups: tuple[array, list[RunStats], list[dict]] | None = None
+
+    def __len__(self) -> int:
+        return len(self.cpu_time)
+
+    def _intern(self, col: str, label: str) -> int:
+        lookup = self._lookup[col]
+        code = lookup.get(label)
+        if code is None:
+            code = len(self._labels[col])
+            lookup[label] = code
+            self._labels[col].append(label)
+        return code
+
+    def append(self, bench: str, compiler: str, variant: str, entry: dict):
+        """Add one Google Benchmark entry as a row."""
+        self._groups = None
+        # run_name is shared by all repetitions and aggregates of one run.
+        section, name = split_bench_name(entry.get("run_name") or entry.get("name", ""))
+        codes = self._codes
+        codes["bench"].append(self._intern("bench", bench))
+        codes["section"].append(self._intern("section", section))
+        codes["name"].append(self._intern("name", name))
+        codes["compiler"].append(self._intern("compiler", compiler))
+        codes["variant"].append(self._intern("variant", variant))
+        aggregate = ""
+        if entry.get("run_type") == "aggregate":
+            aggregate = entry.get("aggregate_name", "")
+        codes["aggregate"].append(self._intern("aggregate", aggregate))
+        unit = entry.get("time_unit", DEFAULT_TIME_UNIT)
+        codes["time_unit"].append(self._intern("time_unit", unit))
+        self.cpu_time.append(_number(entry.get("cpu_time"), 0.0))
+        self.real_time.append(_number(entry.get("real_time")))
+        iterations = entry.get("iterations")
+        self.iterations.append(iterations if isinstance(iterations, int) else 0)
+        recorded = False
+        for name, event in PERF_COUNTERS.items():
+            value = _number(entry.get(event))
+            self.counters[name].append(value)
+            recorded = recorded or not math.isnan(value)
+        self._counter_rows += recorded
+
+    def extend(self, bench: str, compiler: str, variant: str, entries: list[dict]):
+        for entry in entries:
+            self.append(bench, compiler, variant, entry)
+
+    def labels(self, col: str) -> list[str]:
+        """Distinct values of a string column, indexed by code."""
+        return self._labels[col]
+
+    def code(self, col: str, row: int) -> int:
+        return self._codes[col][row]
+
+    def label(self, col: str, row: int) -> str:
+        return self._labels[col][self._codes[col][row]]
+
+    def full_name(self, row: int) -> str:
+        """Cleaned 'Section/name' of a row, as Google Benchmark reported it."""
+        section = self.label("section", row)
+        name = self.label("name", row)
+        return f"{section}/{name}" if section else name
+
+    def select(self, **labels: str) -> list[int]:
+        """Row indices whose string columns equal the given labels."""
+        wanted = []
+        for col, label in labels.items():
+            code = self._lookup[col].get(label)
+            if code is None:
+                return []
+            wanted.append((self._codes[col], code))
+        return [
+            i
+            for i in range(len(self))
+            if all(codes[i] == code for codes, code in wanted)
+        ]
+
+    def values(self, col: str, **labels: str) -> list[str]:
+        """Distinct labels of ``col`` among rows matching ``labels``, in row order."""
+        codes = self._codes[col]
+        rows = self.select(**labels) if labels else range(len(self))
+        seen: dict[int, None] = {}
+        for i in rows:
+            seen.setdefault(codes[i], None)
+        return [self._labels[col][code] for code in seen]
+
+    def find(self, pattern: str, **labels: str) -> int | None:
+        """First row matching ``labels`` whose full name matches ``pattern``."""
+        regex = re.compile(pattern)
+        for i in self.select(**labels):
+            if regex.search(self.full_name(i)):
+                return i
+        return None
+
+    @property
+    def has_counters(self) -> bool:
+        """True when any row recorded hardware counters."""
+        return self._counter_rows > 0
+
+    def _group_index(self) -> tuple[array, list[RunStats], list[dict]]:
+        """Repetition group of every row and the statistics of each group.
+
+        Rows sharing (bench, section, name, compiler, variant) are the
+        repetitions of one run, plus any aggregates Google Benchmark
+        computed for it. Each group also gets the median of every hardware
+        counter its repetitions recorded. Built lazily and reused until the
+        next append.
+        """
+        if self._groups is not None:
+            return self._groups
+        codes = self._codes
+        agg_labels = self._labels["aggregate"]
+        index: dict[tuple[int, ...], int] = {}
+        group_of = array("I")
+        samples: list[list[float]] = []
+        aggregates: list[dict[str, float]] = []
+        for i in range(len(self)):
+            key = tuple(codes[col][i] for col in GROUP_COLUMNS)
+            g = index.get(key)
+            if g is None:
+                g = len(samples)
+                index[key] = g
+                samples.append([])
+                aggregates.append({})
+            group_of.append(g)
+            aggregate = agg_labels[codes["aggregate"][i]]
+            if aggregate:
+                aggregates[g][aggregate] = self.cpu_time[i]
+            else:
+                samples[g].append(self.cpu_time[i])
+        stats = [summarize(s, a) for s, a in zip(samples, aggregates)]
+
+        counters: list[dict[str, float]] = [{} for _ in samples]
+        if self.has_counters:
+            no_aggregate = self._lookup["aggregate"].get("")
+            for name, column in self.counters.items():
+                values: list[list[float]] = [[] for _ in samples]
+                for i in range(len(self)):
+                    v = column[i]
+                    if codes["aggregate"][i] == no_aggregate and not math.isnan(v):
+                        values[group_of[i]].append(v)
+                for g, vs in enumerate(values):
+                    if vs:
+                        counters[g][name] = statistics.median(vs)
+
+        self._groups = (group_of, stats, counters)
+        return self._groups
+
+    def stats(self, row: int) -> RunStats:
+        """Repetition statistics of the run that ``row`` belongs to."""
+        group_of, stats, _ = self._group_index()
+        return stats[group_of[row]]
+
+    def counter_medians(self, row: int) -> dict[str, float]:
+        """Median per-iteration hardware counters of the run of ``row``."""
+        group_of, _, counters = self._group_index()
+        return counters[group_of[row]]
+
+    def samples(self) -> dict[tuple[str, str, str, str, str], list[float]]:
+        """cpu_time of every repetition, grouped per benchmark and build.
+
+        Keys are (bench, section, name, compiler, variant) labels; rows that
+        Google Benchmark reported as aggregates (mean, median, ...) are left
+        out, so each list holds one value per repetition.
+        """
+        codes = self._codes
+        no_aggregate = self._lookup["aggregate"].get("")
+        groups: dict[tuple[str, str, str, str, str], list[float]] = {}
+        for i in range(len(self)):
+            if codes["aggregate"][i] != no_aggregate:
+                continue
+            key = tuple(self._labels[col][codes[col][i]] for col in GROUP_COLUMNS)
+            groups.setdefault(key, []).append(self.cpu_time[i])
+        return groups
+
+    def sample_units(self) -> dict[tuple[str, str, str, str, str], str]:
+        """time_unit of every samples() group ("Ir" for cachegrind counts)."""
+        codes = self._codes
+        units = self._labels["time_unit"]
+        return {
+            tuple(self._labels[col][codes[col][i]] for col in GROUP_COLUMNS): units[
+                codes["time_unit"][i]
+            ]
+            for i in range(len(self))
+        }
+
+    def pivot(self, column_order) -> PivotTable:
+        """Pivot per-run statistics into one row per (bench, section, name).
+
+        ``column_order(compiler, variant)`` is the sort key for columns.
+        Rows are grouped by bench name, keeping first-appearance order
+        within a bench. Each cell summarizes all repetitions of that
+        benchmark in that build (see ``summarize``).
+        """
+        compiler_codes = self._codes["compiler"]
+        variant_codes = self._codes["variant"]
+        compiler_labels = self._labels["compiler"]
+        variant_labels = self._labels["variant"]
+        col_codes = sorted(
+            {(compiler_codes[i], variant_codes[i]) for i in range(len(self))},
+            key=lambda c: column_order(compiler_labels[c[0]], variant_labels[c[1]]),
+        )
+        col_index = {c: ci for ci, c in enumerate(col_codes)}
+        columns = [(compiler_labels[c], variant_labels[v]) for c, v in col_codes]
+        units = [DEFAULT_TIME_UNIT] * len(columns)
+        unit_codes = self._codes["time_unit"]
+        for i in reversed(range(len(self))):
+            ci = col_index[(compiler_codes[i], variant_codes[i])]
+            units[ci] = self._labels["time_unit"][unit_codes[i]]
+
+        # Pass 1: assign each entry to a pivot row.
+        bench_codes = self._codes["bench"]
+        section_codes = self._codes["section"]
+        name_codes = self._codes["name"]
+        key_index: dict[tuple[int, int, int], int] = {}
+        keys: list[tuple[int, int, int]] = []
+        row_of = array("I")
+        for i in range(len(self)):
+            key = (bench_codes[i], section_codes[i], name_codes[i])
+            r = key_index.get(key)
+            if r is None:
+                r = len(keys)
+                key_index[key] = r
+                keys.append(key)
+            row_of.append(r)
+
+        bench_labels = self._labels["bench"]
+        order = sorted(range(len(keys)), key=lambda r: bench_labels[keys[r][0]])
+        rank = array("I", [0]) * len(keys)
+        for new_r, r in enumerate(order):
+            rank[r] = new_r
+
+        # Pass 2: scatter each run's statistics into the row-major grids.
+        group_of, stats, group_counters = self._group_index()
+        n_cols = len(columns)
+        n_cells = len(keys) * n_cols
+        values = array("d", [math.nan]) * n_cells
+        mad = array("d", [math.nan]) * n_cells
+        cv = array("d", [math.nan]) * n_cells
+        counts = array("I", [0]) * n_cells
+        recorded = {name for c in group_counters for name in c}
+        counters = {
+            name: array("d", [math.nan]) * n_cells
+            for name in PERF_COUNTERS
+            if name in recorded
+        }
+        for i in range(len(self)):
+            ci = col_index[(compiler_codes[i], variant_codes[i])]
+            cell = rank[row_of[i]] * n_cols + ci
+            run = stats[group_of[i]]
+            values[cell] = run.median
+            mad[cell] = run.mad
+            cv[cell] = run.cv
+            counts[cell] = run.n
+            for name, value in group_counters[group_of[i]].items():
+                counters[name][cell] = value
+
+        return PivotTable(
+            columns, [keys[r] for r in order], values, mad, cv, counts, counters, units
+        )
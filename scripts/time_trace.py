@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""Template instantiation hot spots of clang builds, from -ftime-trace.
+
+Usage:
+    python3 scripts/time_trace.py [--compilers clang-21]
+                                  [--build-root build_trace]
+                                  [--results-root results]
+                                  [--granularity 50] [--top 30] [--no-build]
+
+Configures the tests and benchmarks with every clang compiler of the
+benchmark sweep ($POET_COMPILERS, or every ALL_COMPILERS entry on PATH)
+and ``-ftime-trace``, builds them in build_trace/<compiler>/, and reads
+the Chrome trace clang writes next to each object file (<source>.json).
+--no-build only reads the traces already in the build directories.
+
+Events of a trace nest by time. Every InstantiateFunction and
+InstantiateClass event is attributed to its template (the instantiated
+name without template arguments) and to the POET entry point whose name
+appears first in it, as in code_size.py (nd_table_builder<...>::make_entry
+is table_builder). Self time excludes nested events; inclusive time
+counts only the outermost instantiation of a template in each stack, so
+recursive instantiations are not counted twice. Instantiations shorter
+than the granularity are not recorded and add to their parent's self
+time.
+
+Writes into <results-root>/compile/:
+    <compiler>_time_trace.md      ranked entry points, templates and TUs
+    <compiler>_time_trace.folded  collapsed stacks (self microseconds) for
+                                  flamegraph.pl, speedscope or inferno
+    <compiler>_trace.json         every TU's trace merged into one Chrome
+                                  trace, one process per TU (Perfetto)
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import NamedTuple
+
+from bench_matrix import (
+    cmake_configure_args,
+    cxx_binary,
+    discover_compilers,
+    run_logged,
+)
+from code_size import GROUPS, OTHER, POET_OTHER, group_of
+
+INSTANTIATION_EVENTS = frozenset({"InstantiateFunction", "InstantiateClass"})
+# Events whose detail names the frame: instantiations and included headers.
+DETAILED_FRAMES = INSTANTIATION_EVENTS | {"Source"}
+# Per-TU summary events ("Total Frontend", ...) overlap everything else.
+TOTAL_PREFIX = "Total "
+# Per-TU phases reported next to the instantiation time.
+UNIT_PHASES = frozenset({"ExecuteCompiler", "Frontend", "Backend"})
+# Trace files of the project's own targets; dependencies live in _deps/.
+DEPENDENCY_DIR = "_deps"
+
+# Operators spelled with angle brackets, longest first.
+ANGLE_OPERATORS = ("<=>", "<<=", ">>=", "<<", ">>", "<=", ">=", "->", "<", ">")
+
+ENTRY_POINT_ORDER = [label for label, _ in GROUPS] + [POET_OTHER]
+MAX_NAME = 160
+
+
+class TraceEvent(NamedTuple):
+    name: str
+    detail: str
+    start: int
+    duration: int
+
+
+class TemplateCost(NamedTuple):
+    template: str
+    kind: str
+    group: str
+    inclusive_us: int
+    self_us: int
+    count: int
+    units: int
+
+
+class UnitCost(NamedTuple):
+    unit: str
+    total_us: int
+    frontend_us: int
+    backend_us: int
+    instantiation_us: int
+    poet_us: int
+
+
+def strip_template_args(name: str) -> str:
+    """Name with every <...> argument list removed (operator< etc. kept)."""
+    out = []
+    depth = parens = 0
+    i = 0
+    while i < len(name):
+        if name.startswith("operator", i):
+            j = i + len("operator")
+            op = next((op for op in ANGLE_OPERATORS if name.startswith(op, j)), "")
+            if depth == 0:
+                out.append(name[i : j + len(op)])
+            i = j + len(op)
+            continue
+        c = name[i]
+        if depth and c in "()":
+            # '>' inside parentheses is a comparison: f<(1 > 2)>.
+            parens += 1 if c == "(" else -1
+        elif c == "<" and not parens:
+            depth += 1
+        elif c == ">" and depth and not parens:
+            depth -= 1
+        elif depth == 0:
+            out.append(c)
+        i += 1
+    return "".join(out)
+
+
+def frame_label(event: TraceEvent) -> str:
+    """Collapsed-stack frame: the event, and its template or header."""
+    if event.name not in DETAILED_FRAMES or not event.detail:
+        return event.name
+    detail = event.detail
+    if event.name in INSTANTIATION_EVENTS:
+        detail = strip_template_args(detail)
+    # ';' separates frames and ' ' the count in the collapsed format.
+    return f"{event.name} {detail}".replace(";", ",")
+
+
+def read_trace(path: Path) -> list[list[TraceEvent]]:
+    """Complete events of one -ftime-trace file, per thread, in start order."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Warning: cannot read {path}: {e}", file=sys.stderr)
+        return []
+    threads: dict[int, list[TraceEvent]] = defaultdict(list)
+    for e in data.get("traceEvents", []):
+        if e.get("ph") != "X" or e["name"].startswith(TOTAL_PREFIX):
+            continue
+        detail = e.get("args", {}).get("detail", "")
+        threads[e.get("tid", 0)].append(
+            TraceEvent(e["name"], detail, int(e["ts"]), int(e["dur"]))
+        )
+    # Parents start no later and last no shorter than their children.
+    return [
+        sorted(events, key=lambda e: (e.start, -e.duration))
+        for events in threads.values()
+    ]
+
+
+def find_traces(build_dir: Path) -> list[Path]:
+    """Per-TU trace files of the project's targets, not of dependencies."""
+    return sorted(
+        path
+        for path in build_dir.rglob("CMakeFiles/*.dir/**/*.json")
+        if DEPENDENCY_DIR not in path.relative_to(build_dir).parts
+    )
+
+
+def unit_label(path: Path, build_dir: Path) -> str:
+    """<target>/<source> of a trace file under CMakeFiles/<target>.dir/."""
+    parts = path.relative_to(build_dir).parts
+    target = next(
+        (p.removesuffix(".dir") for p in parts if p.endswith(".dir")), parts[0]
+    )
+    return f"{target}/{path.name.removesuffix('.json')}"
+
+
+class OpenEvent:
+    """An event of the current stack, while its children are read."""
+
+    def __init__(self, event: TraceEvent, frames: list[str]):
+        self.event = event
+        self.frames = frames
+        self.self_us = event.duration
+        self.key: tuple[str, str] | None = None
+        self.group: str | None = None
+        if event.name in INSTANTIATION_EVENTS:
+            self.key = (strip_template_args(event.detail), event.name)
+            self.group = group_of(event.detail)
+
+
+class TraceSummary:
+    """Instantiation costs and collapsed stacks accumulated over TUs."""
+
+    def __init__(self):
+        self.stacks: Counter[str] = Counter()
+        # (template, kind) -> [group, inclusive, self, count]
+        self.templates: dict[tuple[str, str], list] = {}
+        self.template_units: dict[tuple[str, str], set[str]] = defaultdict(set)
+        # group -> [inclusive, self, count]
+        self.groups: dict[str, list[int]] = defaultdict(lambda: [0, 0, 0])
+        self.group_units: dict[str, set[str]] = defaultdict(set)
+        self.units: list[UnitCost] = []
+
+    def add_unit(self, unit: str, threads: list[list[TraceEvent]]):
+        totals: Counter[str] = Counter()
+        for events in threads:
+            self.add_thread(unit, events, totals)
+        self.units.append(
+            UnitCost(
+                unit,
+                totals["ExecuteCompiler"],
+                totals["Frontend"],
+                totals["Backend"],
+                totals["instantiation"],
+                totals["poet"],
+            )
+        )
+
+    def add_thread(self, unit: str, events: list[TraceEvent], totals: Counter):
+        stack: list[OpenEvent] = []
+        for event in events:
+            while stack and stack[-1].event.start + stack[-1].event.duration <= (
+                event.start
+            ):
+                self.close(unit, stack.pop(), stack, totals)
+            if stack:
+                stack[-1].self_us -= event.duration
+            if event.name in UNIT_PHASES:
+                totals[event.name] += event.duration
+            frames = stack[-1].frames if stack else [unit]
+            stack.append(OpenEvent(event, frames + [frame_label(event)]))
+        while stack:
+            self.close(unit, stack.pop(), stack, totals)
+
+    def close(
+        self, unit: str, entry: OpenEvent, stack: list[OpenEvent], totals: Counter
+    ):
+        """Account a finished event; ``stack`` holds its ancestors."""
+        if entry.self_us > 0:
+            self.stacks[";".join(entry.frames)] += entry.self_us
+        if entry.key is None:
+            return
+        outer = [e for e in stack if e.key is not None]
+        duration = entry.event.duration
+        cost = self.templates.setdefault(entry.key, [entry.group, 0, 0, 0])
+        if all(e.key != entry.key for e in outer):
+            cost[1] += duration
+        cost[2] += entry.self_us
+        cost[3] += 1
+        self.template_units[entry.key].add(unit)
+        group_cost = self.groups[entry.group]
+        if all(e.group != entry.group for e in outer):
+            group_cost[0] += duration
+        group_cost[1] += entry.self_us
+        group_cost[2] += 1
+        self.group_units[entry.group].add(unit)
+        if not outer:
+            totals["instantiation"] += duration
+        if entry.group != OTHER and all(e.group == OTHER for e in outer):
+            totals["poet"] += duration
+
+    def template_costs(self) -> list[TemplateCost]:
+        """Every instantiated template, most inclusive time first."""
+        costs = [
+            TemplateCost(
+                template,
+                kind.removeprefix("Instantiate"),
+                group,
+                inclusive,
+                self_us,
+                count,
+                len(self.template_units[(template, kind)]),
+            )
+            for (template, kind), (group, inclusive, self_us, count) in (
+                self.templates.items()
+            )
+        ]
+        costs.sort(key=lambda c: (-c.inclusive_us, -c.self_us, c.template))
+        return costs
+
+
+def ms(us: int) -> str:
+    return f"{us / 1000:,.1f}"
+
+
+def cell_name(name: str) -> str:
+    name = name if len(name) <= MAX_NAME else name[:MAX_NAME] + "…"
+    name = name.replace("|", "\\|")
+    return f"`{name}`"
+
+
+def write_markdown(summary: TraceSummary, compiler: str, top: int, output: Path):
+    units = sorted(summary.units, key=lambda u: (-u.total_us, u.unit))
+    total = sum(u.total_us for u in units)
+    instantiation = sum(u.instantiation_us for u in units)
+    poet = sum(u.poet_us for u in units)
+    with open(output, "w") as f:
+        f.write(f"# Template Instantiation Time ({compiler})\n\n")
+        if not units:
+            f.write("No -ftime-trace files found.\n")
+            return
+        f.write(
+            f"{len(units)} translation units, {ms(total)} ms of compilation. "
+            f"Template instantiation took {ms(instantiation)} ms, "
+            f"{ms(poet)} ms of it inside POET templates (outermost POET "
+            "instantiation of each stack, including the user code it "
+            "instantiates).\n\n"
+        )
+
+        f.write("## POET entry points\n\n")
+        f.write(
+            "| Entry point | Inclusive ms | Self ms | Instantiations | TUs |\n"
+            "|:------------|-------------:|--------:|---------------:|----:|\n"
+        )
+        for group in ENTRY_POINT_ORDER:
+            if group not in summary.groups:
+                continue
+            inclusive, self_us, count = summary.groups[group]
+            f.write(
+                f"| {group} | {ms(inclusive)} | {ms(self_us)} | {count:,} "
+                f"| {len(summary.group_units[group])} |\n"
+            )
+        f.write("\n")
+
+        poet_templates = [c for c in summary.template_costs() if c.group != OTHER]
+        f.write(f"## Most expensive POET templates (top {top})\n\n")
+        f.write(
+            "| Template | Kind | Entry point | Inclusive ms | Self ms | Count | TUs |\n"
+            "|:---------|:-----|:------------|-------------:|--------:|------:|----:|\n"
+        )
+        for c in poet_templates[:top]:
+            f.write(
+                f"| {cell_name(c.template)} | {c.kind} | {c.group} "
+                f"| {ms(c.inclusive_us)} | {ms(c.self_us)} | {c.count:,} "
+                f"| {c.units} |\n"
+            )
+        f.write("\n")
+
+        f.write(f"## Slowest translation units (top {top})\n\n")
+        f.write(
+            "| Translation unit | Total ms | Frontend ms | Backend ms "
+            "| Instantiation ms | POET ms |\n"
+            "|:-----------------|---------:|------------:|-----------:"
+            "|-----------------:|--------:|\n"
+        )
+        for u in units[:top]:
+            f.write(
+                f"| {u.unit} | {ms(u.total_us)} | {ms(u.frontend_us)} "
+                f"| {ms(u.backend_us)} | {ms(u.instantiation_us)} "
+                f"| {ms(u.poet_us)} |\n"
+            )
+
+
+def write_folded(summary: TraceSummary, output: Path):
+    with open(output, "w") as f:
+        for stack, us in sorted(summary.stacks.items()):
+            f.write(f"{stack} {us}\n")
+
+
+def write_merged_trace(traces: list[tuple[str, Path]], output: Path):
+    """One Chrome trace with a process per TU, named after the TU."""
+    events = []
+    for pid, (unit, path) in enumerate(traces, start=1):
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, json.JSONDecodeError):
+            continue
+        events.append(
+            {"ph": "M", "name": "process_name", "pid": pid, "args": {"name": unit}}
+        )
+        for e in data.get("traceEvents", []):
+            if e.get("ph") != "M":
+                events.append({**e, "pid": pid})
+    with open(output, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+def build(compiler: str, build_dir: Path, granularity: int) -> bool:
+    """Configure and build the tests and benchmarks with -ftime-trace."""
+    flags = f"-ftime-trace -ftime-trace-granularity={granularity}"
+    print(f"Configuring: {compiler} ({build_dir})")
+    cmd = cmake_configure_args(
+        compiler, "default", build_dir, tests=True, cxx_flags=flags
+    )
+    if not run_logged(cmd, f"CMake configure for {compiler}"):
+        return False
+    print(f"Building: {compiler}")
+    cmd = ["cmake", "--build", str(build_dir), f"-j{os.cpu_count() or 1}"]
+    # Keep going: report whichever translation units did compile.
+    run_logged(cmd, f"Build for {compiler}")
+    return True
+
+
+def report(compiler: str, build_dir: Path, output_dir: Path, top: int) -> bool:
+    traces = [(unit_label(p, build_dir), p) for p in find_traces(build_dir)]
+    if not traces:
+        print(f"Warning: no -ftime-trace files under {build_dir}", file=sys.stderr)
+        return False
+    summary = TraceSummary()
+    for unit, path in traces:
+        summary.add_unit(unit, read_trace(path))
+    output_dir.mkdir(parents=True, exist_ok=True)
+    outputs = [
+        output_dir / f"{compiler}_time_trace.md",
+        output_dir / f"{compiler}_time_trace.folded",
+        output_dir / f"{compiler}_trace.json",
+    ]
+    write_markdown(summary, compiler, top, outputs[0])
+    write_folded(summary, outputs[1])
+    write_merged_trace(traces, outputs[2])
+    for output in outputs:
+        print(f"    OK: {output}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Attribute clang -ftime-trace instantiation time to POET templates"
+    )
+    parser.add_argument(
+        "--compilers",
+        nargs="+",
+        help="Clang compilers (default: clang entries of $POET_COMPILERS or detected)",
+    )
+    parser.add_argument("--build-root", default="build_trace")
+    parser.add_argument("--results-root", default="results")
+    parser.add_argument(
+        "--granularity",
+        type=int,
+        default=50,
+        help="-ftime-trace-granularity in microseconds (default: 50)",
+    )
+    parser.add_argument(
+        "--top", type=int, default=30, help="Rows of the ranked tables (default: 30)"
+    )
+    parser.add_argument(
+        "--no-build",
+        action="store_true",
+        help="Only read the traces already in the build directories",
+    )
+    args = parser.parse_args()
+
+    compilers = []
+    for compiler in args.compilers or discover_compilers():
+        if not compiler.startswith("clang-"):
+            if args.compilers:
+                print(f"Warning: -ftime-trace needs clang, skipping {compiler}")
+        elif args.no_build or shutil.which(cxx_binary(compiler)):
+            compilers.append(compiler)
+        else:
+            print(f"Warning: {cxx_binary(compiler)} not found, skipping {compiler}")
+    if not compilers:
+        print("Error: no clang compilers found", file=sys.stderr)
+        sys.exit(1)
+
+    build_root = Path(args.build_root)
+    output_dir = Path(args.results_root) / "compile"
+    ok = True
+    for compiler in compilers:
+        build_dir = build_root / compiler
+        if not args.no_build and not build(compiler, build_dir, args.granularity):
+            ok = False
+            continue
+        ok = report(compiler, build_dir, output_dir, args.top) and ok
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""Per-benchmark trend charts across commits from the history database.
+
+Usage:
+    python3 scripts/trend_charts.py [--db bench_history.db]
+                                    [--output-dir results/trends]
+                                    [--bench REGEX] [--name REGEX]
+                                    [--compiler C ...] [--variant default]
+                                    [--last 200] [--force]
+
+Draws one SVG per (bench, name, compiler, variant) series: the median
+cpu_time of every commit with a confidence band, and dashed markers at
+detected change points. Rendering is incremental: <output-dir>/trends.json
+remembers a fingerprint of every drawn series, and only series with new or
+re-ingested results are redrawn. change_points.md lists every detected
+change point across all series.
+"""
+
+import argparse
+import json
+import math
+import re
+import sqlite3
+import statistics
+import sys
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from bench_history import DEFAULT_DB, connect, query_series
+from compare_bench import mann_whitney_u
+from generate_charts import compiler_color, style_chart
+
+INDEX_FILENAME = "trends.json"
+
+# z for the order-statistic interval of the median (95%).
+MEDIAN_CI_Z = 1.96
+
+
+# ── Statistics ───────────────────────────────────────────────────────────────
+
+
+def median_ci(samples: list[float]) -> tuple[float, float]:
+    """Distribution-free ~95% interval of the median from order statistics.
+
+    With fewer than six samples the interval is the sample range.
+    """
+    values = sorted(samples)
+    n = len(values)
+    if n < 6:
+        return values[0], values[-1]
+    half_width = MEDIAN_CI_Z * math.sqrt(n) / 2
+    lo = max(0, math.floor(n / 2 - half_width))
+    hi = min(n - 1, math.ceil(n / 2 + half_width) - 1)
+    return values[lo], values[hi]
+
+
+def change_points(
+    medians: list[float],
+    samples: list[list[float]],
+    min_shift: float,
+    alpha: float,
+    min_size: int = 2,
+) -> list[int]:
+    """Indices where the series shifts level, by binary segmentation.
+
+    Each segment is split where the two halves' squared error around
+    their means is smallest. The split is kept when the halves' medians
+    differ by at least ``min_shift`` (a fraction) and a Mann-Whitney U test
+    on their pooled repetition samples is significant at ``alpha``. Both
+    halves are then searched again.
+    """
+    prefix = [0.0]
+    prefix_sq = [0.0]
+    for m in medians:
+        prefix.append(prefix[-1] + m)
+        prefix_sq.append(prefix_sq[-1] + m * m)
+
+    def sse(lo: int, hi: int) -> float:
+        total = prefix[hi] - prefix[lo]
+        return prefix_sq[hi] - prefix_sq[lo] - total * total / (hi - lo)
+
+    def split(lo: int, hi: int) -> list[int]:
+        if hi - lo < 2 * min_size:
+            return []
+        s = min(
+            range(lo + min_size, hi - min_size + 1),
+            key=lambda s: sse(lo, s) + sse(s, hi),
+        )
+        before = statistics.median(medians[lo:s])
+        after = statistics.median(medians[s:hi])
+        if before <= 0 or abs(after / before - 1) < min_shift:
+            return []
+        left = [x for group in samples[lo:s] for x in group]
+        right = [x for group in samples[s:hi] for x in group]
+        if mann_whitney_u(left, right) >= alpha:
+            return []
+        return split(lo, s) + [s] + split(s, hi)
+
+    return split(0, len(medians))
+
+
+def segment_shifts(medians: list[float], points: list[int]) -> list[float]:
+    """Relative median change across each change point, segment to segment."""
+    bounds = [0, *points, len(medians)]
+    levels = [statistics.median(medians[lo:hi]) for lo, hi in zip(bounds, bounds[1:])]
+    return [after / before - 1 for before, after in zip(levels, levels[1:])]
+
+
+# ── Rendering ────────────────────────────────────────────────────────────────
+
+
+def series_filename(bench: str, name: str, compiler: str, variant: str) -> str:
+    slug = "__".join((bench, name, compiler, variant))
+    return re.sub(r"[^A-Za-z0-9._=-]+", "_", slug) + ".svg"
+
+
+def draw_series(
+    key: tuple[str, str, str, str],
+    series: list[tuple[str, int | None, list[float]]],
+    points: list[int],
+    shifts: list[float],
+    output: Path,
+):
+    """Median line, CI band and change-point markers for one series."""
+    bench, name, compiler, variant = key
+    medians = [statistics.median(s) for _, _, s in series]
+    bands = [median_ci(s) for _, _, s in series]
+    x = range(len(series))
+    color = compiler_color(compiler)
+
+    fig, ax = plt.subplots(figsize=(10, 4))
+    ax.fill_between(
+        x, [b[0] for b in bands], [b[1] for b in bands], color=color, alpha=0.2
+    )
+    ax.plot(x, medians, color=color, marker="o", markersize=3, linewidth=1.2)
+    for p, shift in zip(points, shifts):
+        ax.axvline(p - 0.5, color="#C44E52", linestyle="--", linewidth=1)
+        ax.annotate(
+            f"{shift:+.1%}\n{series[p][0][:8]}",
+            xy=(p - 0.5, ax.get_ylim()[1]),
+            xytext=(3, -3),
+            textcoords="offset points",
+            va="top",
+            fontsize=8,
+            color="#C44E52",
+        )
+
+    step = max(1, len(series) // 12)
+    ticks = list(range(0, len(series), step))
+    ax.set_xticks(ticks)
+    ax.set_xticklabels([series[i][0][:7] for i in ticks], rotation=45, fontsize=8)
+    ax.set_xlabel("Commit")
+    ax.set_ylabel("ns/op (median)")
+    style_chart(ax, f"{bench} / {name} — {compiler} {variant}")
+
+    fig.tight_layout()
+    fig.savefig(str(output), format="svg", bbox_inches="tight")
+    plt.close(fig)
+    print(f"  Wrote {output}")
+
+
+def write_change_points(index: dict, output: Path):
+    """Markdown list of change points across all indexed series."""
+    with open(output, "w") as f:
+        f.write("# Change Points\n\n")
+        rows = [
+            (entry["key"], point)
+            for entry in index.values()
+            for point in entry.get("change_points", [])
+        ]
+        if not rows:
+            f.write("No change points detected.\n")
+            return
+        f.write("| Bench | Benchmark | Build | Commit | Shift |\n")
+        f.write("|:------|:----------|:------|:-------|------:|\n")
+        rows.sort(key=lambda r: (r[0], r[1]["commit"]))
+        for (bench, name, compiler, variant), point in rows:
+            f.write(
+                f"| {bench} | {name} | {compiler} {variant} "
+                f"| {point['commit'][:12]} | {point['shift']:+.1%} |\n"
+            )
+
+
+# ── Driver ───────────────────────────────────────────────────────────────────
+
+
+def list_series(conn: sqlite3.Connection, args: argparse.Namespace):
+    """(key, fingerprint) of every series matching the filters."""
+    bench_re = re.compile(args.bench) if args.bench else None
+    name_re = re.compile(args.name) if args.name else None
+    # Re-ingesting a series' latest run can reuse its rowid, count and
+    # commit time; its ingestion time still changes.
+    rows = conn.execute(
+        "SELECT r.bench, r.name, r.compiler, r.variant, count(*), max(r.run_id),"
+        " max(r.commit_time), max(runs.ingested_at)"
+        " FROM results r JOIN runs ON runs.id = r.run_id WHERE r.variant = ?"
+        " GROUP BY r.bench, r.name, r.compiler, r.variant",
+        (args.variant,),
+    )
+    for bench, name, compiler, variant, n, run_id, commit_time, ingested in rows:
+        if bench_re and not bench_re.search(bench):
+            continue
+        if name_re and not name_re.search(name):
+            continue
+        if args.compiler and compiler not in args.compiler:
+            continue
+        yield (
+            (bench, name, compiler, variant),
+            f"{n}:{run_id}:{commit_time}:{ingested}",
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Draw per-benchmark trend charts across commits"
+    )
+    parser.add_argument("--db", default=DEFAULT_DB)
+    parser.add_argument("--output-dir", default="results/trends")
+    parser.add_argument("--bench", help="Regex on the result file stem")
+    parser.add_argument("--name", help="Regex on the 'Section/name' run name")
+    parser.add_argument("--compiler", nargs="+", help="Only these compilers")
+    parser.add_argument("--variant", default="default")
+    parser.add_argument("--last", type=int, help="Only the N most recent commits")
+    parser.add_argument(
+        "--min-shift",
+        type=float,
+        default=5.0,
+        help="Smallest level shift (percent) reported as a change point",
+    )
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--force", action="store_true", help="Redraw every series")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"Error: database not found: {args.db}", file=sys.stderr)
+        sys.exit(1)
+    conn = connect(Path(args.db))
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    index_path = output_dir / INDEX_FILENAME
+    index: dict = {}
+    if index_path.exists() and not args.force:
+        try:
+            index = json.loads(index_path.read_text())
+        except (json.JSONDecodeError, OSError):
+            index = {}
+
+    drawn = skipped = 0
+    for key, fingerprint in list_series(conn, args):
+        # The options change what a chart shows, so they are part of it too.
+        fingerprint = f"{fingerprint}:{args.last}:{args.min_shift}:{args.alpha}"
+        filename = series_filename(*key)
+        entry = index.get(filename)
+        if (
+            entry is not None
+            and entry["fingerprint"] == fingerprint
+            and (output_dir / filename).exists()
+        ):
+            skipped += 1
+            continue
+
+        series = query_series(conn, *key, last=args.last)
+        series = [s for s in series if s[2]]
+        if not series:
+            continue
+        samples = [s for _, _, s in series]
+        medians = [statistics.median(s) for s in samples]
+        points = change_points(medians, samples, args.min_shift / 100, args.alpha)
+        shifts = segment_shifts(medians, points)
+
+        draw_series(key, series, points, shifts, output_dir / filename)
+        index[filename] = {
+            "key": list(key),
+            "fingerprint": fingerprint,
+            "change_points": [
+                {"commit": series[p][0], "shift": shift}
+                for p, shift in zip(points, shifts)
+            ],
+        }
+        drawn += 1
+    conn.close()
+
+    tmp = index_path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(index, indent=2, sort_keys=True))
+    tmp.replace(index_path)
+    write_change_points(index, output_dir / "change_points.md")
+    print(f"Drew {drawn} series, {skipped} unchanged")
+
+
+if __name__ == "__main__":
+    main()